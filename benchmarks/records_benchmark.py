@@ -0,0 +1,73 @@
+"""Compare per-row dicts with the column-wise `VertexBatch` on a large result.
+
+Builds N synthetic `elementMap()` rows (verse-shaped, as a full verse scan
+would return them) and measures, for each representation, the time to build
+it and the memory it keeps alive.
+
+    python benchmarks/records_benchmark.py [N]
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from gremlin_python.process.traversal import T
+
+from theo_mcp_server.gremlin_helpers import flatten_value_map
+from theo_mcp_server.records import VertexBatch
+
+
+def make_rows(n: int) -> list[dict]:
+    return [
+        {
+            T.id: 4096 + i,
+            T.label: "verse",
+            "caption": f"Gen {i // 1000 + 1}:{i % 1000 + 1}",
+            "book": "Genesis",
+            "bookShort": "Gen",
+            "chapter": i // 1000 + 1,
+            "verse": i % 1000 + 1,
+            "importIndex": i,
+        }
+        for i in range(n)
+    ]
+
+
+def measure(name: str, build, repeat: int = 3) -> None:
+    # Time without tracemalloc (it slows allocation-heavy code several times over).
+    elapsed = float("inf")
+    for _ in range(repeat):
+        rows = make_rows(N)
+        gc.collect()
+        started = time.perf_counter()
+        build(rows)
+        elapsed = min(elapsed, time.perf_counter() - started)
+
+    # Property values already exist in the input rows, so what is counted is
+    # the container overhead each representation adds on top of them.
+    rows = make_rows(N)
+    gc.collect()
+    tracemalloc.start()
+    result = build(rows)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<26} {elapsed * 1000:8.1f} ms  retained {retained / 2**20:6.1f} MiB  peak {peak / 2**20:6.1f} MiB")
+    del result
+
+
+def build_batch(rows: list[dict]) -> VertexBatch:
+    batch = VertexBatch.for_labels(["verse"])
+    for raw in rows:
+        batch.append_element_map(raw)
+    return batch
+
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+if __name__ == "__main__":
+    print(f"{N} rows")
+    measure("list of dicts", lambda rows: [flatten_value_map(r) for r in rows])
+    measure("VertexBatch", build_batch)
+    measure("VertexBatch + to_dicts()", lambda rows: build_batch(rows).to_dicts())
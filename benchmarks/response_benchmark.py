@@ -0,0 +1,131 @@
+"""Compare FastMCP's conversion of large tool results with `responses.encoded`.
+
+Builds a notions tree and a batch of verses with their text (about SCALE x
+10 MB and SCALE x 6 MB of JSON) and, for each way of returning them,
+measures the time and peak memory of turning the tool's return value into
+the tool result ("tool") and of also writing the JSON-RPC response the
+server sends ("response").
+
+    python benchmarks/response_benchmark.py [SCALE]
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult, JSONRPCResponse, ServerResult
+
+from theo_mcp_server import responses
+from theo_mcp_server.responses import encoded
+
+
+def make_tree(depth: int, breadth: int, prefix: str = "") -> dict[str, Any]:
+    if depth == 0:
+        return {}
+    return {
+        f"{prefix}{i + 1}. Благодать и истина": make_tree(depth - 1, breadth, f"{prefix}{i + 1}.")
+        for i in range(breadth)
+    }
+
+
+def make_verses(n: int) -> list[dict[str, Any]]:
+    text = "В начале было Слово, и Слово было у Бога, и Слово было Бог. " * 3
+    return [
+        {
+            "internal_id": 4096 + i,
+            "label": "verse",
+            "caption": f"Jn {i // 50 + 1}:{i % 50 + 1}",
+            "book": "John",
+            "bookShort": "Jn",
+            "chapter": i // 50 + 1,
+            "verse": i % 50 + 1,
+            "importIndex": i,
+            "RST": text,
+        }
+        for i in range(n)
+    ]
+
+
+def make_server(tree: dict[str, Any], verses: list[dict[str, Any]], fast: bool) -> FastMCP:
+    mcp = FastMCP("bench", json_response=True)
+
+    def get_notions_tree() -> dict[str, Any]:
+        return tree
+
+    def get_verses_by_captions() -> list[dict[str, Any]]:
+        return verses
+
+    for tool in (get_notions_tree, get_verses_by_captions):
+        mcp.tool()(encoded(tool) if fast else tool)
+    return mcp
+
+
+async def respond(mcp: FastMCP, tool: str, full: bool) -> Any:
+    # What FastMCP and the low-level server do with a tools/call.
+    result = await mcp._tool_manager.call_tool(tool, {}, convert_result=True)
+    if not isinstance(result, CallToolResult):
+        content, structured = result
+        result = CallToolResult(content=list(content), structuredContent=structured, isError=False)
+    if not full:
+        return result
+    body = ServerResult(result).model_dump(by_alias=True, mode="json", exclude_none=True)
+    return JSONRPCResponse(jsonrpc="2.0", id=1, result=body).model_dump_json(by_alias=True, exclude_none=True)
+
+
+def measure(mcp: FastMCP, tool: str, full: bool, repeat: int = 3) -> tuple[float, float, Any]:
+    out: list[Any] = []
+
+    async def run() -> None:
+        out.append(await respond(mcp, tool, full))
+
+    elapsed = float("inf")
+    for _ in range(repeat):
+        out.clear()
+        gc.collect()
+        started = time.perf_counter()
+        anyio.run(run)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    out.clear()
+    gc.collect()
+    tracemalloc.start()
+    anyio.run(run)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, out[0]
+
+
+def main() -> None:
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    tree = make_tree(5, max(2, round(12 * scale ** 0.2)))
+    verses = make_verses(int(20_000 * scale))
+    encoders = [("fastmcp", False, None)]
+    if responses._orjson() is not None:
+        encoders.append(("encoded (orjson)", True, None))
+    encoders.append(("encoded (json)", True, lambda: None))
+
+    print(f"{'tool':<24} {'encoder':<18} {'stage':<9} {'time':>9} {'peak':>10} {'size':>9}")
+    for tool in ("get_notions_tree", "get_verses_by_captions"):
+        for name, fast, orjson in encoders:
+            saved = responses._orjson
+            if orjson is not None:
+                responses._orjson = orjson
+            try:
+                mcp = make_server(tree, verses, fast)
+                for full in (False, True):
+                    elapsed, peak, out = measure(mcp, tool, full)
+                    size = f"{len(out) / 2**20:6.1f} MiB" if full else ""
+                    print(
+                        f"{tool:<24} {name:<18} {'response' if full else 'tool':<9} "
+                        f"{elapsed * 1000:6.0f} ms {peak / 2**20:6.1f} MiB {size:>9}"
+                    )
+            finally:
+                responses._orjson = saved
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare GraphBinary and GraphSON v3 on the results the tools fetch.
+
+Encodes synthetic Gremlin Server responses shaped like the tools' traversal
+results (as JanusGraph would send them) and measures, per serializer, the
+payload size and the time the driver takes to decode it.
+
+    python benchmarks/serializer_benchmark.py [SCALE]
+
+SCALE multiplies the number of rows of each shape (default 1).
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from gremlin_python.process.traversal import T, Traverser
+from gremlin_python.structure.graph import Edge, Vertex
+
+from theo_mcp_server.serializers import GRAPHBINARY, GRAPHSON, RelationIdentifier, message_serializer, response_message
+
+# Roughly the length of a Russian Synodal verse translation.
+VERSE_TEXT = "В начале было Слово, и Слово было у Бога, и Слово было Бог. " * 3
+
+
+def caption_lookup(n: int) -> list:
+    # read_vertex_with_edges: the vertex, then its edges grouped by label.
+    vertex = {T.id: 4096, T.label: "notion", "caption": "Grace", "description": "Unmerited favour", "type": "notion"}
+    group = {
+        label: [{"label": "verse", "id": 8192 + i, "caption": f"Eph 2:{i + 1}"} for i in range(10)]
+        for label in ("isSupportedBy", "refersTo", "contains")
+    }
+    return [vertex] * n + [group] * n
+
+
+def verses_by_captions(n: int) -> list:
+    return [
+        {
+            T.id: 8192 + i, T.label: "verse", "caption": f"Jn {i // 50 + 1}:{i % 50 + 1}", "RST": VERSE_TEXT,
+            "book": "John", "bookShort": "Jn", "chapter": i // 50 + 1, "verse": i % 50 + 1, "importIndex": i,
+        }
+        for i in range(200 * n)
+    ]
+
+
+def notions_tree(n: int) -> list:
+    # build_notion_groups_tree: group and notion captions, then the `contains` edges between them.
+    vertices = [
+        {T.id: 4096 + i, T.label: "notionGroup" if i < 50 * n else "notion", "caption": f"Node {i}"}
+        for i in range(500 * n)
+    ]
+    contains = [
+        {"id": str(RelationIdentifier(4096 + i % (50 * n), 12, 2000 + i, 4096 + i)), "from": 4096 + i % (50 * n), "to": 4096 + i}
+        for i in range(50 * n, 500 * n)
+    ]
+    return vertices + contains
+
+
+def search(n: int) -> list:
+    return [
+        {T.id: 4096 + i, T.label: "notion", "caption": f"Grace {i}", "description": "Unmerited favour " * 4}
+        for i in range(100 * n)
+    ]
+
+
+def subgraph(n: int) -> list:
+    # get_subgraph_by_captions: vertices with their outgoing edges, edge ids as strings.
+    return [
+        {
+            "id": 4096 + i, "label": "notion", "props": {"caption": [f"Notion {i}"]},
+            "out": [{"id": str(RelationIdentifier(4096 + i, 10, 1000 * i + j, 4097 + j)), "label": "refersTo", "to": 4097 + j} for j in range(5)],
+        }
+        for i in range(100 * n)
+    ]
+
+
+def edges(n: int) -> list:
+    # Elements returned directly, with JanusGraph relation ids.
+    return [
+        Edge(RelationIdentifier(4096 + i, 10, i + 1, 8192 + i), Vertex(4096 + i, "notion"), "refersTo", Vertex(8192 + i, "verse"))
+        for i in range(500 * n)
+    ]
+
+
+SHAPES = {
+    "caption lookup": caption_lookup,
+    "verses by captions": verses_by_captions,
+    "notions tree": notions_tree,
+    "search": search,
+    "subgraph": subgraph,
+    "edges (elements)": edges,
+}
+
+
+def decode_ms(serializer: str, payload: bytes, repeat: int = 5) -> float:
+    deserialize = message_serializer(serializer).deserialize_message
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        deserialize(payload)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+if __name__ == "__main__":
+    print(f"{'shape':<20} {'serializer':<12} {'bytes':>10} {'decode ms':>10}")
+    for name, make in SHAPES.items():
+        data = [Traverser(row) for row in make(SCALE)]
+        for serializer in (GRAPHBINARY, GRAPHSON):
+            payload = response_message(serializer, data)
+            print(f"{name:<20} {serializer:<12} {len(payload):>10} {decode_ms(serializer, payload):>10.2f}")
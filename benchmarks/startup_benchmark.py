@@ -0,0 +1,89 @@
+"""Import-time regression check for server startup.
+
+Runs `python -X importtime` on a fresh interpreter that imports the server
+and builds the FastMCP app (what a stdio session does before its first
+message), then prints the total and the slowest imports, and checks that the
+modules startup is meant to defer were not loaded.
+
+    python benchmarks/startup_benchmark.py [--runs 5] [--budget-ms 1500]
+
+Exits with status 1 if a deferred module was imported or the median total
+exceeds the budget.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+# Loaded only once a tool needs them.
+DEFERRED_MODULES = (
+    "aiohttp",
+    "gremlin_python.driver.aiohttp.transport",
+    "graphviz",
+    "theo_mcp_server.cloud_storage",
+    "theo_mcp_server.s3_storage",
+    "theo_mcp_server.upload_queue",
+)
+
+STARTUP_CODE = "import theo_mcp_server.server as s; s.create_mcp()"
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once() -> tuple[int, dict[str, int]]:
+    """Return (total µs of top-level imports, cumulative µs per module)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cum, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        cumulative[name] = cum
+        if indent == 1:  # top-level import of this interpreter
+            total += cum
+    return total, cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals = []
+    cumulative: dict[str, int] = {}
+    for _ in range(args.runs):
+        total, cumulative = run_once()
+        totals.append(total)
+    median_ms = statistics.median(totals) / 1000
+
+    print(f"startup imports: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(totals) / 1000:.0f}, max {max(totals) / 1000:.0f})")
+    print("slowest imports (cumulative, last run):")
+    for name, cum in sorted(cumulative.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    failed = False
+    loaded = [m for m in DEFERRED_MODULES if m in cumulative]
+    if loaded:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"FAIL: median {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Time property validation over many rows.
+
+Compares the per-call set arithmetic validation had before it was compiled
+(kept here as `_reference_validate`), the compiled per-row
+`validate_and_fix_properties` and the batch `validate_rows`, plus the batch
+`validate_relationships` used by `create_relationships`.
+
+    python benchmarks/validation_benchmark.py [N]
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from theo_mcp_server.schema import ALLOWED_EDGE_LABELS, ALLOWED_PROPS, REQUIRED_PROPS
+from theo_mcp_server.validation import (
+    normalize_edge_label,
+    validate_and_fix_properties,
+    validate_relationships,
+    validate_rows,
+)
+
+
+def _reference_validate(label, props, require_required=True):
+    allowed = ALLOWED_PROPS[label]
+    required = REQUIRED_PROPS[label]
+    unknown = set(props.keys()) - allowed
+    if unknown:
+        raise ValueError(f"Unknown properties for label '{label}': {sorted(unknown)}. Allowed: {sorted(allowed)}")
+    if require_required:
+        missing = required - set(props.keys())
+        if missing:
+            raise ValueError(f"Missing required properties for '{label}': {sorted(missing)}")
+    out = dict(props)
+    if label == "verse":
+        for k in ("chapter", "importIndex", "verse"):
+            if k in out and out[k] is not None:
+                out[k] = int(out[k])
+    return out
+
+
+def _reference_edge_label(edge_label):
+    if edge_label not in ALLOWED_EDGE_LABELS:
+        for e in ALLOWED_EDGE_LABELS:
+            if e.lower() == edge_label.lower():
+                return e
+        raise ValueError(edge_label)
+    return edge_label
+
+
+def timed(name: str, fn, repeat: int = 3) -> None:
+    best = min(_run(fn) for _ in range(repeat))
+    print(f"{name:<40} {best * 1000:8.1f} ms")
+
+
+def _run(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+if __name__ == "__main__":
+    rows = [
+        {"caption": f"Gen 1:{i}", "book": "Genesis", "bookShort": "Gen", "chapter": "1", "verse": str(i), "importIndex": i}
+        for i in range(N)
+    ]
+    edge_labels = ["issupportedby", "refersTo", "WRITTENBY", "contains"] * (N // 4)
+    relationships = [
+        {"relationship": label, "sourceCaption": f"a{i}", "targetCaption": f"b{i}"}
+        for i, label in enumerate(edge_labels)
+    ]
+    print(f"{N} verse rows, {len(edge_labels)} edge labels")
+    timed("reference validate (per row)", lambda: [_reference_validate("verse", r) for r in rows])
+    timed("validate_and_fix_properties (per row)", lambda: [validate_and_fix_properties("verse", r) for r in rows])
+    timed("validate_rows (batch)", lambda: validate_rows("verse", rows))
+    timed("reference edge label scan", lambda: [_reference_edge_label(e) for e in edge_labels])
+    timed("normalize_edge_label", lambda: [normalize_edge_label(e) for e in edge_labels])
+    timed("validate_relationships (batch)", lambda: validate_relationships(relationships))
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from .config import get_config
-from .server import app
+from .server import create_mcp
 
 
 def main() -> None:
     cfg = get_config()
-    app.run(transport=cfg.mcp_transport)
+    create_mcp().run(transport=cfg.mcp_transport)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+"""Admission control for tool calls.
+
+Tool calls are split into lanes: `read` (lookups), `write` (journaled
+mutations) and `heavy` (trees, diagrams, search, bulk operations). Each lane
+runs at most its configured number of calls at once, so a burst of heavy jobs
+from one agent cannot starve quick lookups from others. Calls over the limit
+wait in the lane's bounded queue; when a slot frees up, sessions take turns,
+so one client with many queued calls does not get ahead of the others. A
+call that finds the queue full, or waits longer than its time budget, is
+rejected with a "server busy" error the client can retry.
+
+Everything here runs on the event loop, so no locking is needed.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import anyio
+
+from .config import Config, get_config
+
+READ = "read"
+WRITE = "write"
+HEAVY = "heavy"
+
+# Tools that can run for long or touch many vertices.
+HEAVY_TOOLS = frozenset({
+    "get_notions_tree",
+    "get_notion_groups_tree",
+    "search_notion_groups_and_notions",
+    "create_diagram_by_captions",
+    "create_relationships",
+    "claim_next_quotations",
+    "export_mutations",
+    "replay_pending_mutations",
+})
+
+
+class AdmissionRejected(RuntimeError):
+    """The server is too busy to take the call now."""
+
+
+def lane_of(tool: str) -> str:
+    from .mutation_log import is_mutating_tool
+
+    if tool in HEAVY_TOOLS:
+        return HEAVY
+    return WRITE if is_mutating_tool(tool) else READ
+
+
+@dataclass
+class Lane:
+    name: str
+    limit: int
+    queue_size: int
+    running: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    # session -> its waiting calls, in arrival order; session order is the round-robin turn
+    waiters: OrderedDict[Any, deque[anyio.Event]] = field(default_factory=OrderedDict)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_ms_avg": round(1000 * self.wait_seconds_total / self.admitted, 3) if self.admitted else 0.0,
+            "wait_ms_max": round(1000 * self.wait_seconds_max, 3),
+        }
+
+
+class AdmissionController:
+    def __init__(self, limits: dict[str, int], queue_size: int) -> None:
+        self.lanes = {name: Lane(name, limit, queue_size) for name, limit in limits.items()}
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "AdmissionController":
+        return cls(
+            {
+                READ: cfg.admission_read_concurrency,
+                WRITE: cfg.admission_write_concurrency,
+                HEAVY: cfg.admission_heavy_concurrency,
+            },
+            cfg.admission_queue_size,
+        )
+
+    @asynccontextmanager
+    async def admit(self, lane_name: str, session: Any, timeout: float | None = None) -> AsyncIterator[None]:
+        """Hold a slot of `lane_name` for the block, waiting for one if needed."""
+        await self.acquire(lane_name, session, timeout)
+        try:
+            yield
+        finally:
+            self.release(lane_name)
+
+    async def acquire(self, lane_name: str, session: Any, timeout: float | None = None) -> None:
+        """Take a slot of `lane_name`, waiting for one if needed; pair with `release`."""
+        await self._acquire(self.lanes[lane_name], session, timeout)
+
+    def release(self, lane_name: str) -> None:
+        self._release(self.lanes[lane_name])
+
+    def stats(self) -> dict[str, Any]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    async def _acquire(self, lane: Lane, session: Any, timeout: float | None) -> None:
+        if lane.running < lane.limit and not lane.queued:
+            lane.running += 1
+            lane.admitted += 1
+            return
+        if lane.queued >= lane.queue_size:
+            lane.rejected += 1
+            raise AdmissionRejected(
+                f"Server busy: {lane.queued} {lane.name} calls already waiting; retry later"
+            )
+
+        granted = anyio.Event()
+        lane.waiters.setdefault(session, deque()).append(granted)
+        lane.queued += 1
+        started = time.monotonic()
+        try:
+            with anyio.fail_after(timeout):
+                await granted.wait()
+        except BaseException as e:
+            if granted.is_set():
+                self._release(lane)  # the slot was handed over just as we gave up
+            else:
+                self._forget(lane, session, granted)
+                if isinstance(e, TimeoutError):
+                    lane.timed_out += 1
+                    raise AdmissionRejected(
+                        f"Server busy: no free {lane.name} slot within {timeout:g}s; retry later"
+                    ) from None
+            raise
+        waited = time.monotonic() - started
+        lane.admitted += 1
+        lane.wait_seconds_total += waited
+        lane.wait_seconds_max = max(lane.wait_seconds_max, waited)
+
+    def _release(self, lane: Lane) -> None:
+        lane.running -= 1
+        if not lane.waiters:
+            return
+        # Next session in turn gets the slot; it goes to the back of the line if it has more calls waiting.
+        session, calls = lane.waiters.popitem(last=False)
+        granted = calls.popleft()
+        if calls:
+            lane.waiters[session] = calls
+        lane.queued -= 1
+        lane.running += 1
+        granted.set()
+
+    def _forget(self, lane: Lane, session: Any, granted: anyio.Event) -> None:
+        calls = lane.waiters.get(session)
+        if calls is not None:
+            calls.remove(granted)
+            if not calls:
+                del lane.waiters[session]
+        lane.queued -= 1
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController | None:
+    """The process-wide controller, or None when ADMISSION_CONTROL is off."""
+    global _controller
+    cfg = get_config()
+    if not cfg.admission_control:
+        return None
+    if _controller is None:
+        _controller = AdmissionController.from_config(cfg)
+    return _controller
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .config import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+# Change operations.
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One graph change made through the helper layer.
+
+    A vertex change carries the vertex id, label and caption; an edge change
+    carries `edge` = (edge label, from id, to id). `labels` lists every
+    vertex label whose cached reads the change can affect (e.g. both
+    endpoints of an edge, or the neighbours of a deleted vertex).
+    """
+
+    op: str
+    vertex_id: Any = None
+    label: str | None = None
+    caption: str | None = None
+    edge: tuple[str, Any, Any] | None = None
+    labels: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ChangeEvent":
+        edge = data.get("edge")
+        return cls(
+            op=data["op"],
+            vertex_id=data.get("vertex_id"),
+            label=data.get("label"),
+            caption=data.get("caption"),
+            edge=tuple(edge) if edge else None,
+            labels=tuple(data.get("labels") or ()),
+        )
+
+
+# Receives the new events, or None when events may have been missed and
+# everything derived from the graph should be dropped.
+Subscriber = Callable[[list[ChangeEvent] | None], None]
+
+
+class ChangeFeed:
+    """Change events shared by all server processes on this machine through files.
+
+    Publishers append JSON lines to the current segment file (one `O_APPEND`
+    write per batch); each process reads what others appended when `poll()`
+    is called, which caches do before serving a read. Events published by
+    this process reach its subscribers immediately, even if writing them to
+    the file fails. Plain files work with every transport and on every OS
+    the server runs on, and need no broker process.
+
+    Segments are named `<path>.<generation>`. When the current one grows
+    past `max_bytes` the publisher starts the next generation instead of
+    replacing the file, which Windows refuses while other processes have it
+    open; readers notice the new segment and tell their subscribers to drop
+    everything, since they cannot know what they missed. Rotating removes
+    older segments; on Windows one still open elsewhere is left for a later
+    rotation.
+    """
+
+    def __init__(self, path: str, *, max_bytes: int = 1 << 20) -> None:
+        self.path = path
+        self._dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(self._dir, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._origin = uuid.uuid4().hex
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+        generation = max(self._segments(), default=0)
+        self._generation = generation
+        self._writer = self._open_writer(generation)
+        self._reader_generation = generation
+        self._reader = self._open_reader(at_end=True)
+        self._partial = b""
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "ChangeFeed":
+        path = cfg.change_feed_path
+        if not path:
+            # One feed per graph: processes talking to the same server share it.
+            key = hashlib.sha256(f"{cfg.gremlin_url}/{cfg.gremlin_traversal_source}".encode()).hexdigest()[:16]
+            path = os.path.join(tempfile.gettempdir(), f"theo-mcp-changes-{key}.jsonl")
+        return cls(path)
+
+    def close(self) -> None:
+        with self._lock:
+            os.close(self._writer)
+            self._reader.close()
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def publish(self, events: list[ChangeEvent]) -> None:
+        if not events:
+            return
+        records = [{**asdict(e), "origin": self._origin} for e in events]
+        data = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records).encode("utf-8")
+        with self._lock:
+            subscribers = list(self._subscribers)
+        try:
+            with self._lock:
+                self._follow_writer()
+                os.write(self._writer, data)
+                if os.fstat(self._writer).st_size > self._max_bytes:
+                    self._rotate()
+        finally:
+            for subscriber in subscribers:
+                subscriber(list(events))
+
+    def poll(self) -> None:
+        """Deliver events other processes published since the last poll."""
+        with self._lock:
+            events: list[ChangeEvent] | None = []
+            latest = self._latest(self._reader_generation)
+            if latest != self._reader_generation:
+                # Rotated: whatever was appended to the old segment meanwhile may be lost.
+                self._reader.close()
+                self._reader_generation = latest
+                self._reader = self._open_reader(at_end=False)
+                self._partial = b""
+                events = None
+            for record in self._read_new():
+                if events is not None and record.get("origin") != self._origin:
+                    events.append(ChangeEvent.from_dict(record))
+            subscribers = list(self._subscribers)
+        if events is None or events:
+            for subscriber in subscribers:
+                subscriber(events)
+
+    # --- internals -----------------------------------------------------------
+
+    def _segment(self, generation: int) -> str:
+        return f"{self.path}.{generation}"
+
+    def _segments(self) -> dict[int, str]:
+        prefix = os.path.basename(self.path) + "."
+        found = {}
+        for name in os.listdir(self._dir):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                found[int(suffix)] = os.path.join(self._dir, name)
+        return found
+
+    def _latest(self, generation: int) -> int:
+        """Newest generation, given that `generation` was current when last checked."""
+        if os.path.exists(self._segment(generation)) and not os.path.exists(self._segment(generation + 1)):
+            return generation
+        # Rotated, possibly several times and with older segments already removed.
+        return max(self._segments(), default=generation)
+
+    def _open_writer(self, generation: int) -> int:
+        return os.open(self._segment(generation), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _open_reader(self, at_end: bool):
+        fd = os.open(self._segment(self._reader_generation), os.O_RDONLY | os.O_CREAT, 0o644)
+        reader = os.fdopen(fd, "rb")
+        if at_end:
+            reader.seek(0, os.SEEK_END)
+        return reader
+
+    def _follow_writer(self) -> None:
+        """Append to the newest segment, which another process may have started."""
+        latest = self._latest(self._generation)
+        if latest != self._generation:
+            writer = self._open_writer(latest)
+            os.close(self._writer)
+            self._writer = writer
+            self._generation = latest
+
+    def _rotate(self) -> None:
+        """Start the next segment; on failure log it and keep the current one."""
+        try:
+            writer = self._open_writer(self._generation + 1)
+        except OSError:
+            logger.warning("Could not rotate the change feed %s", self.path, exc_info=True)
+            return
+        os.close(self._writer)
+        self._writer = writer
+        self._generation += 1
+        try:
+            segments = self._segments()
+        except OSError:
+            return
+        for generation, segment in segments.items():
+            if generation < self._generation:
+                try:
+                    os.remove(segment)
+                except OSError:
+                    pass  # still open in another process (Windows); removed by a later rotation
+
+    def _read_new(self) -> list[dict[str, Any]]:
+        data = self._partial + self._reader.read()
+        lines = data.split(b"\n")
+        self._partial = lines.pop()  # incomplete last line, if any
+        return [json.loads(line) for line in lines if line]
+
+
+_feed: ChangeFeed | None = None
+_feed_lock = threading.Lock()
+
+
+def get_change_feed() -> ChangeFeed:
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = ChangeFeed.from_config(get_config())
+        return _feed
+
+
+def publish(*events: ChangeEvent) -> None:
+    """Publish changes made by the helper layer; never fails the mutation itself."""
+    try:
+        get_change_feed().publish(list(events))
+    except OSError:
+        logger.warning("Could not publish graph changes", exc_info=True)
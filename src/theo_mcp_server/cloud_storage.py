@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import http.client
 import json
+import os
 import ssl
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Protocol, runtime_checkable
-from urllib import request as urlrequest
-from urllib.error import HTTPError, URLError
-from urllib.parse import quote, urlencode
+from urllib.parse import quote, urlencode, urlsplit
 
 from .config import Config
 
@@ -33,6 +40,200 @@ class CloudStorage(Protocol):
         ...
 
 
+def content_addressed_filename(content: bytes | str, prefix: str = "", suffix: str = "") -> str:
+    """Name a file after the SHA-256 of its content, so identical files share a name."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return f"{prefix}{hashlib.sha256(content).hexdigest()}{suffix}"
+
+
+class CachedLinkStorage:
+    """`CloudStorage` wrapper that remembers the link of every uploaded filename.
+
+    Meant for content-addressed filenames (see `content_addressed_filename`):
+    the same name always means the same bytes, so a repeated upload is answered
+    from the cache without touching the backend at all.
+
+    A link is reused for at most `ttl` seconds, so a file deleted behind the
+    server's back is uploaded again before long. Backends whose links expire
+    (S3 presigned URLs) say so in `link_lifetime_seconds`; their links are
+    reused for at most half that, so every link handed out stays valid for at
+    least half its lifetime.
+    """
+
+    def __init__(self, inner: CloudStorage, max_entries: int = 1024, ttl: float = 3600.0) -> None:
+        self._inner = inner
+        self._max_entries = max_entries
+        lifetime = getattr(inner, "link_lifetime_seconds", None)
+        self._ttl = ttl if lifetime is None else min(ttl, lifetime / 2)
+        # filename -> (time.monotonic() after which the link is not reused, link)
+        self._links: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def upload(
+        self,
+        filename: str,
+        content: bytes | str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        with self._lock:
+            entry = self._links.get(filename)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._links.move_to_end(filename)
+                    return entry[1]
+                del self._links[filename]
+        link = self._inner.upload(filename, content, content_type=content_type)
+        with self._lock:
+            self._links[filename] = (time.monotonic() + self._ttl, link)
+            self._links.move_to_end(filename)
+            while len(self._links) > self._max_entries:
+                self._links.popitem(last=False)
+        return link
+
+    def delete(self, filename: str) -> bool:
+        with self._lock:
+            self._links.pop(filename, None)
+        return self._inner.delete(filename)
+
+    def close(self) -> None:
+        close = getattr(self._inner, "close", None)
+        if close is not None:
+            close()
+
+
+# Storage backend name (Config.storage_backend) -> factory.
+STORAGE_BACKENDS: dict[str, Callable[[Config], CloudStorage]] = {}
+
+
+def register_storage_backend(name: str):
+    """Decorator registering a `CloudStorage` factory under `name`."""
+    def decorator(factory: Callable[[Config], CloudStorage]) -> Callable[[Config], CloudStorage]:
+        STORAGE_BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+def create_cloud_storage(cfg: Config) -> CloudStorage:
+    """Build the storage backend selected by `cfg.storage_backend`."""
+    factory = STORAGE_BACKENDS.get(cfg.storage_backend)
+    if factory is None:
+        raise ValueError(
+            f"Unknown storage backend '{cfg.storage_backend}'. Allowed: {sorted(STORAGE_BACKENDS)}"
+        )
+    if cfg.storage_link_cache_ttl <= 0:
+        return factory(cfg)
+    return CachedLinkStorage(factory(cfg), ttl=cfg.storage_link_cache_ttl)
+
+
+@dataclass(frozen=True)
+class RequestTiming:
+    """Wall-clock duration of one HTTP request made by a storage client."""
+    method: str
+    path: str
+    status: int  # 0 if the request failed before a response arrived
+    seconds: float
+
+
+class _HTTPStatusError(Exception):
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode(errors="replace")
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to a single host, reused across requests.
+
+    `urllib` opens (and TLS-handshakes) a new connection per request; this pool
+    hands idle `http.client` connections back out instead. A connection that
+    the server closed while idle is detected on first use and replaced once.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int | None,
+        *,
+        ssl_context: ssl.SSLContext | None = None,
+        max_idle: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        self._scheme = scheme
+        self._host = host
+        self._port = port
+        self._ssl_context = ssl_context
+        self._max_idle = max_idle
+        self._timeout = timeout
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(
+                self._host, self._port, timeout=self._timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str]
+    ) -> tuple[int, bytes]:
+        conn, reused = self._acquire()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped the idle keep-alive connection; retry once fresh.
+            conn = self._new_connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+
+        try:
+            data = resp.read()  # must be drained before the connection is reused
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return resp.status, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
 class OwnCloudStorage:
     """`CloudStorage` backed by an ownCloud Infinite Scale (oCIS) instance.
 
@@ -42,6 +243,11 @@ class OwnCloudStorage:
     (`PUT /remote.php/dav/files/...`) and then creates a public share link
     through the OCS Share API, returning a direct download URL. Uses only the
     standard library so it adds no new dependency.
+
+    Requests go over a small pool of keep-alive connections, and the remote
+    folder is created (MKCOL) only once per instance — again only if a later
+    PUT reports it missing (404/409). Recent request durations are kept in
+    `request_timings`.
     """
 
     def __init__(
@@ -52,6 +258,7 @@ class OwnCloudStorage:
         *,
         remote_dir: str = "theo-diagrams",
         verify_ssl: bool = False,
+        timeout: float = 30.0,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._username = username
@@ -61,6 +268,18 @@ class OwnCloudStorage:
         # self-signed certificate, so verification is off by default.
         self._ssl_context = None if verify_ssl else ssl._create_unverified_context()
 
+        parts = urlsplit(self._base_url)
+        self._base_path = parts.path.rstrip("/")
+        self._pool = _ConnectionPool(
+            parts.scheme or "https",
+            parts.hostname or "localhost",
+            parts.port,
+            ssl_context=self._ssl_context,
+            timeout=timeout,
+        )
+        self._remote_dir_ready = False
+        self.request_timings: deque[RequestTiming] = deque(maxlen=100)
+
     @classmethod
     def from_config(cls, cfg: Config) -> "OwnCloudStorage":
         return cls(
@@ -71,64 +290,83 @@ class OwnCloudStorage:
             verify_ssl=cfg.owncloud_verify_ssl,
         )
 
+    def close(self) -> None:
+        self._pool.close()
+
     # --- internals -----------------------------------------------------------
 
     def _auth_header(self) -> str:
         creds = base64.b64encode(f"{self._username}:{self._token}".encode()).decode()
         return f"Basic {creds}"
 
-    def _request(self, method: str, url: str, *, data: bytes | None = None,
-                 headers: dict[str, str] | None = None):
-        req = urlrequest.Request(url, data=data, method=method)
-        req.add_header("Authorization", self._auth_header())
-        for key, value in (headers or {}).items():
-            req.add_header(key, value)
-        return urlrequest.urlopen(req, context=self._ssl_context)
-
-    def _dav_url(self, remote_path: str) -> str:
-        return (
-            f"{self._base_url}/remote.php/dav/files/"
-            f"{quote(self._username)}/{quote(remote_path)}"
-        )
+    def _request(self, method: str, path: str, *, data: bytes | None = None,
+                 headers: dict[str, str] | None = None) -> bytes:
+        """Send a request for `path` (relative to the base URL) and return the body.
+
+        Raises `_HTTPStatusError` for 4xx/5xx responses and `OSError` for
+        transport failures.
+        """
+        all_headers = {"Authorization": self._auth_header(), **(headers or {})}
+        full_path = f"{self._base_path}{path}"
+        status = 0
+        started = time.perf_counter()
+        try:
+            status, body = self._pool.request(method, full_path, data, all_headers)
+        finally:
+            self.request_timings.append(
+                RequestTiming(method, full_path, status, time.perf_counter() - started)
+            )
+        if status >= 400:
+            raise _HTTPStatusError(status, body)
+        return body
+
+    def _dav_path(self, remote_path: str) -> str:
+        return f"/remote.php/dav/files/{quote(self._username)}/{quote(remote_path)}"
+
+    def _remote_path(self, filename: str) -> str:
+        return f"{self._remote_dir}/{filename}" if self._remote_dir else filename
 
     def _ensure_remote_dir(self) -> None:
-        if not self._remote_dir:
+        if not self._remote_dir or self._remote_dir_ready:
             return
         try:
-            self._request("MKCOL", self._dav_url(self._remote_dir))
-        except HTTPError as e:
+            self._request("MKCOL", self._dav_path(self._remote_dir))
+        except _HTTPStatusError as e:
             # 405 Method Not Allowed => the collection already exists.
-            if e.code != 405:
-                raise RuntimeError(
-                    f"ownCloud MKCOL failed ({e.code}): "
-                    f"{e.read().decode(errors='replace')}"
-                ) from e
-        except URLError as e:
-            raise RuntimeError(f"ownCloud MKCOL failed: {e.reason}") from e
+            if e.status != 405:
+                raise RuntimeError(f"ownCloud MKCOL failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"ownCloud MKCOL failed: {e}") from e
+        self._remote_dir_ready = True
+
+    def _put(self, remote_path: str, content: bytes, content_type: str) -> None:
+        self._request(
+            "PUT",
+            self._dav_path(remote_path),
+            data=content,
+            headers={"Content-Type": content_type},
+        )
 
     def _create_public_link(self, remote_path: str) -> str:
-        url = f"{self._base_url}/ocs/v1.php/apps/files_sharing/api/v1/shares?format=json"
+        path = "/ocs/v1.php/apps/files_sharing/api/v1/shares?format=json"
         body = urlencode(
             {"path": f"/{remote_path}", "shareType": "3", "permissions": "1"}
         ).encode()
         try:
-            resp = self._request(
+            raw = self._request(
                 "POST",
-                url,
+                path,
                 data=body,
                 headers={
                     "OCS-APIRequest": "true",
                     "Content-Type": "application/x-www-form-urlencoded",
                 },
             )
-            payload = json.loads(resp.read().decode())
-        except HTTPError as e:
-            raise RuntimeError(
-                f"ownCloud share creation failed ({e.code}): "
-                f"{e.read().decode(errors='replace')}"
-            ) from e
-        except URLError as e:
-            raise RuntimeError(f"ownCloud share creation failed: {e.reason}") from e
+            payload = json.loads(raw.decode())
+        except _HTTPStatusError as e:
+            raise RuntimeError(f"ownCloud share creation failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"ownCloud share creation failed: {e}") from e
 
         share_url = payload.get("ocs", {}).get("data", {}).get("url")
         if not share_url:
@@ -147,36 +385,93 @@ class OwnCloudStorage:
             content = content.encode("utf-8")
 
         self._ensure_remote_dir()
-        remote_path = f"{self._remote_dir}/{filename}" if self._remote_dir else filename
+        remote_path = self._remote_path(filename)
         try:
-            self._request(
-                "PUT",
-                self._dav_url(remote_path),
-                data=content,
-                headers={"Content-Type": content_type},
-            )
-        except HTTPError as e:
-            raise RuntimeError(
-                f"ownCloud upload failed ({e.code}): "
-                f"{e.read().decode(errors='replace')}"
-            ) from e
-        except URLError as e:
-            raise RuntimeError(f"ownCloud upload failed: {e.reason}") from e
+            try:
+                self._put(remote_path, content, content_type)
+            except _HTTPStatusError as e:
+                # 404/409 => the remote folder vanished since we created it.
+                if e.status not in (404, 409) or not self._remote_dir:
+                    raise
+                self._remote_dir_ready = False
+                self._ensure_remote_dir()
+                self._put(remote_path, content, content_type)
+        except _HTTPStatusError as e:
+            raise RuntimeError(f"ownCloud upload failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"ownCloud upload failed: {e}") from e
 
         return self._create_public_link(remote_path)
 
     def delete(self, filename: str) -> bool:
-        remote_path = f"{self._remote_dir}/{filename}" if self._remote_dir else filename
         try:
-            self._request("DELETE", self._dav_url(remote_path))
-        except HTTPError as e:
+            self._request("DELETE", self._dav_path(self._remote_path(filename)))
+        except _HTTPStatusError as e:
             # 404 Not Found => already gone; treat as success.
-            if e.code == 404:
+            if e.status == 404:
                 return True
-            raise RuntimeError(
-                f"ownCloud delete failed ({e.code}): "
-                f"{e.read().decode(errors='replace')}"
-            ) from e
-        except URLError as e:
-            raise RuntimeError(f"ownCloud delete failed: {e.reason}") from e
+            raise RuntimeError(f"ownCloud delete failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"ownCloud delete failed: {e}") from e
+        return True
+
+
+class LocalFileStorage:
+    """`CloudStorage` that writes files into a local directory.
+
+    Links point at `base_url`, which is expected to serve that directory — the
+    server does so itself under `/files/` when run with the streamable-http
+    transport (see `server.create_mcp`). Needs no network at all, which also
+    makes it the backend of choice for benchmarks.
+    """
+
+    def __init__(self, directory: str, base_url: str) -> None:
+        self._directory = Path(directory)
+        self._base_url = base_url.rstrip("/")
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "LocalFileStorage":
+        return cls(cfg.local_storage_dir, cfg.local_storage_base_url)
+
+    def path_for(self, filename: str) -> Path:
+        """Return the local path of `filename`, rejecting anything outside the directory."""
+        if not filename or filename != os.path.basename(filename) or filename in (".", ".."):
+            raise ValueError(f"Invalid filename: {filename!r}")
+        return self._directory / filename
+
+    def upload(
+        self,
+        filename: str,
+        content: bytes | str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        path = self.path_for(filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial file.
+        tmp = path.with_name(f".{filename}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)
+        return f"{self._base_url}/{quote(filename)}"
+
+    def delete(self, filename: str) -> bool:
+        self.path_for(filename).unlink(missing_ok=True)
         return True
+
+
+@register_storage_backend("owncloud")
+def _owncloud_backend(cfg: Config) -> CloudStorage:
+    return OwnCloudStorage.from_config(cfg)
+
+
+@register_storage_backend("local")
+def _local_backend(cfg: Config) -> CloudStorage:
+    return LocalFileStorage.from_config(cfg)
+
+
+@register_storage_backend("s3")
+def _s3_backend(cfg: Config) -> CloudStorage:
+    from .s3_storage import S3Storage
+
+    return S3Storage.from_config(cfg)
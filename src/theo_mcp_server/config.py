@@ -2,9 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from dotenv import load_dotenv
-
-load_dotenv()
+from functools import cache
 
 @dataclass(frozen=True)
 class Config:
@@ -12,13 +10,58 @@ class Config:
     gremlin_traversal_source: str = "g"
     gremlin_username: str = "username"
     gremlin_password: str = "password"
+    gremlin_connect_eagerly: bool = False  # connect at startup instead of on the first tool call
+    gremlin_serializer: str = "graphbinary"  # or "graphson" (GraphSON v3)
+    gremlin_read_urls: str = ""  # comma-separated nodes for read traversals; empty = the write nodes
+    gremlin_write_urls: str = ""  # comma-separated nodes for writes, in failover order; empty = gremlin_url
+    gremlin_read_balance: str = "least_latency"  # or "round_robin"
+    gremlin_health_check_interval: float = 10.0  # seconds before a failed node is probed again
+    janusgraph_graph_name: str = "graph"  # server-side graph binding, used to read index metadata
     mcp_transport: str = "stdio"  # or "streamable-http"
+    storage_backend: str = "owncloud"  # or "local", "s3"
     owncloud_url: str = "https://localhost:9200/"
     owncloud_username: str = ""
     owncloud_password: str = ""
     owncloud_token: str = ""  # oCIS app token / OIDC bearer token
     owncloud_remote_dir: str = "theo-diagrams"
     owncloud_verify_ssl: bool = False
+    local_storage_dir: str = "diagrams"
+    local_storage_base_url: str = "http://127.0.0.1:8000/files"
+    s3_endpoint: str = "http://localhost:9000"
+    s3_bucket: str = "theo-diagrams"
+    s3_access_key: str = ""
+    s3_secret_key: str = ""
+    s3_region: str = "us-east-1"
+    s3_prefix: str = ""
+    s3_public_url: str = ""  # if empty, links are presigned URLs (valid 7 days)
+    s3_verify_ssl: bool = True
+    storage_link_cache_ttl: float = 3600.0  # seconds an uploaded file's link is reused; 0 disables the link cache
+    upload_workers: int = 2  # concurrent background diagram uploads
+    upload_max_pending: int = 100  # queued uploads beyond which new ones are rejected
+    upload_max_retries: int = 3
+    upload_retry_backoff: float = 1.0  # seconds before the first retry; doubles per retry
+    mutation_log_path: str = ""  # journal of mutating tool calls; empty disables it
+    mutation_log_fsync_interval: float = 0.1  # seconds between batched fsyncs; 0 fsyncs every record
+    change_feed_path: str = ""  # file shared by server processes for change events; empty = per-graph temp file
+    admission_control: bool = True  # limit concurrent tool calls per lane (read, write, heavy)
+    admission_read_concurrency: int = 16
+    admission_write_concurrency: int = 4
+    admission_heavy_concurrency: int = 2
+    admission_queue_size: int = 64  # calls waiting per lane beyond which new ones are rejected
+    tool_timeout_seconds: float = 30.0  # time budget of a tool call's traversals; 0 = unbounded
+    tool_timeouts: str = ""  # per-tool budgets overriding the defaults, e.g. "get_notions_tree=300,search_notion_groups_and_notions=90"
+    result_cache_max_bytes: int = 32 << 20  # read traversal results kept in memory; 0 disables the cache
+    result_cache_ttl: float = 300.0  # seconds a cached traversal result is served
+    slow_query_threshold_ms: float = 1000.0  # traversals slower than this are logged and profiled; 0 disables
+    slow_query_log_path: str = ""  # JSON-lines slow query log; empty = per-graph temp file
+    slow_query_log_max_bytes: int = 1 << 20  # size at which the log is rotated (one old file is kept)
+    snapshot_path: str = ""  # local copy of the graph served while it is unavailable; empty = per-graph temp file
+    snapshot_refresh_interval: float = 0.0  # seconds between snapshot refreshes; 0: no snapshot is taken
+    fast_responses: bool = True  # pre-encode large tool results (orjson if installed) instead of FastMCP's conversion
+    sidecar_enabled: bool = False  # run traversals and caches in a local sidecar shared by stdio processes
+    sidecar_address: str = ""  # Unix socket path or Windows pipe name; empty = per-graph default
+    sidecar_pool_size: int = 4  # Gremlin connections held by the sidecar
+    sidecar_idle_timeout: float = 900.0  # seconds without clients before the sidecar exits
 
 def _env(name: str, default: str) -> str:
     v = os.getenv(name)
@@ -30,17 +73,78 @@ def _env_bool(name: str, default: bool) -> bool:
         return default
     return v.strip().lower() in ("1", "true", "yes", "on")
 
+def _env_int(name: str, default: int) -> int:
+    v = os.getenv(name)
+    return int(v) if v not in (None, "") else default
+
+def _env_float(name: str, default: float) -> float:
+    v = os.getenv(name)
+    return float(v) if v not in (None, "") else default
+
+@cache
+def _load_dotenv() -> None:
+    # Read .env once, on the first get_config() call rather than at import time.
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
 def get_config() -> Config:
+    _load_dotenv()
     return Config(
         gremlin_url=_env("GREMLIN_URL", "ws://localhost:8182/gremlin"),
         gremlin_traversal_source=_env("GREMLIN_TRAVERSAL_SOURCE", "g"),
         gremlin_username=_env("GREMLIN_USERNAME", "username"),
         gremlin_password=_env("GREMLIN_PASSWORD", "password"),
+        gremlin_connect_eagerly=_env_bool("GREMLIN_CONNECT_EAGERLY", False),
+        gremlin_serializer=_env("GREMLIN_SERIALIZER", "graphbinary"),
+        gremlin_read_urls=_env("GREMLIN_READ_URLS", ""),
+        gremlin_write_urls=_env("GREMLIN_WRITE_URLS", ""),
+        gremlin_read_balance=_env("GREMLIN_READ_BALANCE", "least_latency"),
+        gremlin_health_check_interval=_env_float("GREMLIN_HEALTH_CHECK_INTERVAL", 10.0),
+        janusgraph_graph_name=_env("JANUSGRAPH_GRAPH_NAME", "graph"),
         mcp_transport=_env("MCP_TRANSPORT", "stdio"),
+        storage_backend=_env("STORAGE_BACKEND", "owncloud"),
         owncloud_url=_env("OWNCLOUD_URL", "https://localhost:9200/"),
         owncloud_username=_env("OWNCLOUD_USERNAME", ""),
         owncloud_password=_env("OWNCLOUD_PASSWORD", ""),
         owncloud_token=_env("OWNCLOUD_TOKEN", ""),
         owncloud_remote_dir=_env("OWNCLOUD_REMOTE_DIR", "theo-diagrams"),
         owncloud_verify_ssl=_env_bool("OWNCLOUD_VERIFY_SSL", False),
+        local_storage_dir=_env("LOCAL_STORAGE_DIR", "diagrams"),
+        local_storage_base_url=_env("LOCAL_STORAGE_BASE_URL", "http://127.0.0.1:8000/files"),
+        s3_endpoint=_env("S3_ENDPOINT", "http://localhost:9000"),
+        s3_bucket=_env("S3_BUCKET", "theo-diagrams"),
+        s3_access_key=_env("S3_ACCESS_KEY", ""),
+        s3_secret_key=_env("S3_SECRET_KEY", ""),
+        s3_region=_env("S3_REGION", "us-east-1"),
+        s3_prefix=_env("S3_PREFIX", ""),
+        s3_public_url=_env("S3_PUBLIC_URL", ""),
+        s3_verify_ssl=_env_bool("S3_VERIFY_SSL", True),
+        storage_link_cache_ttl=_env_float("STORAGE_LINK_CACHE_TTL", 3600.0),
+        upload_workers=_env_int("UPLOAD_WORKERS", 2),
+        upload_max_pending=_env_int("UPLOAD_MAX_PENDING", 100),
+        upload_max_retries=_env_int("UPLOAD_MAX_RETRIES", 3),
+        upload_retry_backoff=_env_float("UPLOAD_RETRY_BACKOFF", 1.0),
+        mutation_log_path=_env("MUTATION_LOG_PATH", ""),
+        mutation_log_fsync_interval=_env_float("MUTATION_LOG_FSYNC_INTERVAL", 0.1),
+        change_feed_path=_env("CHANGE_FEED_PATH", ""),
+        admission_control=_env_bool("ADMISSION_CONTROL", True),
+        admission_read_concurrency=_env_int("ADMISSION_READ_CONCURRENCY", 16),
+        admission_write_concurrency=_env_int("ADMISSION_WRITE_CONCURRENCY", 4),
+        admission_heavy_concurrency=_env_int("ADMISSION_HEAVY_CONCURRENCY", 2),
+        admission_queue_size=_env_int("ADMISSION_QUEUE_SIZE", 64),
+        tool_timeout_seconds=_env_float("TOOL_TIMEOUT_SECONDS", 30.0),
+        tool_timeouts=_env("TOOL_TIMEOUTS", ""),
+        result_cache_max_bytes=_env_int("RESULT_CACHE_MAX_BYTES", 32 << 20),
+        result_cache_ttl=_env_float("RESULT_CACHE_TTL", 300.0),
+        slow_query_threshold_ms=_env_float("SLOW_QUERY_THRESHOLD_MS", 1000.0),
+        slow_query_log_path=_env("SLOW_QUERY_LOG_PATH", ""),
+        slow_query_log_max_bytes=_env_int("SLOW_QUERY_LOG_MAX_BYTES", 1 << 20),
+        snapshot_path=_env("SNAPSHOT_PATH", ""),
+        snapshot_refresh_interval=_env_float("SNAPSHOT_REFRESH_INTERVAL", 0.0),
+        fast_responses=_env_bool("FAST_RESPONSES", True),
+        sidecar_enabled=_env_bool("SIDECAR", False),
+        sidecar_address=_env("SIDECAR_ADDRESS", ""),
+        sidecar_pool_size=_env_int("SIDECAR_POOL_SIZE", 4),
+        sidecar_idle_timeout=_env_float("SIDECAR_IDLE_TIMEOUT", 900.0),
     )
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
-from typing import Any
-
-import graphviz
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from gremlin_python.process.graph_traversal import GraphTraversalSource
 
 from .gremlin_helpers import get_subgraph_by_captions
 
+if TYPE_CHECKING:
+    import graphviz
+
+    from .shared_cache import SharedCache
+
 
 _NODE_STYLE: dict[str, dict[str, str]] = {
     "notion":       {"shape": "ellipse",    "fillcolor": "#fff3b0", "style": "filled"},
@@ -35,6 +42,48 @@ _DEFAULT_EDGE_STYLE = {"style": "solid", "color": "#999999"}
 VALID_LAYOUTS = {"dot", "neato", "sfdp", "circo", "fdp", "twopi"}
 VALID_DIRECTIONS = {"LR", "TB", "RL", "BT"}
 
+# How many diagram sessions (and their stored layouts) are kept per server.
+MAX_DIAGRAM_SESSIONS = 64
+
+# Seconds a rendered diagram stays in the shared cache. Entries are keyed by
+# everything the render depends on, so graph changes never make them stale.
+RENDER_CACHE_TTL = 3600.0
+
+
+@dataclass
+class DiagramSession:
+    """Layout state kept between redraws of the same diagram.
+
+    `positions` maps a Graphviz node id (the vertex internal id) to its
+    centre in points, as reported by the previous layout run. Nodes found
+    there are pinned on the next render, so only new nodes get placed.
+    """
+    session_id: str
+    layout: str
+    direction: str
+    positions: dict[str, tuple[float, float]] = field(default_factory=dict)
+
+
+def get_or_create_session(
+    sessions: "OrderedDict[str, DiagramSession]",
+    session_id: str,
+    layout: str,
+    direction: str,
+) -> DiagramSession:
+    """Return the session for `session_id`, creating (or resetting) it as needed.
+
+    Positions from a different layout engine or direction are meaningless for
+    the new one, so such a session starts over with an empty layout.
+    """
+    session = sessions.get(session_id)
+    if session is None or session.layout != layout or session.direction != direction:
+        session = DiagramSession(session_id=session_id, layout=layout, direction=direction)
+        sessions[session_id] = session
+    sessions.move_to_end(session_id)
+    while len(sessions) > MAX_DIAGRAM_SESSIONS:
+        sessions.popitem(last=False)
+    return session
+
 
 def _wrap_caption(text: str, width: int = 24) -> str:
     """Soft-wrap a caption into multiple lines for nicer node labels."""
@@ -74,16 +123,20 @@ def _wrap_text(text: str, width: int = 40) -> str:
     return "\n".join(lines)
 
 
-def render_svg(
+def _build_digraph(
     vertices: list[dict[str, Any]],
     edges: list[dict[str, Any]],
     layout: str,
     direction: str,
     include_edge_labels: bool,
-    show_quotation_text: bool = False,
-    show_verse_text: list[str] | None = None,
-    show_ids: bool = False,
-) -> str:
+    show_quotation_text: bool,
+    show_verse_text: list[str] | None,
+    show_ids: bool,
+    pinned: dict[str, str] | None = None,
+) -> graphviz.Digraph:
+    # Imported here: sessions that never draw a diagram do not load graphviz.
+    import graphviz
+
     dot = graphviz.Digraph(engine=layout, format="svg")
     dot.attr(rankdir=direction, bgcolor="white", overlap="false", splines="true", pad="0.4")
     dot.attr("node", fontname="Helvetica", fontsize="11")
@@ -110,15 +163,24 @@ def render_svg(
             extra += f"\n[id: {v['internal_id']}]"
         label = caption + extra
         style = _NODE_STYLE.get(vertex_label, _DEFAULT_NODE_STYLE)
-        dot.node(node_id, label=label, **style)
+        if pinned and node_id in pinned:
+            dot.node(node_id, label=label, pos=pinned[node_id], **style)
+        else:
+            dot.node(node_id, label=label, **style)
 
     for e in edges:
         style = _EDGE_STYLE.get(e["label"], _DEFAULT_EDGE_STYLE)
         edge_label = e["label"] if include_edge_labels else ""
         dot.edge(str(e["from_id"]), str(e["to_id"]), label=edge_label, fontcolor=style["color"], **style)
 
+    return dot
+
+
+def _pipe(dot: graphviz.Digraph, fmt: str, **kwargs: Any) -> str:
+    import graphviz
+
     try:
-        svg = dot.pipe(format="svg").decode("utf-8")
+        return dot.pipe(format=fmt, **kwargs).decode("utf-8")
     except graphviz.backend.execute.ExecutableNotFound:
         raise ValueError(
             "Graphviz executable not found. "
@@ -126,6 +188,8 @@ def render_svg(
             "https://graphviz.org/download/"
         )
 
+
+def _postprocess_svg(svg: str) -> str:
     # Make the SVG responsive: replace Graphviz's fixed pt dimensions with
     # width="100%" and no height so the SVG scales freely inside its container
     # while preserving aspect ratio via the existing viewBox attribute.
@@ -139,6 +203,99 @@ def render_svg(
     return svg
 
 
+def _parse_json_positions(layout_json: str) -> dict[str, tuple[float, float]]:
+    """Extract node centres (in points) from Graphviz `-Tjson` output."""
+    positions: dict[str, tuple[float, float]] = {}
+    for obj in json.loads(layout_json).get("objects", []):
+        pos = obj.get("pos")
+        if not pos or "nodes" in obj:  # clusters/subgraphs carry a `nodes` list
+            continue
+        x, y = pos.split(",")[:2]
+        positions[str(obj["name"])] = (float(x), float(y))
+    return positions
+
+
+def render_svg(
+    vertices: list[dict[str, Any]],
+    edges: list[dict[str, Any]],
+    layout: str,
+    direction: str,
+    include_edge_labels: bool,
+    show_quotation_text: bool = False,
+    show_verse_text: list[str] | None = None,
+    show_ids: bool = False,
+    session: DiagramSession | None = None,
+    cache: SharedCache | None = None,
+) -> str:
+    """Render the subgraph as SVG.
+
+    Without a `session` the whole graph is laid out from scratch by `layout`.
+    With a session the layout is incremental: nodes placed by an earlier
+    render keep their positions, only new nodes are laid out (by `neato`
+    around the pinned ones), and the final SVG is produced by `neato -n`,
+    which skips node placement entirely. When nothing new was added the
+    layout pass is skipped as well.
+
+    Renders that start from scratch (no session, or a session with no
+    positions yet) depend only on the arguments and are kept in `cache`, so
+    another process drawing the same diagram skips Graphviz altogether.
+    """
+    style_args = (include_edge_labels, show_quotation_text, show_verse_text, show_ids)
+
+    if cache is None or (session is not None and session.positions):
+        return _render_svg(vertices, edges, layout, direction, style_args, session)
+
+    key = "svg:" + hashlib.sha256(
+        json.dumps(
+            [vertices, edges, layout, direction, style_args, session is None],
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    ).hexdigest()
+    hit = cache.get(key)
+    if hit is not None:
+        svg, positions = hit
+        if session is not None:
+            session.positions = {n: tuple(p) for n, p in positions.items()}
+        return svg
+    svg = _render_svg(vertices, edges, layout, direction, style_args, session)
+    cache.set(key, (svg, session.positions if session is not None else {}), RENDER_CACHE_TTL)
+    return svg
+
+
+def _render_svg(
+    vertices: list[dict[str, Any]],
+    edges: list[dict[str, Any]],
+    layout: str,
+    direction: str,
+    style_args: tuple[Any, ...],
+    session: DiagramSession | None,
+) -> str:
+    if session is None:
+        dot = _build_digraph(vertices, edges, layout, direction, *style_args)
+        return _postprocess_svg(_pipe(dot, "svg"))
+
+    node_ids = [str(v["internal_id"]) for v in vertices]
+    known = {n: session.positions[n] for n in node_ids if n in session.positions}
+
+    if len(known) < len(node_ids):
+        if known:
+            # neato reads input positions in inches; a trailing "!" pins the node.
+            pinned = {n: f"{x / 72:.4f},{y / 72:.4f}!" for n, (x, y) in known.items()}
+            dot = _build_digraph(vertices, edges, "neato", direction, *style_args, pinned=pinned)
+        else:
+            dot = _build_digraph(vertices, edges, layout, direction, *style_args)
+        known = _parse_json_positions(_pipe(dot, "json"))
+
+    # Only keep positions of nodes that are still on the diagram.
+    session.positions = {n: known[n] for n in node_ids if n in known}
+
+    # With -n, neato takes positions as given (in points) and only routes edges.
+    pinned = {n: f"{x:.2f},{y:.2f}!" for n, (x, y) in session.positions.items()}
+    dot = _build_digraph(vertices, edges, "neato", direction, *style_args, pinned=pinned)
+    return _postprocess_svg(_pipe(dot, "svg", neato_no_op=True))
+
+
 def create_diagram_by_captions(
     g: GraphTraversalSource,
     captions: list[str],
@@ -148,8 +305,14 @@ def create_diagram_by_captions(
     show_quotation_text: bool = False,
     show_verse_text: list[str] | None = None,
     show_ids: bool = False,
+    session: DiagramSession | None = None,
+    cache: SharedCache | None = None,
 ) -> str:
-    """Build an SVG diagram of the induced subgraph for the given vertex captions."""
+    """Build an SVG diagram of the induced subgraph for the given vertex captions.
+
+    Pass a `session` to reuse the node positions of its previous render, and a
+    `cache` to share fresh renders between processes (see `render_svg`).
+    """
     if layout not in VALID_LAYOUTS:
         raise ValueError(f"Invalid layout: {layout}. Must be one of: {', '.join(sorted(VALID_LAYOUTS))}")
     if direction not in VALID_DIRECTIONS:
@@ -157,7 +320,13 @@ def create_diagram_by_captions(
     if not captions:
         raise ValueError("captions must be a non-empty list")
 
-    subgraph = get_subgraph_by_captions(g, captions)
+    # Fetch only what the renderer shows; verse translations and quotation
+    # texts can be large and are skipped unless requested.
+    properties = ["caption"]
+    if show_quotation_text:
+        properties.append("text")
+    properties.extend(show_verse_text or [])
+    subgraph = get_subgraph_by_captions(g, captions, properties=properties)
 
     if subgraph["missing"]:
         raise ValueError(f"Vertices not found for captions: {subgraph['missing']}")
@@ -165,12 +334,14 @@ def create_diagram_by_captions(
         raise ValueError(f"Ambiguous captions (multiple matches): {subgraph['ambiguous']}")
 
     return render_svg(
-        vertices=subgraph["vertices"],
-        edges=subgraph["edges"],
+        vertices=subgraph["vertices"].to_dicts(),
+        edges=subgraph["edges"].to_dicts(),
         layout=layout,
         direction=direction,
         include_edge_labels=include_edge_labels,
         show_quotation_text=show_quotation_text,
         show_verse_text=show_verse_text,
         show_ids=show_ids,
+        session=session,
+        cache=cache,
     )
@@ -1,76 +1,212 @@
 from __future__ import annotations
 
+import logging
+import threading
+from collections import OrderedDict
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
-from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
-from gremlin_python.driver.aiohttp.transport import AiohttpTransport
-from gremlin_python.process.anonymous_traversal import traversal
-from gremlin_python.process.graph_traversal import GraphTraversalSource
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
 
-from .cloud_storage import CloudStorage, OwnCloudStorage
 from .config import get_config
+from .indexes import read_graph_indexes, set_graph_indexes
+
+if TYPE_CHECKING:
+    from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
+    from gremlin_python.process.graph_traversal import GraphTraversalSource
+
+    from .cloud_storage import CloudStorage
+    from .mutation_log import MutationLog
+    from .result_cache import CachingRemoteConnection
+    from .routing import RoutingRemoteConnection
+    from .shared_cache import SharedCache
+    from .sidecar import SidecarRemoteConnection
+    from .snapshot import SnapshotKeeper
+    from .upload_queue import UploadQueue
+
+logger = logging.getLogger(__name__)
+
+
+class GraphUnavailable(ConnectionError):
+    """The Gremlin server cannot be reached."""
 
 
 @dataclass
 class AppContext:
-    connection: DriverRemoteConnection
-    g: Any  # GraphTraversalSource (gremlin-python type)
-    cloud_storage: CloudStorage
+    """Per-server state. The Gremlin connection, storage backend and upload
+    queue are created on first use (see `get_g`, `get_cloud_storage`), so a
+    stdio session that never calls a tool never pays for them."""
+
+    connection: DriverRemoteConnection | SidecarRemoteConnection | None = None
+    g: Any = None  # GraphTraversalSource (gremlin-python type)
+    cloud_storage: CloudStorage | None = None
+    upload_queue: UploadQueue | None = None
+    mutation_log: MutationLog | None = None
+    shared_cache: SharedCache | None = None
+    snapshot_keeper: SnapshotKeeper | None = None
+    # diagram session id -> diagram_helpers.DiagramSession, least recently used first
+    diagram_sessions: OrderedDict[str, Any] = field(default_factory=OrderedDict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Held while a Gremlin connection is made, which can take long; `lock` only to publish it.
+    connect_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def _make_connection() -> DriverRemoteConnection | CachingRemoteConnection | SidecarRemoteConnection:
+    cfg = get_config()
+    if cfg.sidecar_enabled:
+        from .sidecar import SidecarRemoteConnection
+
+        return SidecarRemoteConnection.from_config(cfg)
+    return _make_direct_connection()
+
+
+def _make_direct_connection() -> DriverRemoteConnection | CachingRemoteConnection:
+    """A connection to the Gremlin server, reading through the result cache if it is enabled.
+
+    Slow traversals are timed (and profiled) below the cache, so hits do not count.
+    """
+    from .result_cache import CachingRemoteConnection, get_result_cache
+    from .slow_queries import with_profiling
+    from .timeouts import TimeoutRemoteConnection
+
+    conn = with_profiling(TimeoutRemoteConnection(_make_gremlin_connection()))
+    cache = get_result_cache()
+    return CachingRemoteConnection(conn, cache) if cache is not None else conn
+
+
+def _make_gremlin_connection() -> DriverRemoteConnection | RoutingRemoteConnection:
+    """A connection to GREMLIN_URL, or one routing across GREMLIN_READ_URLS / GREMLIN_WRITE_URLS."""
+    cfg = get_config()
+    if not (cfg.gremlin_read_urls or cfg.gremlin_write_urls):
+        return _make_driver_connection(cfg.gremlin_url)
+    from .routing import RoutingRemoteConnection
+
+    return RoutingRemoteConnection.from_config(cfg, _make_driver_connection)
 
 
-def _make_connection() -> DriverRemoteConnection:
+def _make_driver_connection(url: str) -> DriverRemoteConnection:
+    # The driver pulls in aiohttp; import it only when a connection is made.
+    from gremlin_python.driver.aiohttp.transport import AiohttpTransport
+    from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
+
+    from .serializers import message_serializer
+
     cfg = get_config()
     return DriverRemoteConnection(
-        cfg.gremlin_url,
+        url,
         cfg.gremlin_traversal_source,
         username=cfg.gremlin_username if cfg.gremlin_username else None,
         password=cfg.gremlin_password if cfg.gremlin_password else None,
+        message_serializer=message_serializer(cfg.gremlin_serializer),
         transport_factory=lambda: AiohttpTransport(call_from_event_loop=True),
     )
 
 
+def _load_graph_indexes(conn: DriverRemoteConnection | SidecarRemoteConnection) -> None:
+    # Index metadata only drives warnings and reports, so the server runs without it.
+    try:
+        set_graph_indexes(read_graph_indexes(conn, get_config().janusgraph_graph_name))
+    except Exception as e:
+        logger.warning("Could not read JanusGraph index metadata: %s", e)
+        set_graph_indexes(None)
+
+
+def _publish(app_ctx: AppContext, connection: Any) -> None:
+    from gremlin_python.process.anonymous_traversal import traversal
+
+    g = traversal().with_remote(connection)
+    with app_ctx.lock:
+        app_ctx.g = g
+        app_ctx.connection = connection
+
+
+def _ensure_connected(app_ctx: AppContext) -> bool:
+    """Connect on first use; return True if this call made the connection.
+
+    The connection and the index metadata are set up under `connect_lock`
+    and only published under `lock`, so a slow or unreachable Gremlin
+    server does not hold up tools that just need storage, the mutation log
+    or the caches.
+    """
+    if app_ctx.connection is not None:
+        return False
+    with app_ctx.connect_lock:
+        if app_ctx.connection is not None:
+            return False
+        connection = _make_connection()
+        _load_graph_indexes(connection)
+        _publish(app_ctx, connection)
+        with app_ctx.lock:
+            keeper = _snapshot_keeper(app_ctx)
+        keeper.start()
+        return True
+
+
+def _snapshot_keeper(app_ctx: AppContext) -> SnapshotKeeper:
+    # Called with app_ctx.lock held.
+    if app_ctx.snapshot_keeper is None:
+        from .snapshot import SnapshotKeeper
+
+        from .timeouts import TimeoutRemoteConnection
+
+        # Snapshot pages run under time budgets, sent as evaluationTimeout.
+        app_ctx.snapshot_keeper = SnapshotKeeper.from_config(
+            get_config(), lambda: TimeoutRemoteConnection(_make_gremlin_connection())
+        )
+    return app_ctx.snapshot_keeper
+
+
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
-    """Create & close the Gremlin remote connection once per server lifecycle."""
-    conn = _make_connection()
-    g = traversal().with_remote(conn)
-    cloud_storage = OwnCloudStorage.from_config(get_config())
+    """Hold the per-server state and close whatever was opened once the server stops.
+
+    With GREMLIN_CONNECT_EAGERLY the Gremlin connection is made here, so a
+    misconfigured server fails at startup instead of on the first tool call.
+    """
+    app_ctx = AppContext()
+    if get_config().gremlin_connect_eagerly:
+        _ensure_connected(app_ctx)
 
     try:
-        yield AppContext(connection=conn, g=g, cloud_storage=cloud_storage)
+        yield app_ctx
     finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        if app_ctx.connection is not None:
+            try:
+                app_ctx.connection.close()
+            except Exception:
+                pass
+        if app_ctx.upload_queue is not None:
+            app_ctx.upload_queue.close()
+        if app_ctx.mutation_log is not None:
+            app_ctx.mutation_log.close()
+        if app_ctx.snapshot_keeper is not None:
+            app_ctx.snapshot_keeper.close()
+        close_cache = getattr(app_ctx.shared_cache, "close", None)
+        if close_cache is not None:
+            close_cache()
+        close_storage = getattr(app_ctx.cloud_storage, "close", None)
+        if close_storage is not None:
+            close_storage()
 
 async def get_g_for_tests() -> GraphTraversalSource:
-    cfg = get_config()
-    
-    conn = DriverRemoteConnection(
-        cfg.gremlin_url,
-        cfg.gremlin_traversal_source,
-        username=cfg.gremlin_username if cfg.gremlin_username else None,
-        password=cfg.gremlin_password if cfg.gremlin_password else None,
-        transport_factory=lambda: AiohttpTransport(call_from_event_loop=True)
-    )
+    from gremlin_python.process.anonymous_traversal import traversal
+
+    conn = _make_connection()
     
     g = traversal().withRemote(conn)
     
     return g
 
 def _reconnect(app_ctx: AppContext) -> None:
+    # Called with app_ctx.connect_lock held.
     try:
         app_ctx.connection.close()
     except Exception:
         pass
-    app_ctx.connection = _make_connection()
-    app_ctx.g = traversal().with_remote(app_ctx.connection)
+    _publish(app_ctx, _make_connection())
 
 
 def _is_closed_connection_error(exc: BaseException) -> bool:
@@ -82,18 +218,96 @@ def _is_closed_connection_error(exc: BaseException) -> bool:
 
 
 def get_g(ctx: Context[ServerSession, AppContext]):
+    """The traversal source, after a cheap liveness probe.
+
+    Raises `GraphUnavailable` when the Gremlin server cannot be reached.
+    """
+    from .routing import is_node_failure
+
     app_ctx = ctx.request_context.lifespan_context
-    # Cheap liveness probe; rebuild the connection if the socket has dropped
-    # (idle timeout, server restart, laptop sleep/resume).
+    fresh = _ensure_connected(app_ctx)
+    conn = app_ctx.connection
     try:
         app_ctx.g.inject(0).toList()
     except Exception as e:
-        if _is_closed_connection_error(e):
-            _reconnect(app_ctx)
-        else:
+        if not is_node_failure(e):
             raise
+        if fresh or not _is_closed_connection_error(e):
+            raise GraphUnavailable(f"The graph database is unavailable: {e}") from e
+        # The socket has dropped (idle timeout, server restart, laptop sleep/resume): rebuild it.
+        with app_ctx.connect_lock:
+            # Tools run in worker threads; only the first to notice reconnects.
+            if app_ctx.connection is conn:
+                _reconnect(app_ctx)
+        try:
+            app_ctx.g.inject(0).toList()
+        except Exception as e:
+            if not is_node_failure(e):
+                raise
+            raise GraphUnavailable(f"The graph database is unavailable: {e}") from e
     return app_ctx.g
 
 
+def get_connection(ctx: Context[ServerSession, AppContext]) -> DriverRemoteConnection | SidecarRemoteConnection:
+    get_g(ctx)
+    return ctx.request_context.lifespan_context.connection
+
+
 def get_cloud_storage(ctx: Context[ServerSession, AppContext]) -> CloudStorage:
-    return ctx.request_context.lifespan_context.cloud_storage
+    app_ctx = ctx.request_context.lifespan_context
+    with app_ctx.lock:
+        if app_ctx.cloud_storage is None:
+            from .cloud_storage import create_cloud_storage
+
+            app_ctx.cloud_storage = create_cloud_storage(get_config())
+        return app_ctx.cloud_storage
+
+
+def get_upload_queue(ctx: Context[ServerSession, AppContext]) -> UploadQueue:
+    app_ctx = ctx.request_context.lifespan_context
+    storage = get_cloud_storage(ctx)
+    with app_ctx.lock:
+        if app_ctx.upload_queue is None:
+            from .upload_queue import UploadQueue
+
+            app_ctx.upload_queue = UploadQueue.from_config(storage, get_config())
+        return app_ctx.upload_queue
+
+
+def get_mutation_log(ctx: Context[ServerSession, AppContext]) -> MutationLog | None:
+    """The mutation journal, or None when MUTATION_LOG_PATH is not set."""
+    cfg = get_config()
+    if not cfg.mutation_log_path:
+        return None
+    app_ctx = ctx.request_context.lifespan_context
+    with app_ctx.lock:
+        if app_ctx.mutation_log is None:
+            from .mutation_log import MutationLog
+
+            app_ctx.mutation_log = MutationLog.from_config(cfg)
+        return app_ctx.mutation_log
+
+
+def get_shared_cache(ctx: Context[ServerSession, AppContext]) -> SharedCache:
+    """Cache for derived results: kept in the sidecar when SIDECAR is on, else in this process."""
+    cfg = get_config()
+    app_ctx = ctx.request_context.lifespan_context
+    with app_ctx.lock:
+        if app_ctx.shared_cache is None:
+            if cfg.sidecar_enabled:
+                from .sidecar import SidecarCache
+
+                app_ctx.shared_cache = SidecarCache.from_config(cfg)
+            else:
+                from .change_feed import get_change_feed
+                from .shared_cache import LocalCache
+
+                app_ctx.shared_cache = LocalCache(get_change_feed())
+        return app_ctx.shared_cache
+
+
+def get_snapshot_keeper(ctx: Context[ServerSession, AppContext]) -> SnapshotKeeper:
+    """Keeper of the local graph snapshot read tools fall back to (see `snapshot`)."""
+    app_ctx = ctx.request_context.lifespan_context
+    with app_ctx.lock:
+        return _snapshot_keeper(app_ctx)
@@ -3,12 +3,15 @@ from __future__ import annotations
 from typing import Any
 
 from gremlin_python.process.graph_traversal import __
-from gremlin_python.process.traversal import T, P, TextP
+from gremlin_python.process.traversal import Order, T, P, TextP
 from gremlin_python.process.graph_traversal import GraphTraversalSource
 from mcp.server.fastmcp import Context
 from mcp.server.session import ServerSession
 
 from .gremlin_client import AppContext, get_g
+from .change_feed import CREATE, DELETE, UPDATE, ChangeEvent, publish
+from .indexes import has_filters
+from .records import EdgeBatch, VertexBatch
 from .validation import normalize_label, normalize_edge_label, validate_and_fix_properties
 
 # Valid quotation statuses
@@ -64,7 +67,7 @@ def filter_backward_relationships(data: dict[str, Any]) -> dict[str, Any]:
     return filtered_dict
 
 def flatten_value_map(raw: dict[Any, Any]) -> dict[str, Any]:
-    """Flatten valueMap(True) output into JSON-friendly keys/values."""
+    """Flatten valueMap(True)/elementMap() output into JSON-friendly keys/values."""
     out: dict[str, Any] = {}
     for k, v in raw.items():
         if k == T.id:
@@ -79,30 +82,94 @@ def flatten_value_map(raw: dict[Any, Any]) -> dict[str, Any]:
                 out[key] = v
     return out
 
-def search_vertices(g: GraphTraversalSource, types: list[str], search_text: str, limit: int = 10) -> list[dict[str, Any]]:
-    """Search for vertices by substring within specified types."""
-    t = g.V().has('type', P.within(types)).has('caption', TextP.containing(search_text))
+def select_fields(t: Any, fields: list[str] | None = None) -> list[dict[str, Any]]:
+    """Run a vertex traversal and return each vertex as a flat dict.
 
-    raw_list = t.limit(limit).valueMap(True).toList()
-    return [flatten_value_map(r) for r in raw_list]
+    Uses `elementMap()`, which returns id, label and single property values
+    (no per-value lists to unwrap). `fields` limits the properties shipped
+    back — large ones such as verse translations or quotation texts are then
+    never sent; None (or an empty list) returns all properties.
+    """
+    return select_records(t, fields).to_dicts()
 
-def get_vertices_by_type(g: GraphTraversalSource, type: str, limit: int = 10) -> list[dict[str, Any]]:
-    """Get vertices of a given type."""
-    t = g.V().has('type', type)
-    raw_list = t.limit(limit).valueMap(True).toList()
-    return [flatten_value_map(r) for r in raw_list]
+def select_records(t: Any, fields: list[str] | None = None, labels: list[str] | None = None) -> VertexBatch:
+    """Like `select_fields`, but keep the vertices column-wise in a `VertexBatch`.
 
-def get_vertices_by_captions(g: GraphTraversalSource, captions: list[str]) -> list[dict[str, Any]]:
-    t = g.V().has("caption", P.within(captions))
-    raw_list = t.valueMap(True).toList()
-    return [flatten_value_map(r) for r in raw_list]
+    `labels` seeds the columns from the schema of those vertex labels. The
+    list helpers below return the batch as it is; tools hand it to
+    `responses.encoded`, which turns it into dicts (`records.to_plain`).
+    """
+    batch = VertexBatch(fields) if fields else VertexBatch.for_labels(labels or [])
+    for raw in t.elementMap(*(fields or [])).toList():
+        batch.append_element_map(raw)
+    return batch
+
+def search_vertices(
+    g: GraphTraversalSource, types: list[str], search_text: str, limit: int = 10, fields: list[str] | None = None
+) -> VertexBatch:
+    """Search for vertices by substring within specified types."""
+    t = has_filters(g.V(), [('type', P.within(types)), ('caption', TextP.containing(search_text))], "search")
+    return select_records(t.limit(limit), fields)
 
-def get_vertices_by_caption(g: GraphTraversalSource, caption: str, limit: int = 10) -> list[dict[str, Any]]:
+def get_vertices_by_type(
+    g: GraphTraversalSource, type: str, limit: int = 10, fields: list[str] | None = None
+) -> VertexBatch:
+    """Get vertices of a given type."""
+    t = has_filters(g.V(), [('type', type)], "vertices by type")
+    return select_records(t.limit(limit), fields, [type])
+
+def get_vertices_by_captions(
+    g: GraphTraversalSource, captions: list[str], fields: list[str] | None = None
+) -> VertexBatch:
+    t = has_filters(g.V(), [("caption", P.within(captions))], "vertices by captions")
+    return select_records(t, fields)
+
+def get_vertices_by_caption(
+    g: GraphTraversalSource, caption: str, limit: int = 10, fields: list[str] | None = None
+) -> VertexBatch:
     """Resolve a vertex caption into up to `limit` matches."""
-    t = g.V().has("caption", caption)
+    t = has_filters(g.V(), [("caption", caption)], "vertex by caption")
+    return select_records(t.limit(limit), fields)
+
+def get_quotations_by_status(
+    g: GraphTraversalSource, status: str, limit: int, fields: list[str] | None = None
+) -> VertexBatch:
+    """Get quotations with the given status, most recently imported first."""
+    validate_quotation_status(status)
+    t = has_filters(g.V(), [('type', "quotation"), ('status', status)], "quotations by status")
+    t = t.order().by("importIndex", Order.desc)
+    return select_records(t.limit(limit), fields, ["quotation"])
+
+def claim_next_quotations(
+    g: GraphTraversalSource,
+    status: str,
+    limit: int,
+    claim_status: str = "suspended",
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Take the next `limit` quotations with `status` off the queue and set them to `claim_status`.
+
+    The queue is ordered by importIndex, descending (as in
+    `get_quotations_by_status`). Claimed quotations leave `status`, so each
+    call simply takes the head of the queue, including quotations put back
+    to `status` or imported since the last call. Selection and status change
+    run as one traversal, i.e. one server-side transaction. With a mixed index on
+    (type, status, importIndex) JanusGraph answers the ordered, limited query
+    from the index instead of sorting the whole status partition (see
+    docs/janus-graph.md).
+
+    Returns {"quotations": VertexBatch}.
+    """
+    validate_quotation_status(status)
+    validate_quotation_status(claim_status)
+    if claim_status == status:
+        raise ValueError(f"claim_status must differ from status ({status})")
 
-    raw_list = t.limit(limit).valueMap(True).toList()
-    return [flatten_value_map(r) for r in raw_list]
+    t = has_filters(g.V(), [('type', "quotation"), ('status', status)], "quotation queue")
+    t = t.order().by("importIndex", Order.desc).limit(limit).property("status", claim_status)
+    batch = select_records(t, fields, ["quotation"])
+    publish(*(ChangeEvent(UPDATE, vertex_id=i, label="quotation", labels=("quotation",)) for i in batch.ids))
+    return {"quotations": batch}
 
 def get_unique_vertex_by_caption(g: GraphTraversalSource, caption: str) -> dict[str, Any]:
     matches = get_vertices_by_caption(g, caption, limit=2)
@@ -110,10 +177,87 @@ def get_unique_vertex_by_caption(g: GraphTraversalSource, caption: str) -> dict[
         raise ValueError(f"Vertex not found for caption={caption}")
     if len(matches) > 1:
         raise ValueError(
-            f"Ambiguous vertex caption={caption}. Matches: {matches}."
+            f"Ambiguous vertex caption={caption}. Matches: {matches.to_dicts()}."
         )
     return matches[0]
 
+def get_unique_vertices_by_captions(g: GraphTraversalSource, captions: list[str]) -> dict[str, dict[str, Any]]:
+    """Resolve many captions at once: one `within()` traversal instead of one per caption.
+
+    Returns {caption: {internal_id, label, caption}}. Raises if any caption is
+    missing or ambiguous, naming all offending captions at once.
+    """
+    unique = list(dict.fromkeys(captions))
+    if not unique:
+        return {}
+    rows = (
+        has_filters(g.V(), [("caption", P.within(unique))], "vertices by captions")
+        .project("internal_id", "label", "caption")
+        .by(T.id)
+        .by(__.label())
+        .by(__.values("caption"))
+        .toList()
+    )
+    matches: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        matches.setdefault(row["caption"], []).append(row)
+
+    missing = [c for c in unique if c not in matches]
+    if missing:
+        if len(missing) == 1:
+            raise ValueError(f"Vertex not found for caption={missing[0]}")
+        raise ValueError(f"Vertices not found for captions={missing}")
+    ambiguous = {c: m for c, m in matches.items() if len(m) > 1}
+    if ambiguous:
+        raise ValueError(f"Ambiguous vertex captions. Matches: {ambiguous}.")
+    return {c: m[0] for c, m in matches.items()}
+
+def create_edges(
+    g: GraphTraversalSource, edges: list[tuple[str, dict[str, Any], dict[str, Any]]]
+) -> list[dict[str, Any]]:
+    """Create several edges between already resolved vertices in one traversal.
+
+    `edges` holds (edge_label, source, target) where source/target carry at
+    least `internal_id`, `label` and `caption` (as returned by
+    `get_unique_vertices_by_captions`). Returns one `create_edge`-style result
+    per edge.
+
+    Every endpoint is looked up before the first edge is added, so if one
+    was deleted since it was resolved no edge is created and ValueError is
+    raised.
+    """
+    specs = [(normalize_edge_label(label), source, target) for label, source, target in edges]
+    if not specs:
+        return []
+
+    t = g.inject(0)
+    for i, (_, source, target) in enumerate(specs):
+        t = t.V(source["internal_id"]).as_(f"s{i}").V(target["internal_id"]).as_(f"t{i}")
+    for i, (label, _, _) in enumerate(specs):
+        t = t.add_e(label).from_(f"s{i}").to(f"t{i}").as_(f"e{i}")
+    created = t.union(*(__.select(f"e{i}") for i in range(len(specs)))).count().next()
+    if created < len(specs):
+        raise ValueError(f"No edges were created: an endpoint of one of the {len(specs)} edges no longer exists")
+    publish(*(
+        ChangeEvent(
+            CREATE,
+            edge=(label, source["internal_id"], target["internal_id"]),
+            labels=(source["label"], target["label"]),
+        )
+        for label, source, target in specs
+    ))
+
+    return [
+        {
+            "edge_created": {
+                "edge_label": label,
+                "source": {"label": source["label"], "internal_id": source["internal_id"], "caption": source.get("caption")},
+                "target": {"label": target["label"], "internal_id": target["internal_id"], "caption": target.get("caption")},
+            }
+        }
+        for label, source, target in specs
+    ]
+
 def create_vertex_and_connect_by_captions(
     g: GraphTraversalSource,
     label: str,
@@ -126,49 +270,43 @@ def create_vertex_and_connect_by_captions(
 
     - edges_out: new -> targets
     - edges_in:  sources -> new
+
+    All captions are resolved in a single lookup before anything is written,
+    and all edges are then created in a single traversal.
     """
+    edges_out = edges_out or {}
+    edges_in = edges_in or {}
+
+    # Ensure that all the targets/sources exist first
+    all_captions = [cap for caps in (*edges_out.values(), *edges_in.values()) for cap in caps]
+    resolved = get_unique_vertices_by_captions(g, all_captions)
+    for edge_label in (*edges_out, *edges_in):
+        normalize_edge_label(edge_label)
 
     created = create_vertex(g, label=label, properties=properties)["created"]
-    new_internal_id = int(created["internal_id"])
-
-    results: dict[str, Any] = {"created": created, "edges_created": []}
-
-    # Try to ensure that all the targets/sources exist first
-    if edges_out:
-        for edge_label, captions in edges_out.items():
-            for cap in captions:
-                get_unique_vertex_by_caption(g, cap)
-    if edges_in:
-        for edge_label, captions in edges_in.items():
-            for cap in captions:
-                get_unique_vertex_by_caption(g, cap)
-            
+    new_vertex = {
+        "internal_id": int(created["internal_id"]),
+        "label": created["label"],
+        "caption": created.get("caption"),
+    }
+
     # Now create the edges
-    if edges_out:
-        for edge_label, captions in edges_out.items():
-            for cap in captions:
-                target = get_unique_vertex_by_caption(g, cap)
-                result = create_edge(g, edge_label, new_internal_id, target["internal_id"])
-                results["edges_created"].append(result)
-
-    if edges_in:
-        for edge_label, captions in edges_in.items():
-            for cap in captions:
-                source = get_unique_vertex_by_caption(g, cap)
-                result = create_edge(g, edge_label, source["internal_id"], new_internal_id)
-                results["edges_created"].append(result)
-    return results
+    edges: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+    for edge_label, captions in edges_out.items():
+        edges.extend((edge_label, new_vertex, resolved[cap]) for cap in captions)
+    for edge_label, captions in edges_in.items():
+        edges.extend((edge_label, resolved[cap], new_vertex) for cap in captions)
+
+    return {"created": created, "edges_created": create_edges(g, edges)}
 
 def is_vertex_existing_by_caption(
     g: GraphTraversalSource, caption: str, label: str | None = None
 ) -> bool:
     """Return True if any vertex with the given caption (and optional label) exists.
 
-    Only the vertex id is fetched to avoid GraphBinary deserialization of full
-    Vertex objects, which can fail with `KeyError: DataType.custom` against
-    JanusGraph.
+    Only the vertex id is fetched; the vertex itself is never needed here.
     """
-    t = g.V().has("caption", caption)
+    t = has_filters(g.V(), [("caption", caption)], "vertex by caption")
     if label is not None:
         t = t.hasLabel(label)
     return bool(t.limit(1).id_().toList())
@@ -184,193 +322,232 @@ def create_vertex(g: GraphTraversalSource, label: str, properties: dict[str, Any
     t = g.addV(label).property("type", label)
     for k, v in props.items():
         t = t.property(k, v)
-    created_raw = t.valueMap(True).next()
-    return {"created": flatten_value_map(created_raw)}
-
-def read_vertex_with_edges(g: GraphTraversalSource, id: int) -> dict[str, Any]:
-    """Read vertex by id and include all in/out edges with their vertexes."""
-
-    raw = g.V(id).valueMap(True).toList()
-    if not raw:
-        raise ValueError(f"Vertex not found: id={id}")
-
-    vertex = flatten_value_map(raw[0])
-
-    out_edges = (
-        g.V(id).outE().group()
+    # Everything but the id is already known here, so don't read the vertex back.
+    new_id = t.id_().next()
+    publish(ChangeEvent(CREATE, vertex_id=new_id, label=label, caption=props["caption"], labels=(label,)))
+    return {"created": {"internal_id": new_id, "label": label, "type": label, **props}}
+
+def _neighbours_by_edge_label(edges: Any, other_end: Any) -> Any:
+    """`group()` of the vertices at the `other_end` of `edges` by edge label, as {label, id, caption}."""
+    return (
+        edges.group()
         .by(__.label())
-        .by(__.inV().project("label", "id", "caption")
+        .by(other_end.project("label", "id", "caption")
             .by(__.label())
             .by(T.id)
             .by(__.values("caption"))
             .fold()
         )
+    )
+
+def read_vertices_with_edges(t: Any, fields: list[str] | None = None) -> list[dict[str, Any]]:
+    """Read every vertex of traversal `t` with all its in/out edges and their vertexes, in one round trip.
+
+    `fields` limits the vertex properties returned, as in `select_fields`.
+    """
+    rows = (
+        t.project("vertex", "out", "in")
+        .by(__.elementMap(*(fields or [])))
+        .by(_neighbours_by_edge_label(__.outE(), __.inV()))
+        .by(_neighbours_by_edge_label(__.inE(), __.outV()))
         .toList()
     )
+    vertices = []
+    for row in rows:
+        vertex = flatten_value_map(row["vertex"])
+        vertex["relationships"] = {**row["out"], **reverse_direct_relationship_keys(row["in"])}
+        vertices.append(vertex)
+    return vertices
+
+def read_vertices_with_edges_by_captions(
+    g: GraphTraversalSource, captions: list[str], labels: list[str] | None = None, fields: list[str] | None = None
+) -> list[dict[str, Any]]:
+    """Vertices with the given captions (and, if given, one of `labels`) with their edges, in caption order."""
+    unique = list(dict.fromkeys(captions))
+    if not unique:
+        return []
+    t = has_filters(g.V(), [("caption", P.within(unique))], "vertices by captions")
+    if labels:
+        t = t.hasLabel(*labels)
+    order = {caption: i for i, caption in enumerate(unique)}
+    return sorted(read_vertices_with_edges(t, fields), key=lambda v: order.get(v.get("caption"), len(order)))
 
-    in_edges = (
-        g.V(id).inE().group()
+def read_vertex_with_edges(g: GraphTraversalSource, id: int) -> dict[str, Any]:
+    """Read vertex by id and include all in/out edges with their vertexes."""
+    vertices = read_vertices_with_edges(g.V(id))
+    if not vertices:
+        raise ValueError(f"Vertex not found: id={id}")
+    return vertices[0]
+
+def _describe_vertices(g: GraphTraversalSource, ids: list[Any]) -> list[dict[str, Any]]:
+    """Id, label, caption and the labels of the vertex and its neighbours, for change events."""
+    rows = (
+        g.V(*ids)
+        .project("internal_id", "label", "caption", "labels")
+        .by(T.id)
         .by(__.label())
-        .by(__.outV().project("label", "id", "caption")
-            .by(__.label())
-            .by(T.id)
-            .by(__.values("caption"))
-            .fold()
-        )
+        .by(__.values("caption").fold())
+        .by(__.union(__.label(), __.both().label()).dedup().fold())
         .toList()
     )
-
-    vertex['relationships'] = {**out_edges[0], **reverse_direct_relationship_keys(in_edges[0])}
-
-    return vertex
+    return [
+        {**row, "caption": row["caption"][0] if row["caption"] else None, "labels": tuple(row["labels"])}
+        for row in rows
+    ]
 
 def delete_vertex_by_id(g: GraphTraversalSource, id: int) -> dict[str, Any]:
     """Delete a vertex (and all incident edges) by id."""
-    raw = g.V(id).valueMap(True).toList()
-    if not raw:
+    found = _describe_vertices(g, [id])
+    if not found:
         raise ValueError(f"Vertex not found: id={id}")
 
     g.V(id).drop().iterate()
+    vertex = found[0]
+    publish(ChangeEvent(DELETE, vertex_id=vertex["internal_id"], label=vertex["label"], caption=vertex["caption"], labels=vertex["labels"]))
     return {"deleted": True, "id": int(id)}
 
 def is_vertex_existing_by_id(g: GraphTraversalSource, id: int, label: str | None = None) -> bool:
     """Check if a vertex exists by id."""
-    raw = g.V(id).valueMap(True).toList()
-    return bool(raw)
+    return bool(g.V(id).id_().toList())
 
 def get_vertex_by_id(g: GraphTraversalSource, id: int) -> dict[str, Any]:
     """Get a vertex by id."""
-    raw = g.V(id).valueMap(True).toList()
+    raw = select_fields(g.V(id))
     if not raw:
         raise ValueError(f"Vertex not found: id={id}")
-    return flatten_value_map(raw[0])
+    return raw[0]
 
 def create_edge(g: GraphTraversalSource, edge_label: str, source_vertex_id: int, target_vertex_id: int) -> dict[str, Any]:
     """Connect two existing vertices with an edge."""
-    e = normalize_edge_label(edge_label)
-
-    source = get_vertex_by_id(g, source_vertex_id)
-    target = get_vertex_by_id(g, target_vertex_id)
+    normalize_edge_label(edge_label)
 
-    g.V(source_vertex_id).as_("a") \
-        .V(target_vertex_id).as_("b") \
-        .add_e(e).from_("a").to("b") \
-        .iterate()
+    # Fetch both endpoints in one round trip.
+    rows = (
+        g.V(source_vertex_id, target_vertex_id)
+        .project("internal_id", "label", "caption")
+        .by(T.id)
+        .by(__.label())
+        .by(__.values("caption"))
+        .toList()
+    )
+    by_id = {int(r["internal_id"]): r for r in rows}
+    for vertex_id in (source_vertex_id, target_vertex_id):
+        if int(vertex_id) not in by_id:
+            raise ValueError(f"Vertex not found: id={vertex_id}")
 
-    return {
-        "edge_created": {
-            "edge_label": e,
-            "source": {"label": source["label"], "internal_id": source.get("id"), "caption": source.get("caption")},
-            "target": {"label": target["label"], "internal_id": target.get("id"), "caption": target.get("caption")},
-        }
-    }
+    return create_edges(g, [(edge_label, by_id[int(source_vertex_id)], by_id[int(target_vertex_id)])])[0]
 
 def build_notion_groups_tree(g: GraphTraversalSource, includeNotions: bool) -> dict[str, Any]:
-    """Get a multiple-level tree of all parentless "notionGroup" vertices with their nested "notionGroups" without nested notions."""
-    
-    if includeNotions:
-        paths = (
-            g.V().has('type',P.within('notionGroup', 'notion')).not_(__.inE('contains')).as_('root')
-                .union(
-                    __.identity().path().by('caption'),
-                    __.repeat(__.out('contains').has('type', P.within('notionGroup', 'notion'))).emit().path().by('caption')
-                )
-        ).toList()
-    else:
-        paths = (
-            g.V().has('type','notionGroup').not_(__.inE('contains')).as_('root')
-                .union(
-                    __.identity().path().by('caption'),
-                    __.repeat(__.out('contains').has('type', 'notionGroup')).emit().path().by('caption')
-                )
-        ).toList()
-
-    def build_tree(paths):
-        tree = {}
-        for item in paths:
-            methods = dir(item)
-            path = item.objects
-            current = tree
-            
-            for vertex in path:
-                if vertex not in current:
-                    current[vertex] = {}
-                current = current[vertex]
-        
-        return tree
-
-    return build_tree(paths)
-
-def get_subgraph_by_captions(g: GraphTraversalSource, captions: list[str]) -> dict[str, Any]:
+    """Get a multiple-level tree of all parentless "notionGroup" vertices with their nested "notionGroups" without nested notions.
+
+    The vertices (id and caption) and the `contains` edges into them come
+    back column-wise in two traversals and the tree is put together here,
+    instead of the server sending the whole caption path of every node.
+    """
+    types = ["notionGroup", "notion"] if includeNotions else ["notionGroup"]
+
+    def typed() -> Any:
+        return has_filters(g.V(), [("type", P.within(types))], "notion tree")
+
+    vertices = select_records(typed(), ["caption"])
+    edges = EdgeBatch()
+    rows = (
+        typed().inE("contains")
+        .project("id", "from", "to").by(__.id_().as_string()).by(__.outV().id_()).by(__.inV().id_())
+    )
+    for row in rows:
+        edges.add(row["id"], "contains", int(row["from"]), int(row["to"]))
+    return contains_tree(vertices, edges)
+
+def contains_tree(vertices: VertexBatch, edges: EdgeBatch) -> dict[str, Any]:
+    """Nest `vertices` by caption along the `contains` edges in `edges`.
+
+    Roots are the vertices nothing contains. A vertex contained by several
+    groups appears under each of them; cycles are cut where they close.
+    """
+    captions = {int(id): caption for id, caption in zip(vertices.ids, vertices.values("caption"))}
+    children: dict[int, list[int]] = {}
+    contained = set()
+    for parent, child in zip(edges.from_ids, edges.to_ids):
+        contained.add(child)
+        if parent in captions and child in captions:
+            children.setdefault(parent, []).append(child)
+
+    def add(tree: dict[str, Any], id: int, path: set[int]) -> None:
+        node = tree.setdefault(captions[id], {})
+        for child in children.get(id, ()):
+            if child not in path:
+                add(node, child, path | {child})
+
+    tree: dict[str, Any] = {}
+    for id in captions:
+        if id not in contained:
+            add(tree, id, {id})
+    return tree
+
+def get_subgraph_by_captions(
+    g: GraphTraversalSource,
+    captions: list[str],
+    properties: list[str] | None = None,
+) -> dict[str, Any]:
     """Return induced subgraph for the given vertex captions.
 
     Output:
         {
-            "vertices": [ {internal_id, label, caption, ...}, ... ],
-            "edges":    [ {label, from_id, to_id}, ... ],
+            "vertices": VertexBatch,             # {internal_id, label, caption, ...} rows
+            "edges":    EdgeBatch,               # {id, label, from_id, to_id} rows
             "missing":  [caption, ...],          # captions with no match
             "ambiguous": {caption: count, ...},  # captions with >1 match
         }
 
     Only edges whose both endpoints belong to the requested set are returned.
+    Edges are keyed by their edge id, so parallel edges of the same type
+    between the same pair of vertices are all kept. When any caption is
+    ambiguous `edges` is left empty, since the duplicates would otherwise
+    contribute edges of vertices the caller never asked for.
+
+    `properties` restricts the vertex properties fetched (e.g. only what the
+    diagram renderer shows); `caption` is always included. None fetches all.
+
+    Vertices and their outgoing edges come back in a single traversal.
     """
     if not captions:
         raise ValueError("captions must be a non-empty list")
 
-    raw_vertices = g.V().has("caption", P.within(captions)).valueMap(True).toList()
-    vertices = [flatten_value_map(r) for r in raw_vertices]
+    keys = None if properties is None else sorted({"caption", *properties})
+    rows = (
+        g.V().has("caption", P.within(captions)).aggregate("vs")
+        .project("id", "label", "props", "out")
+        .by(T.id)
+        .by(__.label())
+        .by(__.valueMap(*keys) if keys is not None else __.valueMap())
+        .by(
+            __.outE().as_("e").inV().where(P.within("vs")).select("e")
+            # Edge ids are JanusGraph RelationIdentifiers; the tools return
+            # their text form, so let the server convert them.
+            .project("id", "label", "to").by(__.id_().as_string()).by(__.label()).by(__.inV().id_())
+            .fold()
+        )
+    )
+
+    vertices = VertexBatch(keys or ())
+    edges = EdgeBatch()
+    for row in rows:
+        vertices.append(row["id"], row["label"], row["props"])
+        from_id = int(row["id"])
+        for e in row["out"]:
+            edges.add(e["id"], e["label"], from_id, int(e["to"]))
 
     counts: dict[str, int] = {}
-    for v in vertices:
-        cap = v.get("caption")
-        if cap is not None:
+    for cap in vertices.columns.get("caption", ()):
+        if isinstance(cap, str):
             counts[cap] = counts.get(cap, 0) + 1
-
     missing = [c for c in captions if c not in counts]
     ambiguous = {c: n for c, n in counts.items() if n > 1}
 
-    # TODO: ids is built from ALL matched vertices, including duplicates when a caption
-    #   is ambiguous. The edge traversal below will then find edges between those phantom
-    #   duplicates and include them in the returned `edges` list. The sole current caller
-    #   (create_diagram_by_captions) guards against this by checking `ambiguous` before
-    #   consuming `edges`, but any future caller that skips that check will get a corrupted
-    #   subgraph with no exception raised. Consider clearing `edges` or raising inside
-    #   this helper when `ambiguous` is non-empty.
-    ids = [int(v["internal_id"]) for v in vertices]
-    edges: list[dict[str, Any]] = []
-    if len(ids) >= 2:
-        raw_edges = (
-            g.V(*ids).as_("from")
-            .outE().as_("e")
-            .inV().as_("to")
-            .where(__.select("to").hasId(P.within(ids)))
-            .select("from", "e", "to")
-            .by(T.id)
-            .by(__.label())
-            .by(T.id)
-            .dedup()
-            .toList()
-        )
-        # TODO: The dedup key is (edge_label, from_id, to_id), not the edge element id.
-        #   This silently collapses parallel edges of the same type between the same vertex
-        #   pair into one. JanusGraph allows multiple edges with the same label between the
-        #   same vertices (create_edge() has no duplicate guard), so this data loss can
-        #   occur in practice. Fix: use the edge element id as the dedup key, or at minimum
-        #   document this limitation clearly.
-        seen: set[tuple] = set()
-        for row in raw_edges:
-            key = (row["e"], int(row["from"]), int(row["to"]))
-            if key not in seen:
-                seen.add(key)
-                edges.append({
-                    "label": row["e"],
-                    "from_id": int(row["from"]),
-                    "to_id": int(row["to"]),
-                })
-
     return {
         "vertices": vertices,
-        "edges": edges,
+        "edges": EdgeBatch() if ambiguous else edges,
         "missing": missing,
         "ambiguous": ambiguous,
     }
@@ -378,13 +555,16 @@ def get_subgraph_by_captions(g: GraphTraversalSource, captions: list[str]) -> di
 
 def change_caption(g: GraphTraversalSource, old_caption: str, new_caption: str) -> dict[str, Any]:
     """Change the caption of a vertex."""
-    vertex = get_unique_vertex_by_caption(g, old_caption)
+    vertex = get_unique_vertices_by_captions(g, [old_caption])[old_caption]
     g.V(vertex["internal_id"]).property("caption", new_caption).iterate()
+    # Neighbours show this caption in their relationships, so they are affected as well.
+    labels = _describe_vertices(g, [vertex["internal_id"]])[0]["labels"]
+    publish(ChangeEvent(UPDATE, vertex_id=vertex["internal_id"], label=vertex["label"], caption=old_caption, labels=labels))
     return {"updated": True, "internal_id": vertex["internal_id"], "new_caption": new_caption}
 
 def get_unique_vertex_id_by_caption(g: GraphTraversalSource, caption: str, label: str) -> int:
     """Return the unique vertex id for a given caption and label, or raise."""
-    ids = g.V().has("caption", caption).hasLabel(label).id_().toList()
+    ids = has_filters(g.V(), [("caption", caption)], "vertex by caption").hasLabel(label).id_().toList()
     if not ids:
         raise ValueError(f"Vertex not found: label={label} caption={caption}")
     if len(ids) > 1:
@@ -401,13 +581,15 @@ def move_notion_to_group(
     notion_id = get_unique_vertex_id_by_caption(g, notion_caption, "notion")
     group_id = get_unique_vertex_id_by_caption(g, notion_group_caption, "notionGroup")
 
-    removed = (
+    removed_from = (
         g.V(notion_id)
         .inE("contains")
         .where(__.outV().hasLabel("notionGroup"))
-        .count()
-        .next()
+        .outV()
+        .id_()
+        .toList()
     )
+    removed = len(removed_from)
     (
         g.V(notion_id)
         .inE("contains")
@@ -416,6 +598,10 @@ def move_notion_to_group(
         .iterate()
     )
 
+    publish(*(
+        ChangeEvent(DELETE, edge=("contains", old_group_id, notion_id), labels=("notionGroup", "notion"))
+        for old_group_id in removed_from
+    ))
     create_edge(g, "contains", group_id, notion_id)
 
     return {
@@ -425,3 +611,24 @@ def move_notion_to_group(
         "removed_previous_group_edges": int(removed),
     }
 
+def set_vertex_status(g: GraphTraversalSource, id: int, label: str, status: str) -> None:
+    """Set the `status` property of a vertex (quotations)."""
+    g.V(id).property("status", status).iterate()
+    publish(ChangeEvent(UPDATE, vertex_id=id, label=label, labels=(label,)))
+
+def delete_edges(g: GraphTraversalSource, edge_label: str, source: dict[str, Any], target: dict[str, Any]) -> int:
+    """Delete all `edge_label` edges from `source` to `target` (resolved vertices); return how many."""
+    edges = (
+        g.V(source["internal_id"])
+        .outE(edge_label)
+        .where(__.inV().hasId(target["internal_id"]))
+    )
+    count = edges.clone().count().next()
+    edges.drop().iterate()
+    if count:
+        publish(ChangeEvent(
+            DELETE,
+            edge=(edge_label, source["internal_id"], target["internal_id"]),
+            labels=(source["label"], target["label"]),
+        ))
+    return int(count)
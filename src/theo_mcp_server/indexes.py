@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from gremlin_python.process.traversal import P
+
+logger = logging.getLogger(__name__)
+
+# Property filters the tools issue, by query shape. Each tuple lists the keys
+# compared by equality (or `within`) in that shape's traversal.
+QUERY_SHAPES: dict[str, tuple[str, ...]] = {
+    "vertex by caption": ("caption",),
+    "vertices by type": ("type",),
+    "quotations by status": ("type", "status"),
+    "verses by import order": ("importIndex",),
+}
+
+# Groovy run on the Gremlin Server to list the JanusGraph vertex indexes.
+# Management transactions are read-only here and always rolled back.
+_INDEX_SCRIPT = """
+mgmt = {graph}.openManagement()
+try {{
+    mgmt.getGraphIndexes(Vertex.class).collect {{ idx ->
+        [name: idx.name(),
+         keys: idx.getFieldKeys().collect {{ it.name() }},
+         composite: idx.isCompositeIndex(),
+         unique: idx.isUnique(),
+         status: idx.getFieldKeys().collect {{ idx.getIndexStatus(it).toString() }}.unique()]
+    }}
+}} finally {{
+    mgmt.rollback()
+}}
+"""
+
+
+@dataclass(frozen=True)
+class GraphIndex:
+    name: str
+    keys: tuple[str, ...]
+    composite: bool
+    unique: bool = False
+    status: tuple[str, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return not self.status or all(s == "ENABLED" for s in self.status)
+
+    def covers(self, keys: set[str]) -> bool:
+        """Whether JanusGraph can answer an equality filter on `keys` with this index.
+
+        A composite index needs an equality condition on every one of its keys;
+        a mixed index can serve any subset of its keys.
+        """
+        if not self.enabled:
+            return False
+        if self.composite:
+            return set(self.keys) <= keys
+        return bool(set(self.keys) & keys)
+
+
+# Indexes found at startup; None until they have been read (no warnings then).
+_graph_indexes: list[GraphIndex] | None = None
+
+
+def set_graph_indexes(indexes: list[GraphIndex] | None) -> None:
+    global _graph_indexes
+    _graph_indexes = indexes
+
+
+def get_graph_indexes() -> list[GraphIndex] | None:
+    return _graph_indexes
+
+
+def read_graph_indexes(connection: Any, graph_name: str = "graph") -> list[GraphIndex]:
+    """Read the vertex indexes from JanusGraph's management API.
+
+    `connection` is the `DriverRemoteConnection`; the script goes through its
+    client because the management API is not reachable through bytecode.
+    """
+    script = _INDEX_SCRIPT.format(graph=graph_name)
+    if hasattr(connection, "submit_script"):  # sidecar connection
+        rows = connection.submit_script(script)
+    else:
+        rows = connection._client.submit(script).all().result()
+    return [
+        GraphIndex(
+            name=row["name"],
+            keys=tuple(row["keys"]),
+            composite=bool(row["composite"]),
+            unique=bool(row["unique"]),
+            status=tuple(row["status"]),
+        )
+        for row in rows
+    ]
+
+
+def indexes_covering(keys: set[str], indexes: list[GraphIndex]) -> list[GraphIndex]:
+    return [idx for idx in indexes if idx.covers(keys)]
+
+
+def index_report(indexes: list[GraphIndex]) -> dict[str, Any]:
+    """Describe which tool query shapes the given indexes serve and which fall back to full scans."""
+    shapes = {}
+    missing = []
+    for shape, keys in QUERY_SHAPES.items():
+        covering = [idx.name for idx in indexes_covering(set(keys), indexes)]
+        shapes[shape] = {"keys": list(keys), "covered_by": covering}
+        if not covering:
+            missing.append(shape)
+    return {
+        "indexes": [asdict(idx) for idx in indexes],
+        "query_shapes": shapes,
+        "missing": missing,
+    }
+
+
+def _is_equality(value: Any) -> bool:
+    return not isinstance(value, P) or value.operator in ("eq", "within")
+
+
+def has_filters(t: Any, filters: list[tuple[str, Any]], description: str = "") -> Any:
+    """Append `has(key, value)` steps to `t`, logging traversals no index serves.
+
+    `filters` is a list of (property key, value or predicate). JanusGraph picks
+    the index from all adjacent `has()` steps whatever their order, so the steps
+    are appended as given; when the indexes are known and none of them covers
+    the equality and `within` filters, the traversal is logged as a full scan.
+    """
+    indexes = _graph_indexes
+    if indexes is not None:
+        indexable = {key for key, value in filters if _is_equality(value)}
+        if not any(set(idx.keys) & indexable for idx in indexes_covering(indexable, indexes)):
+            logger.warning(
+                "Full-scan traversal%s: no index covers filters on %s",
+                f" ({description})" if description else "",
+                [key for key, _ in filters],
+            )
+
+    for key, value in filters:
+        t = t.has(key, value)
+    return t
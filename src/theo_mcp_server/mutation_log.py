@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from .config import Config
+from .records import to_plain
+
+# Record types, one JSON object per line.
+BEGIN = "begin"
+COMMIT = "commit"
+FAIL = "fail"
+
+# Replay outcome of a call that is not safe to run twice.
+NEEDS_REVIEW = "needs review"
+
+# Mutating tools by name, for replay (filled in by `journaled`).
+_HANDLERS: dict[str, Callable[..., Any]] = {}
+# Those of them that can be run again without applying anything twice.
+_IDEMPOTENT: set[str] = set()
+
+
+class MutationLog:
+    """Append-only journal of mutating tool calls (JSON lines).
+
+    A `begin` record (request id, tool, arguments) is written before the tool
+    touches the graph, and a `commit` or `fail` record once it returns, so a
+    call interrupted by a crash or a dropped Gremlin connection is left
+    visible as pending. Each record is a single `write()` on an `O_APPEND`
+    descriptor, so several server processes can share one file; byte offsets
+    into the file serve as export checkpoints.
+
+    With `fsync_interval` 0 every record is fsynced before the call goes on.
+    Otherwise records reach the OS at once (they survive a process crash) and
+    a background thread fsyncs at most every `fsync_interval` seconds, so a
+    burst of mutations shares one fsync.
+    """
+
+    def __init__(self, path: str, *, fsync_interval: float = 0.1, max_remembered: int = 10_000) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._fsync_interval = fsync_interval
+        self._max_remembered = max_remembered
+        # request id -> latest record for it (begin, commit or fail), the most recent `max_remembered`
+        self._latest: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # request id -> begin record, for every call with no outcome yet; never evicted
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._scanned = 0
+        self._dirty = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._catch_up()
+        self._flusher: threading.Thread | None = None
+        if fsync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="theo-mutation-log", daemon=True)
+            self._flusher.start()
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "MutationLog":
+        return cls(cfg.mutation_log_path, fsync_interval=cfg.mutation_log_fsync_interval)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        os.fsync(self._fd)
+        os.close(self._fd)
+
+    # --- journal -------------------------------------------------------------
+
+    def lookup(self, request_id: str) -> dict[str, Any] | None:
+        """Latest record for `request_id`, including ones written by other processes."""
+        with self._lock:
+            self._catch_up()
+            return self._pending.get(request_id) or self._latest.get(request_id)
+
+    def claim(self, request_id: str, tool: str, args: dict[str, Any], *, resume: bool = False) -> dict[str, Any] | None:
+        """Write the begin record of a call unless its request id is already taken.
+
+        Returns the commit record when the call already succeeded, so a retry
+        can answer with its result. Raises ValueError if the request id was
+        used for a different tool or different arguments, or if the call is
+        still pending (running, or interrupted and waiting for replay) and
+        `resume` is not set. A failed call may be run again.
+        """
+        with self._lock:
+            self._catch_up()
+            previous = self._pending.get(request_id) or self._latest.get(request_id)
+            if previous is not None:
+                if previous["tool"] != tool or _normalized(previous["args"]) != _normalized(args):
+                    raise ValueError(
+                        f"request_id '{request_id}' was already used for {previous['tool']} "
+                        f"with arguments {previous['args']}"
+                    )
+                if previous["type"] == COMMIT:
+                    return previous
+                if previous["type"] == BEGIN and not resume:
+                    raise ValueError(
+                        f"Request '{request_id}' is still in progress, or was interrupted; "
+                        "retry later or replay pending mutations"
+                    )
+            self._write({"type": BEGIN, "request_id": request_id, "tool": tool, "args": args})
+        return None
+
+    def begin(self, request_id: str, tool: str, args: dict[str, Any]) -> None:
+        self._append({"type": BEGIN, "request_id": request_id, "tool": tool, "args": args})
+
+    def commit(self, request_id: str, tool: str, args: dict[str, Any], result: Any) -> None:
+        self._append({"type": COMMIT, "request_id": request_id, "tool": tool, "args": args, "result": result})
+
+    def fail(self, request_id: str, tool: str, args: dict[str, Any], error: str) -> None:
+        self._append({"type": FAIL, "request_id": request_id, "tool": tool, "args": args, "error": error})
+
+    def pending(self, min_age_seconds: float = 0.0) -> list[dict[str, Any]]:
+        """Begin records with no commit/fail yet, oldest first."""
+        cutoff = time.time() - min_age_seconds
+        with self._lock:
+            self._catch_up()
+            return [r for r in self._pending.values() if r["ts"] <= cutoff]
+
+    def iter_since(self, offset: int = 0) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Stream (offset after the record, record) for every record from byte `offset` on."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a record still being written by another process
+                offset += len(line)
+                yield offset, json.loads(line)
+
+    # --- internals -----------------------------------------------------------
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            self._write(record)
+
+    def _write(self, record: dict[str, Any]) -> None:
+        # Called with the lock held.
+        record["ts"] = time.time()
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        os.write(self._fd, line)
+        self._remember(record)
+        if self._fsync_interval <= 0:
+            os.fsync(self._fd)
+        else:
+            self._dirty = True
+            self._wake.notify()
+
+    def _remember(self, record: dict[str, Any]) -> None:
+        request_id = record["request_id"]
+        if record["type"] == BEGIN:
+            self._pending[request_id] = record
+        else:
+            self._pending.pop(request_id, None)
+        self._latest[request_id] = record
+        self._latest.move_to_end(request_id)
+        while len(self._latest) > self._max_remembered:
+            self._latest.popitem(last=False)
+
+    def _catch_up(self) -> None:
+        # Index records appended since the last scan (ours included; they are idempotent to re-index).
+        for self._scanned, record in self.iter_since(self._scanned):
+            self._remember(record)
+
+    def _flush_loop(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._dirty:
+                    self._wake.wait()
+                    continue
+                self._dirty = False
+                self._lock.release()
+                try:
+                    os.fsync(self._fd)
+                    time.sleep(self._fsync_interval)
+                finally:
+                    self._lock.acquire()
+
+
+def _normalized(args: dict[str, Any]) -> Any:
+    """`args` as they read back from the log, so live and journaled arguments compare equal."""
+    return json.loads(json.dumps(args, ensure_ascii=False, default=str))
+
+
+def journaled(fn: Callable[..., Any] | None = None, *, idempotent: bool = False) -> Any:
+    """Record calls of a mutating tool in the mutation log, if one is configured.
+
+    The tool must take the context as `ctx` and accept a `request_id`
+    argument. A call repeating the request id of a committed call returns the
+    recorded result without touching the graph again; one repeating the id of
+    a call still in progress, or with other arguments, is refused. Without a
+    request id one is generated, so the call is still journaled.
+
+    Use as `@journaled(idempotent=True)` for tools that cannot apply anything
+    twice when run again (setting a property, deleting by caption); only
+    those are re-run by `replay_pending`.
+    """
+    if fn is None:
+        return functools.partial(journaled, idempotent=idempotent)
+    sig = inspect.signature(fn)
+    tool = fn.__name__
+
+    def call(bound: inspect.BoundArguments, *, resume: bool) -> Any:
+        from .gremlin_client import get_mutation_log
+
+        ctx = bound.arguments["ctx"]
+        log = get_mutation_log(ctx)
+        if log is None:
+            return fn(*bound.args, **bound.kwargs)
+
+        request_id = bound.arguments.get("request_id") or uuid.uuid4().hex
+        bound.arguments["request_id"] = request_id
+        call_args = {k: v for k, v in bound.arguments.items() if k not in ("ctx", "request_id")}
+
+        committed = log.claim(request_id, tool, call_args, resume=resume)
+        if committed is not None:
+            return committed["result"]
+        try:
+            result = fn(*bound.args, **bound.kwargs)
+        except Exception as e:
+            # Tools wrap errors in a ToolError carrying the whole traceback; keep the original message.
+            log.fail(request_id, tool, call_args, str(e.__cause__ or e.__context__ or e))
+            raise
+        result = to_plain(result)  # record batches are logged, and returned, as lists of dicts
+        log.commit(request_id, tool, call_args, result)
+        return result
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return call(sig.bind(*args, **kwargs), resume=False)
+
+    def replay(**kwargs: Any) -> Any:
+        return call(sig.bind(**kwargs), resume=True)
+
+    _HANDLERS[tool] = replay
+    if idempotent:
+        _IDEMPOTENT.add(tool)
+    else:
+        _IDEMPOTENT.discard(tool)
+    return wrapper
+
+
+def is_mutating_tool(tool: str) -> bool:
+    """Whether `tool` is a journaled (mutating) tool."""
+    return tool in _HANDLERS
+
+
+def replay_pending(log: MutationLog, ctx: Any, min_age_seconds: float = 60.0) -> list[dict[str, Any]]:
+    """Re-run calls whose outcome was never recorded, under their original request ids.
+
+    Only idempotent tools are re-run: the interrupted call may have been
+    applied before the process died, and running a create or a claim again
+    would then add a second vertex or edge, or claim a batch nobody receives.
+    Other calls are reported as "needs review" with their arguments and stay
+    pending. Each replayed call ends up committed or failed, so running this
+    again only picks up calls that became pending since. `min_age_seconds`
+    skips calls that may still be running in another process.
+    """
+    outcomes = []
+    for record in log.pending(min_age_seconds):
+        handler = _HANDLERS.get(record["tool"])
+        if handler is None:
+            outcomes.append({"request_id": record["request_id"], "tool": record["tool"], "state": "unknown tool"})
+            continue
+        if record["tool"] not in _IDEMPOTENT:
+            outcomes.append(
+                {"request_id": record["request_id"], "tool": record["tool"], "state": NEEDS_REVIEW, "args": record["args"]}
+            )
+            continue
+        try:
+            handler(ctx=ctx, request_id=record["request_id"], **record["args"])
+            state = COMMIT
+        except Exception:
+            state = FAIL
+        outcomes.append({"request_id": record["request_id"], "tool": record["tool"], "state": state})
+    return outcomes
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+from gremlin_python.process.traversal import T
+
+from .schema import ALLOWED_PROPS
+
+# Placeholder for a property the vertex does not have; never leaves this module.
+_MISSING = object()
+
+
+class VertexBatch:
+    """Vertices stored column-wise: one list per property instead of one dict per vertex.
+
+    Large results (searches, listings, subgraphs) are returned by the
+    helpers in this form and turned into dicts only at the tool boundary,
+    by `to_plain` (applied by `responses.encoded` and the mutation log).
+    Columns are created in the order of the keys given up front (e.g. a
+    label's properties from `schema.ALLOWED_PROPS`) and extended as new keys
+    show up.
+    """
+
+    __slots__ = ("ids", "labels", "columns")
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self.ids: list[Any] = []
+        self.labels: list[str] = []
+        self.columns: dict[str, list[Any]] = {key: [] for key in keys}
+
+    @classmethod
+    def for_labels(cls, labels: Iterable[str]) -> "VertexBatch":
+        keys = dict.fromkeys(key for label in labels for key in sorted(ALLOWED_PROPS.get(label, ())))
+        return cls(keys)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, internal_id: Any, label: str, props: Mapping[Any, Any]) -> None:
+        """Add a vertex; single-element value lists (valueMap output) are unwrapped."""
+        n = len(self.ids)
+        self.ids.append(internal_id)
+        self.labels.append(label)
+        columns = self.columns
+        for key, value in props.items():
+            if type(value) is list and len(value) == 1:
+                value = value[0]
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [_MISSING] * n
+            column.append(value)
+        n += 1
+        if len(props) < len(columns):
+            for column in columns.values():
+                if len(column) < n:
+                    column.append(_MISSING)
+
+    def append_element_map(self, raw: dict[Any, Any]) -> None:
+        """Add one `elementMap()` / `valueMap(True)` result (consumed in the process)."""
+        internal_id = raw.pop(T.id)
+        label = raw.pop(T.label)
+        self.append(internal_id, label, raw)
+
+    def values(self, key: str) -> list[Any]:
+        """One property of every vertex, None where a vertex lacks it."""
+        return [None if value is _MISSING else value for value in self.columns.get(key, [_MISSING] * len(self.ids))]
+
+    def row(self, i: int) -> dict[str, Any]:
+        out: dict[str, Any] = {"internal_id": self.ids[i], "label": self.labels[i]}
+        for key, column in self.columns.items():
+            value = column[i]
+            if value is not _MISSING:
+                out[key] = value
+        return out
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        return self.row(range(len(self.ids))[i])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (self.row(i) for i in range(len(self.ids)))
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        items = list(self.columns.items())
+        out = []
+        for i, (internal_id, label) in enumerate(zip(self.ids, self.labels)):
+            d = {"internal_id": internal_id, "label": label}
+            for key, column in items:
+                value = column[i]
+                if value is not _MISSING:
+                    d[key] = value
+            out.append(d)
+        return out
+
+
+class EdgeBatch:
+    """Edges stored column-wise, deduplicated by edge id."""
+
+    __slots__ = ("ids", "labels", "from_ids", "to_ids", "_seen")
+
+    def __init__(self) -> None:
+        self.ids: list[Any] = []
+        self.labels: list[str] = []
+        self.from_ids: list[int] = []
+        self.to_ids: list[int] = []
+        self._seen: set[Any] = set()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, edge_id: Any, label: str, from_id: int, to_id: int) -> None:
+        if edge_id in self._seen:
+            return
+        self._seen.add(edge_id)
+        self.ids.append(edge_id)
+        self.labels.append(label)
+        self.from_ids.append(from_id)
+        self.to_ids.append(to_id)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (
+            {"id": i, "label": label, "from_id": f, "to_id": t}
+            for i, label, f, t in zip(self.ids, self.labels, self.from_ids, self.to_ids)
+        )
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        return list(self)
+
+
+def to_plain(value: Any) -> Any:
+    """`value` with batches turned into lists of dicts, at the top level or as values of a dict."""
+    if isinstance(value, (VertexBatch, EdgeBatch)):
+        return value.to_dicts()
+    if isinstance(value, dict) and any(isinstance(v, (VertexBatch, EdgeBatch)) for v in value.values()):
+        return {k: to_plain(v) for k, v in value.items()}
+    return value
@@ -0,0 +1,102 @@
+"""Fast encoding of large tool results.
+
+FastMCP turns a tool's return value into a response twice over: an
+indented JSON text block (one per item for lists) and a validated,
+re-dumped copy of the whole value as structured content. For the notion
+tree or a batch of verses with their text that is megabytes of work on
+every call.
+
+Tools decorated with `encoded` return their results as a ready-made
+`CallToolResult` instead: the text block is the compact JSON of the
+result, written by orjson when it is installed (`pip install
+theo-mcp-server[fast]`) and by the standard library otherwise, and the
+result itself is the structured content, with record batches
+(`records.VertexBatch`, `EdgeBatch`) turned into lists of dicts. FastMCP (1.19 and
+later) passes such a result through after validating its structured
+content against the output schema, which for these dict and list return
+types only checks the top level; nothing is re-dumped. FAST_RESPONSES=false
+returns the (converted) results to FastMCP as they are.
+"""
+from __future__ import annotations
+
+import dataclasses
+import functools
+import inspect
+import json
+import typing
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+from .config import get_config
+from .records import to_plain
+
+
+@cache
+def _orjson() -> Any:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _default(value: Any) -> Any:
+    # Dataclasses (e.g. `RelationIdentifier`) as objects, like the structured content; anything else as a string.
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def encode_json(value: Any) -> str:
+    """Compact JSON of `value`, the same with or without orjson."""
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def encoded_result(result: Any, wrap: bool = False) -> Any:
+    """`result` as a `CallToolResult`, built without pydantic validation (`model_construct`).
+
+    `wrap` puts the structured content under "result", as FastMCP does for
+    tools whose return type is not a dict.
+    """
+    from mcp.types import CallToolResult, TextContent
+
+    text = TextContent.model_construct(type="text", text=encode_json(result))
+    return CallToolResult.model_construct(
+        content=[text],
+        structuredContent={"result": result} if wrap else result,
+        isError=False,
+    )
+
+
+def encoded(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Return the tool's result as a pre-encoded `CallToolResult` (see the module docstring).
+
+    Apply below `bounded`, so the encoding runs in the tool's worker thread,
+    and above `journaled`, so the mutation log records the plain result.
+    The tool keeps its signature and output schema.
+    """
+    return_type = typing.get_type_hints(fn).get("return")
+    wrap = typing.get_origin(return_type) is not dict
+
+    def encode(result: Any) -> Any:
+        result = to_plain(result)
+        if not get_config().fast_responses:
+            return result
+        return encoded_result(result, wrap)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return encode(await fn(*args, **kwargs))
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return encode(fn(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.traversal import Binding, Bytecode, P
+
+from .change_feed import ChangeEvent, ChangeFeed, get_change_feed
+from .config import get_config
+
+# Steps that change the graph (or may: `io`, `call`).
+MUTATING_STEPS = frozenset({"addV", "addE", "property", "drop", "mergeV", "mergeE", "io", "call"})
+
+# Steps whose traversals are never cached: they change the graph, or give a
+# different answer on every run.
+UNCACHEABLE_STEPS = MUTATING_STEPS | {"coin", "sample"}
+
+# Steps that only filter the start vertices; the labels are read from these.
+_FILTER_STEPS = frozenset({"has", "hasLabel", "hasId", "hasKey", "hasValue", "hasNot", "limit", "range"})
+
+# Label of entries whose start vertices' labels are unknown; any change evicts them.
+ANY_LABEL = "*"
+
+
+def _normalize(obj: Any) -> Any:
+    """Reduce bytecode arguments to plain values whose `repr` is stable."""
+    if isinstance(obj, Bytecode):
+        return (
+            "bytecode",
+            _normalize(obj.source_instructions),
+            _normalize(obj.step_instructions),
+            _normalize(obj.bindings),
+        )
+    if isinstance(obj, P):  # TextP too
+        return (type(obj).__name__, obj.operator, _normalize(obj.value), _normalize(obj.other))
+    if isinstance(obj, Binding):
+        return ("binding", obj.key, _normalize(obj.value))
+    if isinstance(obj, dict):
+        return ("dict", tuple(sorted((repr(_normalize(k)), repr(_normalize(v))) for k, v in obj.items())))
+    if isinstance(obj, (set, frozenset)):
+        return ("set", tuple(sorted(repr(_normalize(v)) for v in obj)))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_normalize(v) for v in obj)
+    return obj
+
+
+def bytecode_key(bytecode: Bytecode) -> str:
+    return hashlib.sha256(repr(_normalize(bytecode)).encode("utf-8")).hexdigest()
+
+
+def _step_names(bytecode: Bytecode) -> Iterable[str]:
+    for name, *args in bytecode.source_instructions + bytecode.step_instructions:
+        yield name
+        for arg in args:
+            if isinstance(arg, Bytecode):
+                yield from _step_names(arg)
+
+
+def is_read_only(bytecode: Bytecode) -> bool:
+    return MUTATING_STEPS.isdisjoint(_step_names(bytecode))
+
+
+def is_cacheable(bytecode: Bytecode) -> bool:
+    """Only vertex/edge reads are cached: no mutating or random steps, and not
+    `inject()`, which the client uses as a connection liveness probe."""
+    steps = bytecode.step_instructions
+    if not steps or steps[0][0] not in ("V", "E"):
+        return False
+    return UNCACHEABLE_STEPS.isdisjoint(_step_names(bytecode))
+
+
+def _labels_of(value: Any) -> list[str] | None:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, P) and value.operator in ("eq", "within"):
+        values = value.value if isinstance(value.value, (list, tuple, set)) else [value.value]
+        if all(isinstance(v, str) for v in values):
+            return list(values)
+    return None
+
+
+def start_labels(bytecode: Bytecode) -> frozenset[str]:
+    """Vertex labels the traversal starts from, read from the `hasLabel()` /
+    `has("type", ...)` filters right after `V()`; `ANY_LABEL` if unknown.
+
+    Graph changes publish the labels of every vertex whose reads they affect,
+    neighbours included, so the start labels are enough to evict an entry.
+    """
+    labels: set[str] = set()
+    for name, *args in bytecode.step_instructions[1:]:
+        if name not in _FILTER_STEPS:
+            break
+        found = None
+        if name == "hasLabel":
+            found = [a for a in args if isinstance(a, str)] or None
+        elif name == "has" and len(args) == 2 and args[0] == "type":
+            found = _labels_of(args[1])
+        elif name == "has" and len(args) == 3:
+            found = _labels_of(args[0])
+        if found:
+            labels.update(found)
+    return frozenset(labels) if labels else frozenset({ANY_LABEL})
+
+
+class ResultCache:
+    """Results of read traversals, keyed by their normalized bytecode.
+
+    Results are stored pickled: the traversers handed out are consumed (and
+    their contents sometimes modified) by the caller, so each hit gets fresh
+    copies, and the pickle size gives the size bound. Entries expire after
+    `ttl` seconds; least recently used ones go first once `max_bytes` is
+    exceeded. Graph changes from any server process, read from `feed`, evict
+    the entries whose start labels they touch. A result read while one of
+    its labels was invalidated may predate the change, so `put` drops it
+    (see `generation`).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, feed: ChangeFeed | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._feed = feed
+        # key -> (expires at, labels, pickled traversers), least recently used first
+        self._entries: OrderedDict[str, tuple[float, frozenset[str], bytes]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        # Invalidations so far, the last one of everything, and the last one touching each label.
+        self._generation = 0
+        self._cleared = 0
+        self._invalidated: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if feed is not None:
+            feed.subscribe(self._on_changes)
+
+    def get(self, key: str) -> list[Any] | None:
+        if self._feed is not None:
+            self._feed.poll()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            data = entry[2]
+        return pickle.loads(data)
+
+    def generation(self) -> int:
+        """Current invalidation count; pass it to `put` for a result read from now on."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: str, traversers: list[Any], labels: frozenset[str], generation: int) -> None:
+        """Store a result read since `generation`, unless its labels were invalidated meanwhile."""
+        if self._feed is not None:
+            self._feed.poll()
+        data = pickle.dumps(traversers, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes // 4:
+            return  # one huge result would push out everything else
+        with self._lock:
+            if self._cleared > generation or any(self._invalidated.get(label, 0) > generation for label in labels):
+                return  # a change came in while it was being read
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, labels, data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def bypass(self) -> None:
+        with self._lock:
+            self._bypassed += 1
+
+    def invalidate(self, labels: Iterable[str] | None = None) -> None:
+        """Drop entries starting from any of `labels` (and those of unknown labels); None drops all."""
+        with self._lock:
+            self._generation += 1
+            if labels is None:
+                self._cleared = self._generation
+                self._entries.clear()
+                self._bytes = 0
+                return
+            labels = set(labels) | {ANY_LABEL}
+            self._invalidated.update(dict.fromkeys(labels, self._generation))
+            for key in [k for k, (_, entry_labels, _) in self._entries.items() if entry_labels & labels]:
+                self._drop(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+            }
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= len(self._entries.pop(key)[2])
+
+    def _on_changes(self, events: list[ChangeEvent] | None) -> None:
+        if events is None:
+            self.invalidate(None)
+        else:
+            self.invalidate({label for e in events for label in e.labels})
+
+
+class CachingRemoteConnection:
+    """Remote connection that answers repeated read traversals from a `ResultCache`.
+
+    Everything but `submit` (closing, `_client` for scripts) goes to the
+    wrapped connection.
+    """
+
+    def __init__(self, connection: Any, cache: ResultCache) -> None:
+        self._connection = connection
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+        if not is_cacheable(bytecode):
+            self.cache.bypass()
+            return self._connection.submit(bytecode)
+        key = bytecode_key(bytecode)
+        traversers = self.cache.get(key)
+        if traversers is None:
+            generation = self.cache.generation()
+            traversers = list(self._connection.submit(bytecode).traversers)
+            self.cache.put(key, traversers, start_labels(bytecode), generation)
+        return RemoteTraversal(iter(traversers))
+
+    def cache_stats(self) -> dict[str, Any]:
+        return self.cache.stats()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache | None:
+    """The process-wide result cache, or None when RESULT_CACHE_MAX_BYTES is 0."""
+    global _cache
+    cfg = get_config()
+    if cfg.result_cache_max_bytes <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(cfg.result_cache_max_bytes, cfg.result_cache_ttl, get_change_feed())
+        return _cache
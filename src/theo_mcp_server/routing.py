@@ -0,0 +1,294 @@
+"""Routing of traversals across several Gremlin Server nodes.
+
+Reads (traversals without mutating steps) are spread over GREMLIN_READ_URLS,
+either round-robin or to the node expected to answer first (least latency).
+Writes go to the first available node of GREMLIN_WRITE_URLS, so one writer
+sees every mutation and the next one takes over only while it is down.
+
+A node whose connection fails is taken out of rotation. Once
+GREMLIN_HEALTH_CHECK_INTERVAL seconds have passed, the next traversal routed
+to it first probes it with `g.inject(0)`; the node is back in rotation when
+the probe succeeds. A read that fails because its node went away is retried
+on the other nodes. A write is not retried, since it may have been applied.
+
+Node health is kept per process, so every connection (and every sidecar pool
+member) sees the same picture.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .config import Config
+
+ROUND_ROBIN = "round_robin"
+LEAST_LATENCY = "least_latency"
+
+# Seconds a health probe may take before the node counts as down.
+PROBE_TIMEOUT = 5.0
+
+# Weight of the latest reply in a node's moving average latency.
+LATENCY_WEIGHT = 0.3
+
+
+@dataclass
+class EndpointHealth:
+    url: str
+    healthy: bool = True
+    retry_at: float = 0.0  # time.monotonic() after which a down node is probed again
+    latency: float | None = None  # moving average, seconds
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    last_error: str | None = None
+
+    def expected_wait(self) -> float:
+        # Nodes not measured yet come first, so each gets measured.
+        return (self.latency or 0.0) * (self.in_flight + 1)
+
+
+_endpoints: dict[str, EndpointHealth] = {}
+_endpoints_lock = threading.Lock()
+
+
+def endpoint_health(url: str) -> EndpointHealth:
+    with _endpoints_lock:
+        health = _endpoints.get(url)
+        if health is None:
+            health = _endpoints[url] = EndpointHealth(url)
+        return health
+
+
+def split_urls(value: str) -> list[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def is_node_failure(exc: BaseException) -> bool:
+    """Whether `exc` means the node is unreachable, as opposed to a failed traversal."""
+    from .gremlin_client import _is_closed_connection_error
+
+    return isinstance(exc, OSError) or _is_closed_connection_error(exc)
+
+
+def _probe_bytecode() -> Any:
+    from gremlin_python.process.traversal import Bytecode
+
+    bytecode = Bytecode()
+    bytecode.add_step("inject", 0)
+    return bytecode
+
+
+class RoutingRemoteConnection:
+    """Remote connection that sends reads to the read nodes and writes to the writer.
+
+    Drop-in for `DriverRemoteConnection`: `submit`, `submit_async`, `close`
+    and `_client` (scripts go to the writer). `connect(url)` opens a
+    connection to one node; connections are opened on first use.
+    """
+
+    def __init__(
+        self,
+        read_urls: list[str],
+        write_urls: list[str],
+        connect: Callable[[str], Any],
+        balance: str = LEAST_LATENCY,
+        health_check_interval: float = 10.0,
+    ) -> None:
+        if balance not in (ROUND_ROBIN, LEAST_LATENCY):
+            raise ValueError(f"Unknown read balancing {balance!r}; use {ROUND_ROBIN} or {LEAST_LATENCY}")
+        self.read_urls = read_urls
+        self.write_urls = write_urls
+        self._connect = connect
+        self._balance = balance
+        self._health_check_interval = health_check_interval
+        self._turn = itertools.count()
+        self._connections: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: Config, connect: Callable[[str], Any]) -> "RoutingRemoteConnection":
+        write_urls = split_urls(cfg.gremlin_write_urls) or [cfg.gremlin_url]
+        return cls(
+            split_urls(cfg.gremlin_read_urls) or write_urls,
+            write_urls,
+            connect,
+            balance=cfg.gremlin_read_balance,
+            health_check_interval=cfg.gremlin_health_check_interval,
+        )
+
+    # --- remote connection ----------------------------------------------------
+
+    def submit(self, bytecode: Any) -> Any:
+        from .result_cache import is_read_only
+
+        read = is_read_only(bytecode)
+        tried: set[str] = set()
+        while True:
+            health, conn = self._pick(read, tried)
+            started = self._started(health)
+            try:
+                result = conn.submit(bytecode)
+            except Exception as e:
+                self._finished(health, started, e)
+                if read and is_node_failure(e) and self._untried(read, tried):
+                    continue
+                raise
+            self._finished(health, started, None)
+            return result
+
+    def submit_async(self, bytecode: Any) -> concurrent.futures.Future:
+        from .result_cache import is_read_only
+
+        out: concurrent.futures.Future = concurrent.futures.Future()
+        self._submit_async(bytecode, is_read_only(bytecode), set(), out)
+        return out
+
+    @property
+    def _client(self) -> Any:
+        return self._pick(False, set())[1]._client
+
+    def endpoint_stats(self) -> list[dict[str, Any]]:
+        stats = []
+        for url in dict.fromkeys(self.write_urls + self.read_urls):
+            health = endpoint_health(url)
+            roles = [role for role, urls in (("write", self.write_urls), ("read", self.read_urls)) if url in urls]
+            stats.append({
+                "url": url,
+                "roles": roles,
+                "healthy": health.healthy,
+                "latency_ms": round(health.latency * 1000, 3) if health.latency is not None else None,
+                "in_flight": health.in_flight,
+                "requests": health.requests,
+                "failures": health.failures,
+                "last_error": health.last_error,
+            })
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # --- routing --------------------------------------------------------------
+
+    def _submit_async(self, bytecode: Any, read: bool, tried: set[str], out: concurrent.futures.Future) -> None:
+        try:
+            health, conn = self._pick(read, tried)
+        except Exception as e:
+            out.set_exception(e)
+            return
+        started = self._started(health)
+
+        def done(future: concurrent.futures.Future) -> None:
+            error = future.exception()
+            self._finished(health, started, error)
+            if error is None:
+                out.set_result(future.result())
+            elif read and is_node_failure(error) and self._untried(read, tried):
+                self._submit_async(bytecode, read, tried, out)
+            else:
+                out.set_exception(error)
+
+        try:
+            future = conn.submit_async(bytecode)
+        except Exception as e:
+            future = concurrent.futures.Future()
+            future.set_exception(e)
+        future.add_done_callback(done)
+
+    def _pick(self, read: bool, tried: set[str]) -> tuple[EndpointHealth, Any]:
+        """The node to send the next traversal to, and a connection to it."""
+        urls = self.read_urls if read else self.write_urls
+        nodes = [endpoint_health(url) for url in urls if url not in tried]
+        if not nodes:
+            raise ConnectionError("No Gremlin endpoint left to try")
+        now = time.monotonic()
+        due = [h for h in nodes if not h.healthy and h.retry_at <= now]
+        if read:
+            candidates = due + self._balanced([h for h in nodes if h.healthy])
+        else:
+            # Writers keep their priority: a recovered first writer takes over again.
+            candidates = [h for h in nodes if h.healthy or h in due]
+        # With every node down, try them all rather than fail without trying.
+        candidates = candidates or sorted(nodes, key=lambda h: h.retry_at)
+
+        error: Exception | None = None
+        for health in candidates:
+            tried.add(health.url)
+            try:
+                return health, self._connection(health)
+            except Exception as e:
+                self._mark_down(health, e)
+                error = e
+        assert error is not None
+        raise error
+
+    def _balanced(self, nodes: list[EndpointHealth]) -> list[EndpointHealth]:
+        if not nodes:
+            return nodes
+        # Rotate first so that nodes in a tie take turns.
+        turn = next(self._turn) % len(nodes)
+        nodes = nodes[turn:] + nodes[:turn]
+        if self._balance == LEAST_LATENCY:
+            nodes.sort(key=EndpointHealth.expected_wait)
+        return nodes
+
+    def _untried(self, read: bool, tried: set[str]) -> bool:
+        return any(url not in tried for url in (self.read_urls if read else self.write_urls))
+
+    def _connection(self, health: EndpointHealth) -> Any:
+        with self._lock:
+            conn = self._connections.get(health.url)
+        if conn is None:
+            conn = self._connect(health.url)
+            with self._lock:
+                existing = self._connections.setdefault(health.url, conn)
+            if existing is not conn:
+                conn.close()
+                conn = existing
+        if not health.healthy:
+            conn.submit_async(_probe_bytecode()).result(timeout=PROBE_TIMEOUT)
+            with _endpoints_lock:
+                health.healthy = True
+        return conn
+
+    def _mark_down(self, health: EndpointHealth, error: BaseException) -> None:
+        with _endpoints_lock:
+            health.healthy = False
+            health.failures += 1
+            health.retry_at = time.monotonic() + self._health_check_interval
+            health.last_error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            conn = self._connections.pop(health.url, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _started(self, health: EndpointHealth) -> float:
+        with _endpoints_lock:
+            health.in_flight += 1
+            health.requests += 1
+        return time.monotonic()
+
+    def _finished(self, health: EndpointHealth, started: float, error: BaseException | None) -> None:
+        elapsed = time.monotonic() - started
+        with _endpoints_lock:
+            health.in_flight -= 1
+            if error is None:
+                health.latency = (
+                    elapsed if health.latency is None
+                    else LATENCY_WEIGHT * elapsed + (1 - LATENCY_WEIGHT) * health.latency
+                )
+        if error is not None and is_node_failure(error):
+            self._mark_down(health, error)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+import hmac
+import ssl
+import time
+from collections import deque
+from urllib.parse import quote, urlsplit
+
+from .cloud_storage import RequestTiming, _ConnectionPool, _HTTPStatusError
+from .config import Config
+
+_ALGORITHM = "AWS4-HMAC-SHA256"
+_UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+# The longest lifetime SigV4 allows for a presigned URL (7 days).
+MAX_PRESIGN_SECONDS = 7 * 24 * 3600
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _signing_key(secret_key: str, date: str, region: str) -> bytes:
+    key = _hmac(f"AWS4{secret_key}".encode("utf-8"), date)
+    key = _hmac(key, region)
+    key = _hmac(key, "s3")
+    return _hmac(key, "aws4_request")
+
+
+def _canonical_query(params: dict[str, str]) -> str:
+    return "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items())
+    )
+
+
+def _signature(
+    secret_key: str,
+    region: str,
+    amz_date: str,
+    method: str,
+    path: str,
+    query: str,
+    headers: dict[str, str],
+    payload_hash: str,
+) -> tuple[str, str]:
+    """Return (signed_headers, signature) for an AWS Signature Version 4 request."""
+    names = sorted(h.lower() for h in headers)
+    lowered = {k.lower(): v.strip() for k, v in headers.items()}
+    canonical_headers = "".join(f"{n}:{lowered[n]}\n" for n in names)
+    signed_headers = ";".join(names)
+    canonical_request = "\n".join(
+        [method, path, query, canonical_headers, signed_headers, payload_hash]
+    )
+    scope = f"{amz_date[:8]}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [_ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()]
+    )
+    signature = hmac.new(
+        _signing_key(secret_key, amz_date[:8], region), string_to_sign.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return signed_headers, signature
+
+
+def presign_url(
+    *,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    scheme: str,
+    host: str,
+    path: str,
+    expires: int,
+    now: datetime.datetime | None = None,
+    method: str = "GET",
+) -> str:
+    """Build a SigV4 presigned URL for `path` (already URI-encoded) on `host`."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    params = {
+        "X-Amz-Algorithm": _ALGORITHM,
+        "X-Amz-Credential": f"{access_key}/{amz_date[:8]}/{region}/s3/aws4_request",
+        "X-Amz-Date": amz_date,
+        "X-Amz-Expires": str(expires),
+        "X-Amz-SignedHeaders": "host",
+    }
+    query = _canonical_query(params)
+    _, signature = _signature(
+        secret_key, region, amz_date, method, path, query, {"host": host}, _UNSIGNED_PAYLOAD
+    )
+    return f"{scheme}://{host}{path}?{query}&X-Amz-Signature={signature}"
+
+
+class S3Storage:
+    """`CloudStorage` backed by an S3-compatible object store (AWS S3, MinIO, ...).
+
+    Objects live under `{endpoint}/{bucket}/{key}` (path-style addressing,
+    which MinIO and most self-hosted stores expect). Requests are signed with
+    AWS Signature Version 4 and go over keep-alive connections, using only the
+    standard library. The returned link is `{public_url}/{key}` when a public
+    URL is configured (e.g. a public-read bucket or a CDN in front of it),
+    otherwise a presigned GET URL valid for `link_expiry_seconds`.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        *,
+        region: str = "us-east-1",
+        prefix: str = "",
+        public_url: str = "",
+        link_expiry_seconds: int = MAX_PRESIGN_SECONDS,
+        verify_ssl: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        parts = urlsplit(endpoint.rstrip("/"))
+        self._scheme = parts.scheme or "https"
+        self._host = parts.netloc
+        self._base_path = parts.path.rstrip("/")
+        self._bucket = bucket
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self._prefix = prefix.strip("/")
+        self._public_url = public_url.rstrip("/")
+        self._link_expiry_seconds = min(link_expiry_seconds, MAX_PRESIGN_SECONDS)
+        ssl_context = None if verify_ssl else ssl._create_unverified_context()
+        self._pool = _ConnectionPool(
+            self._scheme, parts.hostname or "localhost", parts.port, ssl_context=ssl_context, timeout=timeout
+        )
+        self.request_timings: deque[RequestTiming] = deque(maxlen=100)
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "S3Storage":
+        return cls(
+            cfg.s3_endpoint,
+            cfg.s3_bucket,
+            cfg.s3_access_key,
+            cfg.s3_secret_key,
+            region=cfg.s3_region,
+            prefix=cfg.s3_prefix,
+            public_url=cfg.s3_public_url,
+            verify_ssl=cfg.s3_verify_ssl,
+        )
+
+    @property
+    def link_lifetime_seconds(self) -> int | None:
+        """How long a returned link works; None for links under a public URL."""
+        return None if self._public_url else self._link_expiry_seconds
+
+    def close(self) -> None:
+        self._pool.close()
+
+    # --- internals -----------------------------------------------------------
+
+    def _key(self, filename: str) -> str:
+        return f"{self._prefix}/{filename}" if self._prefix else filename
+
+    def _object_path(self, key: str) -> str:
+        return f"{self._base_path}/{quote(self._bucket, safe='')}/{quote(key, safe='/-_.~')}"
+
+    def _request(self, method: str, key: str, body: bytes | None = None,
+                 headers: dict[str, str] | None = None) -> bytes:
+        path = self._object_path(key)
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        payload_hash = hashlib.sha256(body or b"").hexdigest()
+        signed = {
+            "host": self._host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+            **(headers or {}),
+        }
+        signed_headers, signature = _signature(
+            self._secret_key, self._region, amz_date, method, path, "", signed, payload_hash
+        )
+        all_headers = {
+            **signed,
+            "Authorization": (
+                f"{_ALGORITHM} Credential={self._access_key}/{amz_date[:8]}/{self._region}/s3/aws4_request, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+        }
+        if body is not None:
+            all_headers["Content-Length"] = str(len(body))
+        status = 0
+        started = time.perf_counter()
+        try:
+            status, data = self._pool.request(method, path, body, all_headers)
+        finally:
+            self.request_timings.append(
+                RequestTiming(method, path, status, time.perf_counter() - started)
+            )
+        if status >= 400:
+            raise _HTTPStatusError(status, data)
+        return data
+
+    def _link(self, key: str) -> str:
+        if self._public_url:
+            return f"{self._public_url}/{quote(key, safe='/-_.~')}"
+        return presign_url(
+            access_key=self._access_key,
+            secret_key=self._secret_key,
+            region=self._region,
+            scheme=self._scheme,
+            host=self._host,
+            path=self._object_path(key),
+            expires=self._link_expiry_seconds,
+        )
+
+    # --- CloudStorage interface ----------------------------------------------
+
+    def upload(
+        self,
+        filename: str,
+        content: bytes | str,
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        key = self._key(filename)
+        try:
+            self._request("PUT", key, content, {"content-type": content_type})
+        except _HTTPStatusError as e:
+            raise RuntimeError(f"S3 upload failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"S3 upload failed: {e}") from e
+        return self._link(key)
+
+    def delete(self, filename: str) -> bool:
+        try:
+            # S3 answers 204 whether or not the object existed.
+            self._request("DELETE", self._key(filename))
+        except _HTTPStatusError as e:
+            if e.status == 404:
+                return True
+            raise RuntimeError(f"S3 delete failed ({e.status}): {e.text()}") from e
+        except OSError as e:
+            raise RuntimeError(f"S3 delete failed: {e}") from e
+        return True
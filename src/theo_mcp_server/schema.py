@@ -43,3 +43,114 @@ REQUIRED_PROPS: dict[str, set[str]] = {
     "notionGroup": {"caption"},
     "verseGroup": {"caption"},
 }
+
+# Value types of properties; inputs are coerced to these on create (e.g. "3" -> 3)
+PROP_TYPES: dict[str, dict[str, type]] = {
+    "verse": {"chapter": int, "importIndex": int, "verse": int},
+    "quotation": {"importIndex": int},
+}
+
+# Relationships the create tools take, as the caller names them. The backward
+# ones (e.g. "supports") are stored as the reverse edge ("isSupportedBy") from
+# the related vertex.
+RELATIONSHIPS: tuple[str, ...] = (
+    "isSupportedBy",
+    "supports",
+    "isChallengedBy",
+    "challenges",
+    "refersTo",
+    "isReferredBy",
+    "contains",
+    "isContainedIn",
+)
+
+# Per label created with relationships: the relationships it accepts and the
+# labels of the vertices they may point to.
+CREATE_RELATIONSHIPS: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "notion": (RELATIONSHIPS, ("notion", "verse", "notionGroup", "book", "verseGroup", "person")),
+    "notionGroup": (RELATIONSHIPS, ("notion", "verse", "notionGroup", "book", "verseGroup", "person")),
+    "verseGroup": (RELATIONSHIPS, ("notion", "verse", "notionGroup", "book", "verseGroup", "person")),
+    "quotation": (("isContainedIn",), ("book", "person")),
+}
+
+# Bible book abbreviations used in verse captions: abbreviation -> book
+BOOK_ABBREVIATIONS: dict[str, str] = {
+    "Acts": "Acts",
+    "2Pet": "II Peter",
+    "Gal": "Galatians",
+    "1Kgs": "I Kings",
+    "Ps": "Psalms",
+    "1Mac": "I Maccabees",
+    "Esth": "Esther",
+    "Hab": "Habakkuk",
+    "Hag": "Haggai",
+    "Jdt": "Judith",
+    "Bar": "Baruch",
+    "Zech": "Zechariah",
+    "1Cor": "I Corinthians",
+    "Hos": "Hosea",
+    "3Mac": "III Maccabees",
+    "Lk": "Luke",
+    "1Sam": "I Samuel",
+    "Judg": "Judges",
+    "Eccl": "Ecclesiastes",
+    "Jonah": "Jonah",
+    "Jn": "John",
+    "Mt": "Matthew",
+    "Prov": "Proverbs",
+    "Lam": "Lamentations",
+    "2Kgs": "II Kings",
+    "1Chr": "I Chronicles",
+    "Amos": "Amos",
+    "1Th": "I Thessalonians",
+    "Phlm": "Philemon",
+    "2Tim": "II Timothy",
+    "Zeph": "Zephaniah",
+    "Nah": "Nahum",
+    "Joel": "Joel",
+    "Rom": "Romans",
+    "Gen": "Genesis",
+    "Jude": "Jude",
+    "2Cor": "II Corinthians",
+    "Heb": "Hebrews",
+    "2Mac": "II Maccabees",
+    "Wis": "Wisdom",
+    "2Jn": "II John",
+    "Tob": "Tobit",
+    "Sir": "Sirach",
+    "Deut": "Deuteronomy",
+    "Mal": "Malachi",
+    "PrMan": "Prayer of Manasses",
+    "2Chr": "II Chronicles",
+    "Ezr": "Ezra",
+    "Dan": "Daniel",
+    "1Jn": "I John",
+    "Ruth": "Ruth",
+    "Col": "Colossians",
+    "SS": "Song of Solomon",
+    "Job": "Job",
+    "EpJer": "Epistle of Jeremiah",
+    "Mic": "Micah",
+    "Jas": "James",
+    "Phil": "Philippians",
+    "Eph": "Ephesians",
+    "1Tim": "I Timothy",
+    "Ex": "Exodus",
+    "3Jn": "III John",
+    "Tit": "Titus",
+    "Ez": "Ezekiel",
+    "Num": "Numbers",
+    "Mk": "Mark",
+    "2Th": "II Thessalonians",
+    "Obad": "Obadiah",
+    "1Esd": "I Esdras",
+    "2Esd": "II Esdras",
+    "2Sam": "II Samuel",
+    "1Pet": "I Peter",
+    "Josh": "Joshua",
+    "Lev": "Leviticus",
+    "Rev": "Revelation of John",
+    "Jer": "Jeremiah",
+    "Is": "Isaiah",
+    "Neh": "Nehemiah",
+}
@@ -0,0 +1,251 @@
+"""Gremlin message serializers that understand JanusGraph's own types.
+
+JanusGraph sends edge and vertex property ids as `RelationIdentifier`s,
+which GraphBinary encodes as a custom type (type code 0x00 followed by the
+type name) and GraphSON tags `janusgraph:RelationIdentifier`. The stock
+gremlin-python readers fail on the former with `KeyError: DataType.custom`,
+which is why traversals used to avoid returning elements; the readers here
+turn both into `RelationIdentifier` values, so vertices, edges and
+properties can be returned directly.
+
+GREMLIN_SERIALIZER picks the wire format: `graphbinary` (default) or
+`graphson` (GraphSON v3). `benchmarks/serializer_benchmark.py` compares them
+on the result shapes the tools fetch.
+"""
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import Any
+
+from gremlin_python.driver.serializer import GraphBinarySerializersV1, GraphSONMessageSerializer
+from gremlin_python.structure.graph import Path
+from gremlin_python.structure.io import graphbinaryV1, graphsonV3d0
+from gremlin_python.structure.io.graphbinaryV1 import DataType, int32_pack, int64_pack, int64_unpack, uint8_unpack
+
+GRAPHBINARY = "graphbinary"
+GRAPHSON = "graphson"
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _encode_long(value: int) -> str:
+    # JanusGraph's LongEncoding: base 36, as in the ids its console and REST output show.
+    if value == 0:
+        return "0"
+    digits = []
+    while value:
+        value, digit = divmod(value, 36)
+        digits.append(_BASE36[digit])
+    return "".join(reversed(digits))
+
+
+def _decode_long(text: str) -> int:
+    return int(text, 36)
+
+
+@dataclass(frozen=True)
+class RelationIdentifier:
+    """Id of a JanusGraph edge or vertex property (`in_vertex_id` is None for properties).
+
+    `str()` gives JanusGraph's own text form, e.g. "4r6-39s-6c5-3bs", which
+    `g.E(...)` accepts back.
+    """
+
+    out_vertex_id: int | str
+    type_id: int
+    relation_id: int
+    in_vertex_id: int | str | None = None
+
+    def __str__(self) -> str:
+        parts = [_encode_long(self.relation_id), self._encode_vertex_id(self.out_vertex_id), _encode_long(self.type_id)]
+        if self.in_vertex_id is not None:
+            parts.append(self._encode_vertex_id(self.in_vertex_id))
+        return "-".join(parts)
+
+    @classmethod
+    def from_string(cls, text: str) -> "RelationIdentifier":
+        parts = text.split("-")
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Not a JanusGraph relation id: {text!r}")
+        in_vertex_id = cls._decode_vertex_id(parts[3]) if len(parts) == 4 else None
+        return cls(cls._decode_vertex_id(parts[1]), _decode_long(parts[2]), _decode_long(parts[0]), in_vertex_id)
+
+    @staticmethod
+    def _encode_vertex_id(vertex_id: int | str) -> str:
+        return _encode_long(vertex_id) if isinstance(vertex_id, int) else f"S{vertex_id}"
+
+    @staticmethod
+    def _decode_vertex_id(text: str) -> int | str:
+        return text[1:] if text.startswith("S") else _decode_long(text)
+
+
+# --- GraphBinary -------------------------------------------------------------
+
+
+class RelationIdentifierIO(graphbinaryV1._GraphBinaryTypeIO):
+    """GraphBinary form of `RelationIdentifier`, as JanusGraph's serializer writes it.
+
+    {0x00}{type name}{type id: int}{value flag}{out vertex id}{type id: long}
+    {relation id: long}{in vertex id}, each vertex id being a marker byte
+    (0 long, 1 string) followed by the value; a long in-vertex id of 0
+    stands for none.
+    """
+
+    python_type = RelationIdentifier
+    graphbinary_type = DataType.custom
+    type_name = "janusgraph.RelationIdentifier"
+    type_id = 0x1001
+    long_marker = 0
+    string_marker = 1
+
+    @classmethod
+    def dictify(cls, obj: RelationIdentifier, writer: Any, to_extend: bytearray, as_value: bool = False, nullable: bool = True) -> bytearray:
+        if not as_value:
+            to_extend.append(DataType.custom.value)
+            graphbinaryV1.StringIO.dictify(cls.type_name, writer, to_extend, True, False)
+            to_extend += int32_pack(cls.type_id)
+        if nullable:
+            to_extend.append(0)
+        cls._write_vertex_id(obj.out_vertex_id, to_extend)
+        to_extend += int64_pack(obj.type_id)
+        to_extend += int64_pack(obj.relation_id)
+        cls._write_vertex_id(obj.in_vertex_id if obj.in_vertex_id is not None else 0, to_extend)
+        return to_extend
+
+    @classmethod
+    def objectify(cls, buff: io.BytesIO, reader: Any, nullable: bool = True) -> RelationIdentifier | None:
+        type_id = graphbinaryV1.IntIO.objectify(buff, reader, nullable=False)
+        if type_id != cls.type_id:
+            raise ValueError(f"Unexpected JanusGraph type id {type_id:#x} for {cls.type_name}")
+        return cls.is_null(buff, reader, cls._read, nullable)
+
+    @classmethod
+    def _read(cls, b: io.BytesIO, r: Any) -> RelationIdentifier:
+        out_vertex_id = cls._read_vertex_id(b)
+        type_id = int64_unpack(b.read(8))
+        relation_id = int64_unpack(b.read(8))
+        in_vertex_id = cls._read_vertex_id(b)
+        return RelationIdentifier(out_vertex_id, type_id, relation_id, in_vertex_id or None)
+
+    @classmethod
+    def _write_vertex_id(cls, vertex_id: int | str, to_extend: bytearray) -> None:
+        if isinstance(vertex_id, int):
+            to_extend.append(cls.long_marker)
+            to_extend += int64_pack(vertex_id)
+            return
+        # ASCII, the last character flagged with the high bit.
+        to_extend.append(cls.string_marker)
+        data = bytearray(vertex_id.encode("ascii"))
+        data[-1] |= 0x80
+        to_extend += data
+
+    @classmethod
+    def _read_vertex_id(cls, b: io.BytesIO) -> int | str:
+        if uint8_unpack(b.read(1)) == cls.long_marker:
+            return int64_unpack(b.read(8))
+        chars = []
+        while True:
+            c = b.read(1)[0]
+            chars.append(chr(c & 0x7F))
+            if c & 0x80:
+                return "".join(chars)
+
+
+# Custom GraphBinary types by name.
+JANUSGRAPH_BINARY_TYPES: dict[str, type[graphbinaryV1._GraphBinaryTypeIO]] = {
+    RelationIdentifierIO.type_name: RelationIdentifierIO,
+}
+
+
+class JanusGraphBinaryReader(graphbinaryV1.GraphBinaryReader):
+    """`GraphBinaryReader` that reads JanusGraph's custom types."""
+
+    def to_object(self, buff: io.BytesIO, data_type: DataType | None = None, nullable: bool = True) -> Any:
+        if data_type is None:
+            bt = uint8_unpack(buff.read(1))
+            if bt == DataType.null.value:
+                if nullable:
+                    buff.read(1)
+                return None
+            data_type = DataType(bt)
+        if data_type is DataType.custom:
+            name = self.to_object(buff, DataType.string, False)
+            custom = JANUSGRAPH_BINARY_TYPES.get(name)
+            if custom is None:
+                raise ValueError(f"Cannot read the custom GraphBinary type {name!r}; set GREMLIN_SERIALIZER=graphson")
+            return custom.objectify(buff, self, nullable)
+        return self.deserializers[data_type].objectify(buff, self, nullable)
+
+
+def janusgraph_binary_writer() -> graphbinaryV1.GraphBinaryWriter:
+    return graphbinaryV1.GraphBinaryWriter({RelationIdentifier: RelationIdentifierIO})
+
+
+# --- GraphSON ----------------------------------------------------------------
+
+
+class RelationIdentifierJSON:
+    graphson_type = "janusgraph:RelationIdentifier"
+
+    @classmethod
+    def dictify(cls, obj: RelationIdentifier, writer: Any) -> dict[str, Any]:
+        return {"@type": cls.graphson_type, "@value": {"relationId": str(obj)}}
+
+    @classmethod
+    def objectify(cls, value: dict[str, Any], reader: Any) -> RelationIdentifier:
+        return RelationIdentifier.from_string(value["relationId"])
+
+
+def janusgraph_graphson_reader() -> graphsonV3d0.GraphSONReader:
+    return graphsonV3d0.GraphSONReader({RelationIdentifierJSON.graphson_type: RelationIdentifierJSON})
+
+
+def janusgraph_graphson_writer() -> graphsonV3d0.GraphSONWriter:
+    return graphsonV3d0.GraphSONWriter({RelationIdentifier: RelationIdentifierJSON})
+
+
+def message_serializer(name: str) -> GraphBinarySerializersV1 | GraphSONMessageSerializer:
+    """Driver message serializer for GREMLIN_SERIALIZER `name`."""
+    if name == GRAPHBINARY:
+        return GraphBinarySerializersV1(reader=JanusGraphBinaryReader(), writer=janusgraph_binary_writer())
+    if name == GRAPHSON:
+        return GraphSONMessageSerializer(reader=janusgraph_graphson_reader(), writer=janusgraph_graphson_writer())
+    raise ValueError(f"Unknown Gremlin serializer {name!r}; use {GRAPHBINARY} or {GRAPHSON}")
+
+
+class _PathJSON:
+    @classmethod
+    def dictify(cls, obj: Path, writer: Any) -> dict[str, Any]:
+        return {"@type": "g:Path", "@value": {"labels": writer.to_dict(obj.labels), "objects": writer.to_dict(obj.objects)}}
+
+
+def response_message(name: str, data: Any) -> bytes:
+    """`data` encoded as a Gremlin Server response in serializer `name`, as JanusGraph would send it.
+
+    Lets tests and benchmarks exercise the readers without a server.
+    """
+    import json
+    import uuid
+
+    request_id = uuid.uuid4()
+    if name == GRAPHBINARY:
+        writer = janusgraph_binary_writer()
+        out = bytearray([0x81])
+        graphbinaryV1.UuidIO.dictify(request_id, writer, out, True, True)
+        out += int32_pack(200)
+        graphbinaryV1.StringIO.dictify("", writer, out, True, True)
+        graphbinaryV1.MapIO.dictify({}, writer, out, True, False)
+        graphbinaryV1.MapIO.dictify({}, writer, out, True, False)
+        writer.to_dict(data, out)
+        return bytes(out)
+    if name == GRAPHSON:
+        writer = janusgraph_graphson_writer()
+        writer.serializers[Path] = _PathJSON  # gremlin-python reads paths but cannot write them
+        message = {
+            "requestId": str(request_id),
+            "status": {"message": "", "code": 200, "attributes": writer.to_dict({})},
+            "result": {"data": writer.to_dict(data), "meta": writer.to_dict({})},
+        }
+        return json.dumps(message, separators=(",", ":")).encode("utf-8")
+    raise ValueError(f"Unknown Gremlin serializer {name!r}; use {GRAPHBINARY} or {GRAPHSON}")
@@ -1,20 +1,62 @@
 from __future__ import annotations
 
+from typing import Any
+
 from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
 
+from .config import get_config
 from .gremlin_client import app_lifespan
+from .tools.admin import register_admin_tools
+from .tools.crud import register_crud_tools
 from .tools.diagram import register_diagram_tools
 from .tools.graph import register_graph_tools
+from .tools.reference import register_reference_resources
+
+
+def register_local_file_route(mcp: FastMCP) -> None:
+    """Serve `LocalFileStorage` files under `/files/` (streamable-http transport only)."""
+
+    @mcp.custom_route("/files/{filename}", methods=["GET"])
+    async def get_local_file(request: Request) -> Response:
+        from .cloud_storage import LocalFileStorage
+
+        storage = LocalFileStorage.from_config(get_config())
+        try:
+            path = storage.path_for(request.path_params["filename"])
+        except ValueError:
+            return Response(status_code=404)
+        if not path.is_file():
+            return Response(status_code=404)
+        # Files are content-addressed, so a given URL never changes content.
+        return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
 
 
 def create_mcp() -> FastMCP:
     mcp = FastMCP("theo-mcp", lifespan=app_lifespan, json_response=True)
 
     # Register tools in a predictable order
+    register_crud_tools(mcp)
     register_graph_tools(mcp)
     register_diagram_tools(mcp)
+    register_admin_tools(mcp)
+    register_reference_resources(mcp)
+
+    if get_config().storage_backend == "local":
+        register_local_file_route(mcp)
 
     return mcp
 
 
-app = create_mcp()
+_app: FastMCP | None = None
+
+
+def __getattr__(name: str) -> Any:
+    # `app` is built on first access, so importing this module stays cheap.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_mcp()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
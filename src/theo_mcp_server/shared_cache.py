@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Protocol, runtime_checkable
+
+from .change_feed import ChangeEvent, ChangeFeed
+
+
+@runtime_checkable
+class SharedCache(Protocol):
+    """Key/value cache for derived data (trees, rendered diagrams).
+
+    Entries may name the vertex labels they were built from; graph changes
+    touching one of those labels evict them.
+    """
+
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any, ttl: float, labels: Iterable[str] = ()) -> None: ...
+
+
+class LocalCache:
+    """In-process `SharedCache`: an LRU with per-entry TTL, evicted through a `ChangeFeed`."""
+
+    def __init__(self, feed: ChangeFeed | None = None, max_entries: int = 256) -> None:
+        self._feed = feed
+        self._max_entries = max_entries
+        # key -> (expires at, labels, value), least recently used first
+        self._entries: OrderedDict[str, tuple[float, frozenset[str], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        if feed is not None:
+            feed.subscribe(self._on_changes)
+
+    def get(self, key: str) -> Any | None:
+        if self._feed is not None:
+            self._feed.poll()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, value: Any, ttl: float, labels: Iterable[str] = ()) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, frozenset(labels), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, labels: Iterable[str] | None = None) -> None:
+        """Drop entries built from any of `labels`; None drops everything."""
+        with self._lock:
+            if labels is None:
+                self._entries.clear()
+                return
+            labels = set(labels)
+            for key in [k for k, (_, entry_labels, _) in self._entries.items() if entry_labels & labels]:
+                del self._entries[key]
+
+    def _on_changes(self, events: list[ChangeEvent] | None) -> None:
+        if events is None:
+            self.invalidate(None)
+        else:
+            self.invalidate({label for e in events for label in e.labels})
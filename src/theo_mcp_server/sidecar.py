@@ -0,0 +1,476 @@
+"""Local sidecar shared by stdio server processes.
+
+Every MCP client spawns its own stdio `theo-mcp` process, and each would
+otherwise open its own Gremlin connection, read the index metadata and fill
+its own caches. With SIDECAR=true the first process to need the graph starts
+`python -m theo_mcp_server.sidecar` in the background; it holds a small pool
+of Gremlin connections and the shared cache (notion trees, rendered
+diagrams), and the stdio processes talk to it over a local socket (a Unix
+socket, or a named pipe on Windows). The sidecar exits after
+SIDECAR_IDLE_TIMEOUT seconds without clients.
+
+Traversals travel as gremlin-python bytecode and results as traversers,
+both pickled by `multiprocessing.connection`, so whoever holds the key can
+run code in either process. Connections are therefore authenticated with a
+key file in a directory only the user can access ($XDG_RUNTIME_DIR, or a
+0700 directory in the temp directory), and a key file or directory owned by
+someone else, or open to them, is refused.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import queue
+import secrets
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any
+
+from .config import Config, get_config
+from .gremlin_client import _is_closed_connection_error, _make_direct_connection
+from .routing import is_node_failure
+from .timeouts import CLIENT_GRACE, POLL_INTERVAL, TraversalCancelled, TraversalTimeout, budget, current_budget
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client waits for a freshly started sidecar to accept connections.
+START_TIMEOUT = 15.0
+
+
+def sidecar_address(cfg: Config) -> str:
+    if cfg.sidecar_address:
+        return cfg.sidecar_address
+    # One sidecar per graph, like the change feed.
+    key = hashlib.sha256(f"{cfg.gremlin_url}/{cfg.gremlin_traversal_source}".encode()).hexdigest()[:16]
+    if sys.platform == "win32":
+        return rf"\\.\pipe\theo-mcp-{key}"
+    return os.path.join(_private_dir(), f"sidecar-{key}.sock")
+
+
+def _check_private(st: os.stat_result, path: str) -> None:
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"Refusing {path}: it must belong to this user and be inaccessible to others")
+
+
+def _private_dir() -> str:
+    """Directory for the key file and socket that only the current user can access."""
+    if sys.platform == "win32":
+        return tempfile.gettempdir()  # per user on Windows
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    path = os.path.join(runtime, "theo-mcp") if runtime else os.path.join(tempfile.gettempdir(), f"theo-mcp-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"Refusing {path}: not a directory")
+    _check_private(st, path)
+    return path
+
+
+def _authkey() -> bytes:
+    """Per-user secret shared by the sidecar and its clients (created on first use)."""
+    if sys.platform == "win32":
+        path = os.path.join(_private_dir(), f"theo-mcp-sidecar-{os.getlogin()}.key")
+        nofollow = 0
+    else:
+        path = os.path.join(_private_dir(), "sidecar.key")
+        nofollow = os.O_NOFOLLOW
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | nofollow, 0o600)
+    except FileExistsError:
+        for _ in range(50):
+            fd = os.open(path, os.O_RDONLY | nofollow)
+            with os.fdopen(fd, "rb") as f:
+                if sys.platform != "win32":
+                    _check_private(os.fstat(f.fileno()), path)
+                key = f.read()
+            if key:
+                return key
+            time.sleep(0.01)  # another process is writing it
+        raise RuntimeError(f"Empty sidecar key file: {path}")
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+# --- server ------------------------------------------------------------------
+
+
+class SidecarServer:
+    """Serves Gremlin requests and the shared cache to local server processes.
+
+    `connect` makes one Gremlin connection (a `DriverRemoteConnection` in
+    production); up to `pool_size` of them are opened as concurrent requests
+    need them. Each client connection is served by its own thread.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        connect: Callable[[], Any],
+        *,
+        pool_size: int = 4,
+        idle_timeout: float = 900.0,
+        cache: Any = None,
+    ) -> None:
+        self.address = address
+        self._authkey = authkey
+        self._connect = connect
+        self._pool_size = pool_size
+        self._idle_timeout = idle_timeout
+        self._cache = cache
+        self._pool: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._opened = 0
+        self._clients = 0
+        self._last_seen = time.monotonic()
+        self._lock = threading.Lock()
+        self._listener: Listener | None = None
+        self._stopped = threading.Event()
+
+    def serve_forever(self) -> None:
+        self._listener = Listener(self.address, authkey=self._authkey)
+        threading.Thread(target=self._watch_idle, name="theo-sidecar-idle", daemon=True).start()
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    continue  # a client that failed the handshake
+                if self._stopped.is_set():
+                    conn.close()
+                    return
+                threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            self._close_pool()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        # Wake the accept() call in serve_forever.
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+
+    # --- requests -------------------------------------------------------------
+
+    def _serve_client(self, conn: Connection) -> None:
+        with self._lock:
+            self._clients += 1
+        try:
+            while True:
+                try:
+                    op, *args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self._handle(op, args))
+                except TraversalTimeout as e:
+                    reply = ("timeout", str(e))
+                except Exception as e:
+                    # The client tells an unreachable graph apart from a failed traversal.
+                    status = "unavailable" if is_node_failure(e) else "error"
+                    reply = (status, f"{type(e).__name__}: {e}")
+                conn.send(reply)
+        finally:
+            conn.close()
+            with self._lock:
+                self._clients -= 1
+                self._last_seen = time.monotonic()
+
+    def _handle(self, op: str, args: list[Any]) -> Any:
+        if op == "submit":
+            bytecode, seconds = args
+            if seconds is None:
+                return self._with_connection(lambda c: list(c.submit(bytecode).traversers))
+            with budget(seconds):
+                return self._with_connection(lambda c: list(c.submit(bytecode).traversers))
+        if op == "script":
+            return self._with_connection(lambda c: c._client.submit(args[0]).all().result())
+        if op == "cache_get":
+            return self._cache.get(args[0]) if self._cache is not None else None
+        if op == "cache_set":
+            if self._cache is not None:
+                self._cache.set(*args)
+            return None
+        if op == "result_cache_stats":
+            from .result_cache import get_result_cache
+
+            cache = get_result_cache()
+            return cache.stats() if cache is not None else None
+        if op == "endpoint_stats":
+            return self._with_connection(lambda c: getattr(c, "endpoint_stats", lambda: None)())
+        if op == "ping":
+            return os.getpid()
+        raise ValueError(f"Unknown sidecar operation: {op}")
+
+    def _with_connection(self, fn: Callable[[Any], Any]) -> Any:
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                result = fn(conn)
+            except Exception as e:
+                if not _is_closed_connection_error(e):
+                    self._pool.put(conn)
+                    raise
+                self._discard(conn)
+                if attempt:
+                    raise
+                # The server dropped this socket (restart, idle timeout): retry once on a new one.
+                continue
+            self._pool.put(conn)
+            return result
+
+    def _acquire(self) -> Any:
+        with self._lock:
+            if self._pool.empty() and self._opened < self._pool_size:
+                self._opened += 1
+                opening = True
+            else:
+                opening = False
+        if not opening:
+            return self._pool.get()
+        try:
+            return self._connect()
+        except BaseException:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _discard(self, conn: Any) -> None:
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _close_pool(self) -> None:
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def _watch_idle(self) -> None:
+        while not self._stopped.wait(min(self._idle_timeout, 10.0)):
+            with self._lock:
+                idle = self._clients == 0 and time.monotonic() - self._last_seen >= self._idle_timeout
+            if idle:
+                logger.info("Sidecar idle for %.0fs, exiting", self._idle_timeout)
+                self.stop()
+
+
+# --- client ------------------------------------------------------------------
+
+
+class _NotSent(OSError):
+    """The request never reached the sidecar."""
+
+
+def _safe_to_repeat(op: str, args: tuple[Any, ...]) -> bool:
+    if op != "submit":
+        return True  # reads, cache writes and pings
+    from .result_cache import is_read_only
+
+    return is_read_only(args[0])
+
+
+
+class SidecarClient:
+    """One process's connection to the sidecar; requests are serialized by a lock."""
+
+    def __init__(self, address: str, authkey: bytes) -> None:
+        self.address = address
+        self._authkey = authkey
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+
+    def call(self, op: str, *args: Any) -> Any:
+        with self._lock:
+            try:
+                status, value = self._roundtrip(op, args)
+            except (TraversalTimeout, TraversalCancelled):
+                raise
+            except _NotSent:
+                # The sidecar exited (idle timeout) or was restarted: start it again and retry once.
+                self._close_conn()
+                status, value = self._roundtrip(op, args)
+            except (EOFError, OSError):
+                # The request reached a sidecar that then went away, so it may have run: only
+                # repeat it if running it twice is harmless.
+                self._close_conn()
+                if not _safe_to_repeat(op, args):
+                    raise
+                status, value = self._roundtrip(op, args)
+        if status == "timeout":
+            raise TraversalTimeout(value)
+        if status == "unavailable":
+            raise ConnectionError(f"Sidecar request failed: {value}")
+        if status == "error":
+            raise RuntimeError(f"Sidecar request failed: {value}")
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_conn()
+
+    def _roundtrip(self, op: str, args: tuple[Any, ...]) -> tuple[str, Any]:
+        try:
+            if self._conn is None:
+                self._conn = ensure_sidecar(self.address, self._authkey)
+            self._conn.send((op, *args))
+        except (EOFError, OSError) as e:
+            raise _NotSent(str(e)) from e
+        b = current_budget()
+        if b is not None:
+            # Stop waiting when the tool call is cancelled or the sidecar does not answer in time;
+            # the reply would come out of order on the next call, so the connection is dropped.
+            while not self._conn.poll(POLL_INTERVAL):
+                if b.cancelled.is_set() or b.remaining() < -CLIENT_GRACE:
+                    self._close_conn()
+                    if b.cancelled.is_set():
+                        raise TraversalCancelled("The request was cancelled")
+                    raise TraversalTimeout("No reply from the sidecar within the time budget")
+        return self._conn.recv()
+
+    def _close_conn(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+
+def ensure_sidecar(address: str, authkey: bytes) -> Connection:
+    """Connect to the sidecar at `address`, starting one if none is running."""
+    try:
+        return Client(address, authkey=authkey)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+
+    kwargs: dict[str, Any] = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True  # outlive the stdio server that started it
+    subprocess.Popen(
+        [sys.executable, "-m", "theo_mcp_server.sidecar", "--address", address],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs,
+    )
+    deadline = time.monotonic() + START_TIMEOUT
+    while True:
+        try:
+            return Client(address, authkey=authkey)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Sidecar did not start listening on {address}")
+            time.sleep(0.05)
+
+
+class SidecarRemoteConnection:
+    """gremlin-python remote connection that runs traversals in the sidecar.
+
+    Drop-in for `DriverRemoteConnection` where the tools use one:
+    `traversal().with_remote(...)`, `close()` and, for index metadata,
+    `submit_script()`.
+    """
+
+    def __init__(self, client: SidecarClient) -> None:
+        self._sidecar = client
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "SidecarRemoteConnection":
+        return cls(SidecarClient(sidecar_address(cfg), _authkey()))
+
+    def submit(self, bytecode: Any) -> Any:
+        from gremlin_python.driver.remote_connection import RemoteTraversal
+
+        # The sidecar runs the traversal under what is left of this call's budget.
+        b = current_budget()
+        seconds = b.remaining() if b is not None else None
+        return RemoteTraversal(iter(self._sidecar.call("submit", bytecode, seconds)))
+
+    def submit_script(self, script: str) -> list[Any]:
+        return self._sidecar.call("script", script)
+
+    def cache_stats(self) -> dict[str, Any] | None:
+        return self._sidecar.call("result_cache_stats")
+
+    def endpoint_stats(self) -> list[dict[str, Any]] | None:
+        return self._sidecar.call("endpoint_stats")
+
+    def close(self) -> None:
+        self._sidecar.close()
+
+
+class SidecarCache:
+    """`SharedCache` kept in the sidecar, so every stdio process sees the same entries."""
+
+    def __init__(self, client: SidecarClient) -> None:
+        self._sidecar = client
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "SidecarCache":
+        return cls(SidecarClient(sidecar_address(cfg), _authkey()))
+
+    def get(self, key: str) -> Any | None:
+        return self._sidecar.call("cache_get", key)
+
+    def set(self, key: str, value: Any, ttl: float, labels: Iterable[str] = ()) -> None:
+        self._sidecar.call("cache_set", key, value, ttl, tuple(labels))
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    from .change_feed import get_change_feed
+    from .shared_cache import LocalCache
+
+    cfg = get_config()
+    parser = argparse.ArgumentParser(prog="python -m theo_mcp_server.sidecar")
+    parser.add_argument("--address", default=sidecar_address(cfg))
+    args = parser.parse_args(argv)
+
+    authkey = _authkey()
+    if not args.address.startswith("\\\\"):
+        try:
+            Client(args.address, authkey=authkey).close()
+            return  # another sidecar already serves this address
+        except (FileNotFoundError, ConnectionRefusedError):
+            # A socket file left behind by a sidecar that did not shut down cleanly.
+            if os.path.exists(args.address):
+                os.unlink(args.address)
+
+    logging.basicConfig(level=logging.INFO)
+    server = SidecarServer(
+        args.address,
+        authkey,
+        _make_direct_connection,
+        pool_size=cfg.sidecar_pool_size,
+        idle_timeout=cfg.sidecar_idle_timeout,
+        cache=LocalCache(get_change_feed()),
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.traversal import Bytecode
+from gremlin_python.process.translator import Translator
+
+from .config import Config, get_config
+from .result_cache import bytecode_key, is_read_only
+from .timeouts import budget
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the same traversal is profiled again.
+PROFILE_INTERVAL = 300.0
+
+# Time budget of a profile() run, in seconds.
+PROFILE_TIMEOUT = 60.0
+
+
+class SlowQueryLog:
+    """Slow traversals and their execution profiles, as JSON lines.
+
+    The file is renamed to `<path>.1` (replacing the previous one) once it
+    grows past `max_bytes`, so at most about twice that is kept. Several
+    server processes may append to the same file.
+    """
+
+    def __init__(self, path: str, *, max_bytes: int = 1 << 20) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "SlowQueryLog":
+        path = cfg.slow_query_log_path
+        if not path:
+            key = hashlib.sha256(f"{cfg.gremlin_url}/{cfg.gremlin_traversal_source}".encode()).hexdigest()[:16]
+            path = os.path.join(tempfile.gettempdir(), f"theo-mcp-slow-queries-{key}.jsonl")
+        return cls(path, max_bytes=cfg.slow_query_log_max_bytes)
+
+    def append(self, record: dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > self._max_bytes:
+                os.replace(self.path, self.path + ".1")
+
+    def recent(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Up to `limit` records, newest first."""
+        records: list[dict[str, Any]] = []
+        for path in (self.path + ".1", self.path):
+            try:
+                with open(path, "rb") as f:
+                    records.extend(json.loads(line) for line in f if line.endswith(b"\n"))
+            except FileNotFoundError:
+                continue
+        return records[::-1][:limit]
+
+
+def summarize_profile(profile: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a `profile()` result to per-step metrics and the indexes JanusGraph used.
+
+    JanusGraph annotates its steps and their backend queries (nested metrics)
+    with the index used, or with `fullscan` when none applied.
+    """
+    steps = []
+    indexes: set[str] = set()
+    full_scan = False
+
+    def walk(metrics: list[dict[str, Any]]) -> None:
+        nonlocal full_scan
+        for m in metrics:
+            for key, value in (m.get("annotations") or {}).items():
+                key = key.lstrip("\\_")
+                if key == "index":
+                    indexes.add(str(value))
+                elif key == "fullscan" and str(value).lower() == "true":
+                    full_scan = True
+            walk(m.get("metrics") or [])
+
+    for m in profile.get("metrics") or []:
+        counts = m.get("counts") or {}
+        steps.append({
+            "step": m.get("name"),
+            "duration_ms": round((m.get("dur") or 0) / 1e6, 3),
+            "percent": round(float((m.get("annotations") or {}).get("percentDur", 0.0)), 2),
+            "traversers": counts.get("traverserCount"),
+            "elements": counts.get("elementCount"),
+        })
+    walk(profile.get("metrics") or [])
+    return {
+        "duration_ms": round((profile.get("dur") or 0) / 1e6, 3),
+        "steps": steps,
+        "indexes": sorted(indexes),
+        "full_scan": full_scan,
+    }
+
+
+class ProfilingRemoteConnection:
+    """Remote connection that records traversals slower than `threshold_ms`.
+
+    A slow read-only traversal is run again with `profile()` on a background
+    thread, at most once per `PROFILE_INTERVAL` for the same traversal, and
+    the step metrics and index usage go into the log with it. Mutations are
+    logged with their duration only, since running them again would repeat
+    the change.
+    """
+
+    def __init__(self, connection: Any, log: SlowQueryLog, threshold_ms: float) -> None:
+        self._connection = connection
+        self._log = log
+        self._threshold_ms = threshold_ms
+        self._profiled: dict[str, float] = {}  # bytecode key -> when it was last profiled
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="theo-profile")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def submit(self, bytecode: Bytecode) -> RemoteTraversal:
+        started = time.perf_counter()
+        result = self._connection.submit(bytecode)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= self._threshold_ms:
+            self._record(bytecode, elapsed_ms)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._connection.close()
+
+    def _record(self, bytecode: Bytecode, elapsed_ms: float) -> None:
+        record: dict[str, Any] = {
+            "ts": time.time(),
+            "duration_ms": round(elapsed_ms, 3),
+            "traversal": Translator("g").translate(bytecode),
+        }
+        if not is_read_only(bytecode):
+            self._append({**record, "profile": None, "note": "mutation, not profiled"})
+            return
+        key = bytecode_key(bytecode)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._profiled.get(key, -PROFILE_INTERVAL) < PROFILE_INTERVAL:
+                self._append({**record, "profile": None, "note": "profiled recently"})
+                return
+            self._profiled[key] = now
+            if len(self._profiled) > 1000:
+                self._profiled = {k: t for k, t in self._profiled.items() if now - t < PROFILE_INTERVAL}
+        self._executor.submit(self._profile, bytecode, record)
+
+    def _profile(self, bytecode: Bytecode, record: dict[str, Any]) -> None:
+        profiled = Bytecode(bytecode)
+        profiled.bindings = dict(bytecode.bindings)
+        profiled.add_step("profile")
+        try:
+            with budget(PROFILE_TIMEOUT):
+                traversers = list(self._connection.submit(profiled).traversers)
+            record["profile"] = summarize_profile(traversers[0].object) if traversers else None
+        except Exception as e:
+            record["profile"] = None
+            record["note"] = f"profile failed: {e}"
+        self._append(record)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        # Never fail the traversal being measured.
+        try:
+            self._log.append(record)
+        except OSError:
+            logger.warning("Could not write the slow query log", exc_info=True)
+
+
+def with_profiling(connection: Any) -> Any:
+    """Wrap `connection` in a `ProfilingRemoteConnection` unless SLOW_QUERY_THRESHOLD_MS is 0."""
+    cfg = get_config()
+    if cfg.slow_query_threshold_ms <= 0:
+        return connection
+    return ProfilingRemoteConnection(connection, SlowQueryLog.from_config(cfg), cfg.slow_query_threshold_ms)
@@ -0,0 +1,366 @@
+"""Local snapshot of the graph, for answering lookups while JanusGraph is down.
+
+Off unless SNAPSHOT_REFRESH_INTERVAL is set. While the graph is reachable, a
+background thread then copies every vertex and edge into a local file, page
+by page in vertex id order, once the file is older than the interval; server
+processes sharing the file share the work.
+When the graph cannot be reached, the read tools answer from the snapshot,
+loaded into memory with captions and edges indexed. Their results carry a
+`stale` entry with the snapshot's age. Writes are refused.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import P, T
+
+from .config import Config
+
+if TYPE_CHECKING:
+    from gremlin_python.process.graph_traversal import GraphTraversalSource
+    from mcp.server.fastmcp import Context
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+SNAPSHOT_VERSION = 1
+
+# Vertices (with their outgoing edges) read per traversal while taking a snapshot, and the time budget of each.
+PAGE_SIZE = 10_000
+PAGE_SECONDS = 60.0
+
+
+class GraphSnapshot:
+    """All vertices and edges of the graph at one point in time, indexed for the read tools.
+
+    The query methods mirror the `gremlin_helpers` functions the read tools
+    use and return the same shapes.
+    """
+
+    def __init__(self, vertices: Iterable[dict[str, Any]], edges: Iterable[tuple[str, Any, Any]], taken_at: float) -> None:
+        self.taken_at = taken_at
+        self.vertices: dict[Any, dict[str, Any]] = {}
+        self._by_caption: dict[str, list[Any]] = {}
+        for vertex in vertices:
+            self.vertices[vertex["internal_id"]] = vertex
+            caption = vertex.get("caption")
+            if isinstance(caption, str):
+                self._by_caption.setdefault(caption, []).append(vertex["internal_id"])
+        self.edges = [tuple(e) for e in edges]
+        # vertex id -> [(edge label, other vertex id), ...]
+        self._out: dict[Any, list[tuple[str, Any]]] = {}
+        self._in: dict[Any, list[tuple[str, Any]]] = {}
+        for label, from_id, to_id in self.edges:
+            self._out.setdefault(from_id, []).append((label, to_id))
+            self._in.setdefault(to_id, []).append((label, from_id))
+
+    # --- taking, saving and loading -------------------------------------------
+
+    @classmethod
+    def take(cls, g: GraphTraversalSource, page_size: int = PAGE_SIZE) -> "GraphSnapshot":
+        """Read the whole graph, `page_size` vertices with their outgoing edges per
+        traversal, each under its own time budget."""
+        from .records import VertexBatch
+
+        def read(after: Any, limit: int) -> list[dict[str, Any]]:
+            t = g.V() if after is None else g.V().has(T.id, P.gt(after))
+            return (
+                t.order().by(T.id).limit(limit)
+                .project("vertex", "out")
+                .by(__.elementMap())
+                .by(__.outE().project("label", "to").by(T.label).by(__.inV().id_()).fold())
+                .toList()
+            )
+
+        taken_at = time.time()
+        vertices = VertexBatch()
+        edges = []
+        for row in _paged(read, lambda row: row["vertex"][T.id], page_size):
+            from_id = row["vertex"][T.id]
+            vertices.append_element_map(row["vertex"])
+            edges.extend((e["label"], from_id, e["to"]) for e in row["out"])
+        return cls(vertices.to_dicts(), edges, taken_at)
+
+    def save(self, path: str) -> None:
+        """Write the snapshot to `path`, replacing the previous one atomically."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".json.gz")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                data = {
+                    "version": SNAPSHOT_VERSION,
+                    "taken_at": self.taken_at,
+                    "vertices": list(self.vertices.values()),
+                    "edges": self.edges,
+                }
+                f.write(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "GraphSnapshot":
+        with gzip.open(path, "rb") as f:
+            data = json.loads(f.read())
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {data.get('version')!r} in {path}")
+        return cls(data["vertices"], data["edges"], data["taken_at"])
+
+    def stale(self) -> dict[str, Any]:
+        """What read tools add to results answered from this snapshot."""
+        return {
+            "snapshot_taken_at": datetime.fromtimestamp(self.taken_at, timezone.utc).isoformat(timespec="seconds"),
+            "age_seconds": int(time.time() - self.taken_at),
+        }
+
+    # --- queries --------------------------------------------------------------
+
+    def ids_by_caption(self, caption: str, label: str | None = None) -> list[Any]:
+        ids = self._by_caption.get(caption, [])
+        return [i for i in ids if self.vertices[i]["label"] == label] if label is not None else list(ids)
+
+    def vertices_by_captions(self, captions: list[str], fields: list[str] | None = None) -> list[dict[str, Any]]:
+        ids = [i for caption in dict.fromkeys(captions) for i in self._by_caption.get(caption, ())]
+        return [self._select(self.vertices[i], fields) for i in ids]
+
+    def search(self, types: list[str], search_text: str, limit: int = 10, fields: list[str] | None = None) -> list[dict[str, Any]]:
+        found = []
+        for vertex in self.vertices.values():
+            caption = vertex.get("caption")
+            if vertex.get("type") in types and isinstance(caption, str) and search_text in caption:
+                found.append(self._select(vertex, fields))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def vertex_with_edges(self, id: Any) -> dict[str, Any]:
+        """Like `gremlin_helpers.read_vertex_with_edges`."""
+        vertex = self.vertices.get(id)
+        if vertex is None:
+            raise ValueError(f"Vertex not found: id={id}")
+        return {**vertex, "relationships": self._relationships(id)}
+
+    def vertices_with_edges_by_captions(
+        self, captions: list[str], labels: list[str] | None = None, fields: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Like `gremlin_helpers.read_vertices_with_edges_by_captions`."""
+        ids = [
+            i for caption in dict.fromkeys(captions) for i in self._by_caption.get(caption, ())
+            if not labels or self.vertices[i]["label"] in labels
+        ]
+        return [{**self._select(self.vertices[i], fields), "relationships": self._relationships(i)} for i in ids]
+
+    def notion_groups_tree(self, include_notions: bool) -> dict[str, Any]:
+        """Like `gremlin_helpers.build_notion_groups_tree`."""
+        types = ("notionGroup", "notion") if include_notions else ("notionGroup",)
+        contained = {to_id for label, _, to_id in self.edges if label == "contains"}
+
+        def add(tree: dict[str, Any], id: Any, path: set[Any]) -> None:
+            node = tree.setdefault(self.vertices[id].get("caption"), {})
+            for label, child in self._out.get(id, ()):
+                if label == "contains" and child not in path and self.vertices.get(child, {}).get("type") in types:
+                    add(node, child, path | {child})
+
+        tree: dict[str, Any] = {}
+        for id, vertex in self.vertices.items():
+            if vertex.get("type") in types and id not in contained:
+                add(tree, id, {id})
+        return tree
+
+    def _relationships(self, id: Any) -> dict[str, list[dict[str, Any]]]:
+        from .gremlin_helpers import reverse_direct_relationship_keys
+
+        out_edges = self._grouped(self._out.get(id, ()))
+        in_edges = self._grouped(self._in.get(id, ()))
+        return {**out_edges, **reverse_direct_relationship_keys(in_edges)}
+
+    def _grouped(self, edges: Iterable[tuple[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+        grouped: dict[str, list[dict[str, Any]]] = {}
+        for label, other in edges:
+            vertex = self.vertices.get(other)
+            if vertex is not None:
+                grouped.setdefault(label, []).append(
+                    {"label": vertex["label"], "id": other, "caption": vertex.get("caption")}
+                )
+        return grouped
+
+    @staticmethod
+    def _select(vertex: dict[str, Any], fields: list[str] | None) -> dict[str, Any]:
+        if not fields:
+            return dict(vertex)
+        out = {"internal_id": vertex["internal_id"], "label": vertex["label"]}
+        out.update((f, vertex[f]) for f in fields if f in vertex)
+        return out
+
+
+def _paged(read: Callable[[Any, int], list[_T]], key: Callable[[_T], Any], page_size: int) -> list[_T]:
+    """All rows of `read(after, limit)`, which returns up to `limit` rows ordered by
+    `key` and starting after the key `after` (None for the first page).
+
+    Each page starts where the previous one ended (keyset paging), so rows
+    added or removed meanwhile cannot shift the pages into skipping or
+    repeating rows, as with `range()`, and no page has to produce the rows
+    before it only to discard them.
+    """
+    from .timeouts import budget
+
+    rows: list[_T] = []
+    after = None
+    while True:
+        with budget(PAGE_SECONDS):
+            page = read(after, page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        after = key(page[-1])
+
+
+class SnapshotKeeper:
+    """Refreshes the snapshot file in the background and loads it when it is needed."""
+
+    def __init__(self, path: str, refresh_interval: float, connect: Callable[[], Any]) -> None:
+        self.path = path
+        self._refresh_interval = refresh_interval
+        self._connect = connect
+        self._loaded: tuple[float, GraphSnapshot] | None = None  # (file mtime, snapshot)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_config(cls, cfg: Config, connect: Callable[[], Any]) -> "SnapshotKeeper":
+        path = cfg.snapshot_path
+        if not path:
+            key = hashlib.sha256(f"{cfg.gremlin_url}/{cfg.gremlin_traversal_source}".encode()).hexdigest()[:16]
+            path = os.path.join(tempfile.gettempdir(), f"theo-mcp-snapshot-{key}.json.gz")
+        return cls(path, cfg.snapshot_refresh_interval, connect)
+
+    def start(self) -> None:
+        """Start refreshing the snapshot; a no-op if it is already running or refreshes are off."""
+        with self._lock:
+            if self._thread is not None or self._refresh_interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, name="theo-snapshot", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def age(self) -> float | None:
+        """Seconds since the snapshot file was written, or None without one."""
+        try:
+            return time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def refresh(self) -> GraphSnapshot:
+        from gremlin_python.process.anonymous_traversal import traversal
+
+        started = time.monotonic()
+        connection = self._connect()
+        try:
+            snapshot = GraphSnapshot.take(traversal().with_remote(connection))
+        finally:
+            connection.close()
+        snapshot.save(self.path)
+        logger.info(
+            "Graph snapshot of %d vertices and %d edges written to %s in %.1fs",
+            len(snapshot.vertices), len(snapshot.edges), self.path, time.monotonic() - started,
+        )
+        return snapshot
+
+    def current(self) -> GraphSnapshot | None:
+        """The latest snapshot on disk, or None if there is none."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        with self._lock:
+            if self._loaded is None or self._loaded[0] != mtime:
+                self._loaded = (mtime, GraphSnapshot.load(self.path))
+            return self._loaded[1]
+
+    def _refresh_loop(self) -> None:
+        while not self._stopped.is_set():
+            age = self.age()
+            if age is None or age >= self._refresh_interval:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning("Could not refresh the graph snapshot: %s", e)
+                age = self.age()
+            wait = self._refresh_interval - (age or 0.0)
+            self._stopped.wait(max(wait, 60.0))
+
+
+def is_unavailable(exc: BaseException) -> bool:
+    """Whether `exc` means the graph could not be reached (rather than a failed or slow traversal)."""
+    from .gremlin_client import GraphUnavailable
+    from .routing import is_node_failure
+    from .timeouts import TraversalCancelled, TraversalTimeout
+
+    if isinstance(exc, (TraversalTimeout, TraversalCancelled)):
+        return False
+    return isinstance(exc, GraphUnavailable) or is_node_failure(exc)
+
+
+def read_with_fallback(
+    ctx: Context,
+    live: Callable[[GraphTraversalSource], _T],
+    offline: Callable[[GraphSnapshot], _T],
+    wrap: bool = False,
+) -> _T | dict[str, Any]:
+    """Run `live` against the graph or, while it cannot be reached, `offline` against the snapshot.
+
+    Results from the snapshot are marked with `stale` (see `mark_stale`).
+    Without a snapshot the original error is raised.
+    """
+    from .gremlin_client import get_g, get_snapshot_keeper
+
+    try:
+        return live(get_g(ctx))
+    except Exception as e:
+        if not is_unavailable(e):
+            raise
+        keeper = get_snapshot_keeper(ctx)
+        try:
+            snapshot = keeper.current()
+        except Exception as load_error:
+            logger.warning("Could not load the graph snapshot %s: %s", keeper.path, load_error)
+            snapshot = None
+        if snapshot is None:
+            raise
+        logger.warning("Graph unavailable (%s); answering from the snapshot in %s", e, keeper.path)
+        return mark_stale(offline(snapshot), snapshot, wrap)
+
+
+def mark_stale(result: _T, snapshot: GraphSnapshot, wrap: bool = False) -> _T | dict[str, Any]:
+    """Add `stale` to a dict result, or to each dict of a list result.
+
+    With `wrap`, return {"result": result, "stale": ...} instead, for dicts
+    whose keys are data (captions in a tree) rather than field names.
+    """
+    stale = snapshot.stale()
+    if wrap:
+        return {"result": result, "stale": stale}
+    if isinstance(result, dict):
+        result["stale"] = stale
+    elif isinstance(result, list):
+        for item in result:
+            if isinstance(item, dict):
+                item["stale"] = stale
+    return result
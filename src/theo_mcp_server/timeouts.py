@@ -0,0 +1,255 @@
+"""Time budgets and cancellation for tool calls.
+
+Each tool decorated with `bounded` runs in a worker thread under a deadline
+(its budget from TOOL_TIMEOUT_SECONDS / TOOL_TIMEOUTS). Every traversal it
+sends carries the time left as the Gremlin Server `evaluationTimeout`, so
+the server stops evaluating it, and the client stops waiting a little after
+that in case the reply never comes. When the MCP client cancels the
+request, the tool call is abandoned and the traversal it is waiting on is
+given up.
+
+Gremlin Server has no way to cancel a running request, so giving up only
+means no longer waiting: the request finishes (or times out) on the server
+and its pooled connection is released as usual, so the connection stays
+usable for the next call.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import contextvars
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import anyio
+import anyio.from_thread
+import anyio.to_thread
+
+from .config import get_config
+
+# Seconds the client waits past the server-side timeout before giving up on a reply.
+CLIENT_GRACE = 2.0
+
+# How often a waiting traversal checks for cancellation, in seconds.
+POLL_INTERVAL = 0.1
+
+# Budgets of tools that legitimately take longer than TOOL_TIMEOUT_SECONDS.
+DEFAULT_TOOL_TIMEOUTS: dict[str, float] = {
+    "get_notions_tree": 120.0,
+    "get_notion_groups_tree": 60.0,
+    "search_notion_groups_and_notions": 60.0,
+    "create_diagram_by_captions": 120.0,
+    "replay_pending_mutations": 300.0,
+}
+
+
+class TraversalTimeout(TimeoutError):
+    """The tool call ran out of its time budget."""
+
+
+class TraversalCancelled(Exception):
+    """The MCP client cancelled the tool call."""
+
+
+@dataclass
+class Budget:
+    deadline: float  # time.monotonic()
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise TraversalCancelled("The request was cancelled")
+        if self.remaining() <= 0:
+            raise TraversalTimeout("The request ran out of its time budget")
+
+
+_budget: contextvars.ContextVar[Budget | None] = contextvars.ContextVar("theo_budget", default=None)
+
+
+def current_budget() -> Budget | None:
+    return _budget.get()
+
+
+@contextmanager
+def budget(seconds: float, cancelled: threading.Event | None = None) -> Iterator[Budget]:
+    """Run the block under a deadline `seconds` from now (never later than an enclosing one)."""
+    deadline = time.monotonic() + seconds
+    outer = _budget.get()
+    if outer is not None:
+        deadline = min(deadline, outer.deadline)
+        cancelled = cancelled or outer.cancelled
+    b = Budget(deadline, cancelled or threading.Event())
+    token = _budget.set(b)
+    try:
+        yield b
+    finally:
+        _budget.reset(token)
+
+
+def tool_timeout(tool: str) -> float:
+    """Budget of `tool` in seconds; 0 means unbounded."""
+    cfg = get_config()
+    for item in cfg.tool_timeouts.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() == tool and seconds.strip():
+            return float(seconds)
+    return DEFAULT_TOOL_TIMEOUTS.get(tool, cfg.tool_timeout_seconds) if cfg.tool_timeout_seconds > 0 else 0.0
+
+
+def bounded(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a sync tool in a worker thread under its time budget, and stop
+    waiting for it when the MCP request is cancelled.
+
+    With admission control on, the call first waits for a slot in its lane
+    (see `admission`); the wait counts against the same budget, and the
+    worker thread gets only what is left of it. The slot is held until the
+    worker thread finishes, even if the call is cancelled first.
+    """
+    from .admission import get_admission_controller, lane_of
+
+    tool = fn.__name__
+    lane = lane_of(tool)  # apply after @journaled, which marks mutating tools
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        seconds = tool_timeout(tool)
+        deadline = time.monotonic() + seconds
+        cancelled = threading.Event()
+
+        def run() -> Any:
+            if seconds <= 0:
+                return fn(*args, **kwargs)
+            with budget(deadline - time.monotonic(), cancelled) as b:
+                b.check()
+                return fn(*args, **kwargs)
+
+        controller = get_admission_controller()
+        slot = None
+        try:
+            if controller is None:
+                return await anyio.to_thread.run_sync(run, abandon_on_cancel=True)
+            await controller.acquire(lane, _session_of(kwargs.get("ctx")), seconds or None)
+            slot = _Slot(functools.partial(controller.release, lane))
+            return await anyio.to_thread.run_sync(slot.run, run, abandon_on_cancel=True)
+        except BaseException as e:
+            if isinstance(e, anyio.get_cancelled_exc_class()):
+                # The worker thread gives up at its next check.
+                cancelled.set()
+            if slot is not None:
+                slot.abandon()
+            raise
+
+    return wrapper
+
+
+class _Slot:
+    """Admission slot of a tool call, held until its worker thread finishes.
+
+    A cancelled call is abandoned while its thread may still be running a
+    traversal (writes are waited for on purpose), so the slot is released
+    when the thread is done rather than when the call gives up; otherwise a
+    client that cancels and retries could run any number of calls at once.
+    """
+
+    def __init__(self, release: Callable[[], None]) -> None:
+        self._release = release
+        self._lock = threading.Lock()
+        self._owner: str | None = None  # "thread" once it started, "caller" if abandoned before that
+
+    def run(self, fn: Callable[[], Any]) -> Any:
+        # In the worker thread.
+        with self._lock:
+            if self._owner is not None:
+                return None  # abandoned before the thread got to it
+            self._owner = "thread"
+        try:
+            return fn()
+        finally:
+            try:
+                anyio.from_thread.run_sync(self._release)
+            except RuntimeError:
+                pass  # the event loop is gone, and the controller with it
+
+    def abandon(self) -> None:
+        # On the event loop, when the call gives up.
+        with self._lock:
+            if self._owner is not None:
+                return  # the thread releases the slot when it is done
+            self._owner = "caller"
+        self._release()
+
+
+def _session_of(ctx: Any) -> Any:
+    # One MCP session per connected client; admission takes turns between them.
+    try:
+        return id(ctx.request_context.session)
+    except (AttributeError, ValueError):
+        return None
+
+
+def wait(future: concurrent.futures.Future, b: Budget, *, cancellable: bool = True) -> Any:
+    """Wait for `future` until `b` runs out (plus `CLIENT_GRACE`) or, if
+    `cancellable`, until the call is cancelled."""
+    while True:
+        if cancellable and b.cancelled.is_set():
+            raise TraversalCancelled("The request was cancelled")
+        left = b.remaining() + CLIENT_GRACE
+        if left <= 0:
+            raise TraversalTimeout("No reply from the Gremlin server within the time budget")
+        try:
+            return future.result(timeout=min(left, POLL_INTERVAL))
+        except concurrent.futures.TimeoutError:
+            continue
+
+
+class TimeoutRemoteConnection:
+    """Remote connection that sends each traversal with the time left in the
+    current budget as `evaluationTimeout`, and waits no longer than that.
+
+    Wraps a `DriverRemoteConnection`; without a budget traversals go through
+    unchanged. A cancelled call stops waiting for reads only: a write is
+    waited for, so its outcome (and the mutation log) is known.
+    """
+
+    def __init__(self, connection: Any) -> None:
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def submit(self, bytecode: Any) -> Any:
+        b = current_budget()
+        if b is None:
+            return self._connection.submit(bytecode)
+        from .result_cache import is_read_only
+
+        b.check()
+        future = self._connection.submit_async(with_evaluation_timeout(bytecode, b.remaining()))
+        return wait(future, b, cancellable=is_read_only(bytecode))
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def with_evaluation_timeout(bytecode: Any, seconds: float) -> Any:
+    """Copy of `bytecode` carrying `evaluationTimeout` (ms) as a request option."""
+    from gremlin_python.process.strategies import OptionsStrategy
+    from gremlin_python.process.traversal import Bytecode
+
+    ms = max(1, int(seconds * 1000))
+    out = Bytecode(bytecode)
+    out.bindings = dict(bytecode.bindings)
+    for i, (name, *args) in enumerate(out.source_instructions):
+        if name == "withStrategies" and args and type(args[0]) is OptionsStrategy:
+            configuration = {**args[0].configuration, "evaluationTimeout": ms}
+            out.source_instructions[i] = ["withStrategies", OptionsStrategy(configuration)]
+            return out
+    out.source_instructions.append(["withStrategies", OptionsStrategy({"evaluationTimeout": ms})])
+    return out
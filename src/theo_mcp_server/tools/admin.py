@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any
+
+import traceback
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.session import ServerSession
+from mcp.server.fastmcp.exceptions import ToolError
+
+from ..config import get_config
+from ..gremlin_client import AppContext, get_connection, get_mutation_log
+from ..indexes import index_report, read_graph_indexes, set_graph_indexes
+from ..mutation_log import COMMIT, replay_pending
+from ..timeouts import bounded
+
+
+def register_admin_tools(mcp: FastMCP) -> None:
+
+    @mcp.tool()
+    @bounded
+    def get_index_report(ctx: Context[ServerSession, AppContext]) -> dict[str, Any]:
+        """
+            Report the JanusGraph vertex indexes and which query shapes used by the tools
+            (caption lookups, vertices by type, quotations by status, verses by import order)
+            they serve. Shapes listed under `missing` are answered by full graph scans.
+        """
+        try:
+            connection = get_connection(ctx)
+            indexes = read_graph_indexes(connection, get_config().janusgraph_graph_name)
+            set_graph_indexes(indexes)
+            return index_report(indexes)
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    @mcp.tool()
+    @bounded
+    def get_result_cache_stats(ctx: Context[ServerSession, AppContext]) -> dict[str, Any]:
+        """
+            Report the read traversal result cache: hits, misses, hit rate, traversals that
+            bypassed it (mutations), and its current and maximum size in bytes.
+        """
+        try:
+            cache_stats = getattr(get_connection(ctx), "cache_stats", None)
+            stats = cache_stats() if cache_stats is not None else None
+            return {"enabled": stats is not None, **(stats or {})}
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    @mcp.tool()
+    @bounded
+    def get_gremlin_endpoints(ctx: Context[ServerSession, AppContext]) -> dict[str, Any]:
+        """
+            Report the Gremlin Server nodes traversals are routed to (GREMLIN_READ_URLS,
+            GREMLIN_WRITE_URLS): each node's role, health, moving average latency, requests
+            in flight and failures.
+        """
+        try:
+            endpoint_stats = getattr(get_connection(ctx), "endpoint_stats", None)
+            stats = endpoint_stats() if endpoint_stats is not None else None
+            return {"routing": stats is not None, "endpoints": stats or []}
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    @mcp.tool()
+    @bounded
+    def get_slow_queries(ctx: Context[ServerSession, AppContext], limit: int = 20) -> list[dict[str, Any]]:
+        """
+            Return up to `limit` recent traversals that took longer than SLOW_QUERY_THRESHOLD_MS,
+            newest first: the Gremlin text, duration and, for reads, the `profile()` step metrics,
+            indexes used and whether JanusGraph had to scan the whole graph.
+        """
+        try:
+            from ..slow_queries import SlowQueryLog
+
+            return SlowQueryLog.from_config(get_config()).recent(limit)
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    @mcp.tool()
+    @bounded
+    def export_mutations(
+        ctx: Context[ServerSession, AppContext],
+        checkpoint: int = 0,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """
+            Return up to `limit` committed mutations (tool, arguments, result, time) recorded
+            after `checkpoint`. Pass the returned `checkpoint` to the next call to continue;
+            0 starts from the beginning of the mutation log.
+        """
+        try:
+            log = get_mutation_log(ctx)
+            if log is None:
+                raise ValueError("The mutation log is disabled (set MUTATION_LOG_PATH)")
+            mutations = []
+            for offset, record in log.iter_since(checkpoint):
+                checkpoint = offset
+                if record["type"] == COMMIT:
+                    mutations.append(record)
+                    if len(mutations) >= limit:
+                        break
+            return {"mutations": mutations, "checkpoint": checkpoint}
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    @mcp.tool()
+    @bounded
+    def replay_pending_mutations(
+        ctx: Context[ServerSession, AppContext],
+        min_age_seconds: float = 60.0,
+    ) -> list[dict[str, Any]]:
+        """
+            Re-run mutations whose outcome was never recorded (e.g. the server stopped mid-call)
+            and that started at least `min_age_seconds` ago. Returns each one's request id, tool
+            and new state (commit or fail). Only mutations that are safe to run twice are re-run;
+            creates and claims come back as "needs review" with their arguments, to be checked
+            against the graph. Running it again does not repeat finished mutations.
+        """
+        try:
+            log = get_mutation_log(ctx)
+            if log is None:
+                raise ValueError("The mutation log is disabled (set MUTATION_LOG_PATH)")
+            return replay_pending(log, ctx, min_age_seconds)
+        except Exception:
+            raise ToolError(traceback.format_exc())
@@ -0,0 +1,198 @@
+"""Per-label caption tools, registered from one table.
+
+Every label in `schema.LABELS_CANON` with an entry in `LABEL_TOOLS` gets,
+from the same code:
+
+- `get_<label>_by_caption`: the vertex with its relationships;
+- `delete_<label>_by_caption`;
+- `create_<label>`: a vertex with the label's create properties, and
+  `relationships` for labels in `schema.CREATE_RELATIONSHIPS`.
+
+`get_entities_by_captions` reads vertices of any label, with their
+relationships, in one traversal. Caption lookups, reads and the snapshot
+fallback all go through the functions here, so a change to them reaches
+every label at once.
+"""
+from __future__ import annotations
+
+import inspect
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.session import ServerSession
+
+from ..gremlin_client import AppContext, get_g
+from ..indexes import has_filters
+from ..gremlin_helpers import (
+    create_vertex_and_connect_by_captions,
+    delete_vertex_by_id,
+    filter_backward_relationships,
+    filter_direct_relationships,
+    read_vertices_with_edges_by_captions,
+    reverse_backward_relationship_keys,
+)
+from ..mutation_log import journaled
+from ..responses import encoded
+from ..schema import CREATE_RELATIONSHIPS, LABELS_CANON, PROP_TYPES
+from ..snapshot import read_with_fallback
+from ..timeouts import bounded
+from ..validation import normalize_label
+from .reference import describe_create, label_snake, label_words, with_caption_format
+
+
+@dataclass(frozen=True)
+class LabelTools:
+    """The caption tools a label gets."""
+
+    get: bool = True
+    delete: bool = True
+    create: tuple[str, ...] | None = ("caption",)  # parameters of create_<label>; None: no create tool
+    defaults: Callable[[], dict[str, Any]] | None = None  # properties the server sets on create
+
+
+# Labels missing here (person) get no caption tools.
+LABEL_TOOLS: dict[str, LabelTools] = {
+    "notion": LabelTools(),
+    "book": LabelTools(),
+    "verse": LabelTools(delete=False, create=None),
+    "quotation": LabelTools(
+        create=("caption", "text", "book", "position"),
+        defaults=lambda: {"status": "new", "importIndex": -int(time.time())},
+    ),
+    "notionGroup": LabelTools(),
+    "verseGroup": LabelTools(),
+}
+
+
+def _display_name(label: str) -> str:
+    return label_words(label).capitalize()
+
+
+def id_by_caption(g: Any, label: str, caption: str) -> Any:
+    """Id of the `label` vertex with `caption`; raises if there is none."""
+    ids = has_filters(g.V(), [("caption", caption)], "vertex by caption").hasLabel(label).id_().toList()
+    if not ids:
+        raise ValueError(f"{_display_name(label)} not found: caption={caption}")
+    return ids[0]
+
+
+def read_by_caption(ctx: Context[ServerSession, AppContext], label: str, caption: str) -> dict[str, Any]:
+    """The `label` vertex with `caption` and its relationships."""
+
+    def found(vertices: list[dict[str, Any]]) -> dict[str, Any]:
+        if not vertices:
+            raise ValueError(f"{_display_name(label)} not found: caption={caption}")
+        return vertices[0]
+
+    return read_with_fallback(
+        ctx,
+        lambda g: found(read_vertices_with_edges_by_captions(g, [caption], [label])),
+        lambda snapshot: found(snapshot.vertices_with_edges_by_captions([caption], [label])),
+    )
+
+
+def read_by_captions(
+    ctx: Context[ServerSession, AppContext],
+    captions: list[str],
+    labels: list[str] | None = None,
+    fields: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Vertices with `captions` (of `labels`, if given) and their relationships; missing captions are skipped."""
+    labels = [normalize_label(label) for label in labels] if labels else None
+    return read_with_fallback(
+        ctx,
+        lambda g: read_vertices_with_edges_by_captions(g, captions, labels, fields),
+        lambda snapshot: snapshot.vertices_with_edges_by_captions(captions, labels, fields),
+    )
+
+
+def _named(fn: Callable[..., Any], name: str) -> Callable[..., Any]:
+    # Tool names, time budgets, lanes and the mutation log all go by __name__.
+    fn.__name__ = fn.__qualname__ = name
+    return fn
+
+
+def _get_tool(label: str) -> Callable[..., Any]:
+    def get_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
+        try:
+            return read_by_caption(ctx, label, caption)
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    return bounded(_named(get_by_caption, f"get_{label_snake(label)}_by_caption"))
+
+
+def _delete_tool(label: str) -> Callable[..., Any]:
+    def delete_by_caption(ctx: Context[ServerSession, AppContext], caption: str, request_id: str | None = None) -> dict[str, Any]:
+        try:
+            g = get_g(ctx)
+            return delete_vertex_by_id(g, id_by_caption(g, label, caption))
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    return bounded(journaled(_named(delete_by_caption, f"delete_{label_snake(label)}_by_caption"), idempotent=True))
+
+
+def _create_tool(label: str, tools: LabelTools) -> Callable[..., Any]:
+    def create(ctx: Context[ServerSession, AppContext], **arguments: Any) -> dict[str, Any]:
+        try:
+            arguments.pop("request_id", None)
+            relationships = arguments.pop("relationships", None) or {}
+            edges_in = reverse_backward_relationship_keys(filter_backward_relationships(relationships))
+            edges_out = filter_direct_relationships(relationships)
+            properties = {**arguments, **(tools.defaults() if tools.defaults else {})}
+            g = get_g(ctx)
+            return create_vertex_and_connect_by_captions(g, label, properties, edges_out, edges_in)
+        except Exception:
+            raise ToolError(traceback.format_exc())
+
+    # The label's properties become the tool's parameters (and input schema).
+    keyword = inspect.Parameter.KEYWORD_ONLY
+    types = PROP_TYPES.get(label, {})
+    parameters = [inspect.Parameter("ctx", keyword, annotation=Context[ServerSession, AppContext])]
+    parameters += [inspect.Parameter(name, keyword, annotation=types.get(name, str)) for name in tools.create or ()]
+    if label in CREATE_RELATIONSHIPS:
+        parameters.append(inspect.Parameter("relationships", keyword, default=None, annotation=dict[str, list[str]] | None))
+    parameters.append(inspect.Parameter("request_id", keyword, default=None, annotation=str | None))
+    create.__signature__ = inspect.Signature(parameters, return_annotation=dict[str, Any])  # type: ignore[attr-defined]
+
+    return bounded(journaled(_named(create, f"create_{label_snake(label)}")))
+
+
+def register_crud_tools(mcp: FastMCP) -> None:
+
+    for label in dict.fromkeys(LABELS_CANON.values()):
+        tools = LABEL_TOOLS.get(label)
+        if tools is None:
+            continue
+        if tools.get:
+            description = with_caption_format(f"Get the {label_words(label)} with this exact caption, with its relationships.", label)
+            mcp.tool(description=description)(_get_tool(label))
+        if tools.delete:
+            mcp.tool(description=f"Delete {label_words(label)} by caption.")(_delete_tool(label))
+        if tools.create is not None:
+            mcp.tool(description=describe_create(label))(_create_tool(label, tools))
+
+    @mcp.tool()
+    @bounded
+    @encoded
+    def get_entities_by_captions(
+        ctx: Context[ServerSession, AppContext],
+        captions: list[str],
+        labels: list[str] | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get vertices of any label by exact captions, each with its relationships, in one round trip.
+
+        `labels` limits the matches to these labels (e.g. ["notion", "verse"]); `fields` limits
+        the returned properties. Captions that match nothing are left out.
+        """
+        try:
+            return read_by_captions(ctx, captions, labels, fields)
+        except Exception:
+            raise ToolError(traceback.format_exc())
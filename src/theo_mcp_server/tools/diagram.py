@@ -1,17 +1,21 @@
 from __future__ import annotations
 
-import uuid
+import traceback
+from typing import Any
 
 from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
 from mcp.server.session import ServerSession
 
-from ..gremlin_client import AppContext, get_cloud_storage, get_g
+from ..gremlin_client import AppContext, get_cloud_storage, get_g, get_shared_cache, get_upload_queue
 from .. import diagram_helpers
+from ..timeouts import bounded
 
 
 def register_diagram_tools(mcp: FastMCP) -> None:
 
     @mcp.tool()
+    @bounded
     def create_diagram_by_captions(
         ctx: Context[ServerSession, AppContext],
         captions: list[str],
@@ -21,7 +25,9 @@ def register_diagram_tools(mcp: FastMCP) -> None:
         show_quotation_text: bool = False,
         show_verse_text: list[str] | None = None,
         show_ids: bool = False,
-    ) -> dict[str, str]:
+        session_id: str | None = None,
+        wait_for_upload: bool = True,
+    ) -> dict[str, Any]:
         """
         Build an SVG diagram of the induced subgraph for the given vertex captions,
         store it in the configured file cloud, and return a download link.
@@ -41,11 +47,30 @@ def register_diagram_tools(mcp: FastMCP) -> None:
                 Supported values: "RST", "NRSVue". Empty list or null means no text is shown.
                 Versions absent or null on a particular verse are silently skipped.
             show_ids: if True, append the internal vertex ID to each node label.
+            session_id: any id the caller picks for a diagram it is going to redraw. Nodes
+                that were on the previous diagram drawn with the same id keep their positions
+                and only new nodes are laid out, so a small edit to a large diagram redraws
+                quickly and without reshuffling. Omit it for a one-off diagram, laid out in a
+                single Graphviz pass.
+            wait_for_upload: if False, return as soon as the SVG is rendered and upload it in
+                the background; `download_url` is then null and `upload_status` is "pending".
+                Poll `get_diagram_upload_status` with the returned `filename` for the link.
 
         Returns:
-            A dict with the uploaded `filename` and its public `download_url`.
+            A dict with the uploaded `filename`, its public `download_url`, the
+            `upload_status` and the `session_id` it was drawn with (null without one).
         """
         g = get_g(ctx)
+        app_ctx = ctx.request_context.lifespan_context
+        session = None
+        if session_id is not None:
+            with app_ctx.lock:
+                session = diagram_helpers.get_or_create_session(
+                    app_ctx.diagram_sessions,
+                    session_id,
+                    layout,
+                    direction,
+                )
         svg = diagram_helpers.create_diagram_by_captions(
             g,
             captions=captions,
@@ -55,10 +80,43 @@ def register_diagram_tools(mcp: FastMCP) -> None:
             show_quotation_text=show_quotation_text,
             show_verse_text=show_verse_text or [],
             show_ids=show_ids,
+            session=session,
+            cache=get_shared_cache(ctx),
         )
 
-        cloud_storage = get_cloud_storage(ctx)
-        filename = f"diagram-{uuid.uuid4().hex}.svg"
-        download_url = cloud_storage.upload(filename, svg, content_type="image/svg+xml")
+        # Identical diagrams get identical names, so they are stored only once.
+        from ..cloud_storage import content_addressed_filename
 
-        return {"filename": filename, "download_url": download_url}
+        filename = content_addressed_filename(svg, prefix="diagram-", suffix=".svg")
+        if wait_for_upload:
+            download_url = get_cloud_storage(ctx).upload(filename, svg, content_type="image/svg+xml")
+            upload_status = "done"
+        else:
+            status = get_upload_queue(ctx).submit(filename, svg, content_type="image/svg+xml")
+            download_url = status.download_url
+            upload_status = status.state
+
+        return {
+            "filename": filename,
+            "download_url": download_url,
+            "upload_status": upload_status,
+            "session_id": session_id,
+        }
+
+    @mcp.tool()
+    @bounded
+    def get_diagram_upload_status(ctx: Context[ServerSession, AppContext], filename: str) -> dict[str, Any]:
+        """
+        Report the state of a diagram uploaded in the background
+        (`create_diagram_by_captions` with `wait_for_upload=false`).
+
+        Returns a dict with `filename`, `state` (pending, uploading, done or failed),
+        `attempts`, `download_url` (set once done) and the last `error`, if any.
+        """
+        try:
+            status = get_upload_queue(ctx).status(filename)
+            if status is None:
+                raise ValueError(f"No background upload known for filename={filename}")
+            return status.to_dict()
+        except Exception:
+            raise ToolError(traceback.format_exc())
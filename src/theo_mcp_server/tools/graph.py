@@ -1,516 +1,174 @@
 from __future__ import annotations
 
 from typing import Any
-import time
 
 import traceback 
 
-from gremlin_python.process.graph_traversal import __
-from gremlin_python.process.traversal import T, Order
+from gremlin_python.process.traversal import T
 from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.session import ServerSession
 from mcp.server.fastmcp.exceptions import ToolError
-from ..gremlin_client import AppContext, get_g
+from ..gremlin_client import AppContext, get_g, get_shared_cache
+from ..mutation_log import journaled
+from ..responses import encoded
+from ..snapshot import read_with_fallback
+from ..timeouts import bounded
 from ..gremlin_helpers import (
     build_notion_groups_tree,
-    create_vertex_and_connect_by_captions,
-    filter_direct_relationships,
-    filter_backward_relationships,
     get_vertices_by_captions,
-    reverse_backward_relationship_keys,
     read_vertex_with_edges,
-    delete_vertex_by_id,
-    get_unique_vertex_by_caption,
-    create_edge,
+    get_unique_vertices_by_captions,
+    create_edges,
     search_vertices,
-    flatten_value_map,
     validate_quotation_status,
 )
-from ..validation import normalize_edge_label, normalize_label, validate_and_fix_properties
+from ..validation import normalize_edge_label, normalize_label, validate_and_fix_properties, validate_relationships
 from theo_mcp_server import gremlin_helpers
+from .crud import id_by_caption
+from .reference import with_caption_format
 
 
-def register_graph_tools(mcp: FastMCP) -> None:
+# Properties returned by search tools unless the caller asks for others.
+SEARCH_DEFAULT_FIELDS = ["caption", "description"]
 
-    @mcp.tool()
-    def create_notion(ctx: Context[ServerSession, AppContext], caption: str, relationships: dict[str, list[str]] | None = None) -> dict[str, Any]:
-        """
-            Create a notion vertex.
-            
-            The following relationships can be specified in the `relationships` parameter:
-            - isSupportedBy
-            - supports
-            - isChallengedBy
-            - challenges
-            - refersTo
-            - isReferredBy
-            - contains
-            - isContainedIn
+# Seconds a notion tree stays cached; changes to notions or groups evict it sooner.
+TREE_CACHE_TTL = 600.0
 
-            Each relationship should map to a list of captions of existing notions, verses, notionGroups, books, verseGroups, or persons.       
-        """
-        try:
-            edges_in = filter_backward_relationships(relationships or {})
-            edges_in = reverse_backward_relationship_keys(edges_in)
-            edges_out = filter_direct_relationships(relationships or {})
-            g = get_g(ctx)
-            return create_vertex_and_connect_by_captions(g, "notion", {"caption": caption}, edges_out, edges_in)
-        except Exception:
-            raise ToolError(traceback.format_exc())
+GET_VERSES_BY_CAPTIONS = with_caption_format("Get verses by exact caption matches.", "verse") + (
+    '\n\n`fields` limits the returned properties (e.g. ["caption", "RST"]); omit it to get all of them.'
+)
 
-    @mcp.tool()
-    def create_notion_group(ctx: Context[ServerSession, AppContext], caption: str, relationships: dict[str, list[str]] | None = None) -> dict[str, Any]:
-        """
-            Create a notion group vertex.
-            
-            The following relationships can be specified in the `relationships` parameter:
-            - isSupportedBy
-            - supports
-            - isChallengedBy
-            - challenges
-            - refersTo
-            - isReferredBy
-            - contains
-            - isContainedIn
 
-            Each relationship should map to a list of captions of existing notions, verses, notionGroups, books, verseGroups, or persons.       
-        """
-        try:
-            edges_in = filter_backward_relationships(relationships or {})
-            edges_in = reverse_backward_relationship_keys(edges_in)
-            edges_out = filter_direct_relationships(relationships or {})
-            g = get_g(ctx)
-            return create_vertex_and_connect_by_captions(g, "notionGroup", {"caption": caption}, edges_out, edges_in)
-        except Exception:
-            raise ToolError(traceback.format_exc())
+def _notion_groups_tree(ctx: Context[ServerSession, AppContext], include_notions: bool) -> dict[str, Any]:
+    cache = get_shared_cache(ctx)
+    key = f"tree:{include_notions}"
+    tree = cache.get(key)
+    if tree is not None:
+        return tree
+
+    def live(g: Any) -> dict[str, Any]:
+        tree = build_notion_groups_tree(g, includeNotions=include_notions)
+        cache.set(key, tree, TREE_CACHE_TTL, labels=("notion", "notionGroup"))
+        return tree
+
+    # A tree built from the snapshot is not cached; its keys are captions, so it comes wrapped.
+    return read_with_fallback(ctx, live, lambda snapshot: snapshot.notion_groups_tree(include_notions), wrap=True)
+
+
+def register_graph_tools(mcp: FastMCP) -> None:
 
     @mcp.tool()
+    @bounded
+    @encoded
     def get_notion_groups_tree(ctx: Context[ServerSession, AppContext]) -> dict[str, Any]:
         """Get the whole tree of notion groups with their nested subgroups, but without contained notions."""
         try:
-            g = get_g(ctx)
-            return build_notion_groups_tree(g, includeNotions=False)
+            return _notion_groups_tree(ctx, include_notions=False)
         except Exception:
             raise ToolError(traceback.format_exc())
 
     @mcp.tool()
+    @bounded
+    @encoded
     def get_notions_tree(ctx: Context[ServerSession, AppContext]) -> dict[str, Any]:
         """Get the whole tree of notion groups with their nested subgroup, ending with nested notions."""
         try:
-            g = get_g(ctx)
-            return build_notion_groups_tree(g, includeNotions=True)
+            return _notion_groups_tree(ctx, include_notions=True)
         except Exception:
             raise ToolError(traceback.format_exc())
 
 
-    @mcp.tool()
-    def get_verses_by_captions(ctx: Context[ServerSession, AppContext], captions: list[str]) -> list[dict[str, Any]]:
-        """
-        Get verses by exact caption matches. 
-        
-        The verse caption has the format `{book} {chapter}:{verse number}`, e. g. Jn 1:11 or 2Pet 2:13.
-
-        The book is a short abbreviation of a bible book. Here is a complete list of possible book abbreviations:
-
-        - Acts (for Acts),
-        - 2Pet (for II Peter),
-        - Gal (for Galatians),
-        - 1Kgs (for I Kings),
-        - Ps (for Psalms),
-        - 1Mac (for I Maccabees),
-        - Esth (for Esther),
-        - Hab (for Habakkuk),
-        - Hag (for Haggai),
-        - Jdt (for Judith),
-        - Bar (for Baruch),
-        - Zech (for Zechariah),
-        - 1Cor (for I Corinthians),
-        - Hos (for Hosea),
-        - 1Mac (for III Maccabees),
-        - Lk (for Luke),
-        - 1Sam (for I Samuel),
-        - Judg (for Judges),
-        - Eccl (for Ecclesiastes),
-        - Jonah (for Jonah),
-        - Jn (for John),
-        - Mt (for Matthew),
-        - Prov (for Proverbs),
-        - Lam (for Lamentations),
-        - 2Kgs (for II Kings),
-        - 1Chr (for I Chronicles),
-        - Amos (for Amos),
-        - 1Th (for I Thessalonians),
-        - Phlm (for Philemon),
-        - 2Tim (for II Timothy),
-        - Zeph (for Zephaniah),
-        - Nah (for Nahum),
-        - Joel (for Joel),
-        - Rom (for Romans),
-        - Gen (for Genesis),
-        - Jude (for Jude),
-        - 2Cor (for II Corinthians),
-        - Heb (for Hebrews),
-        - 2Mac (for II Maccabees),
-        - Wis (for Wisdom),
-        - 2Jn (for II John),
-        - Tob (for Tobit),
-        - Sir (for Sirach),
-        - Deut (for Deuteronomy),
-        - Mal (for Malachi),
-        - PrMan (for Prayer of Manasses),
-        - 2Chr (for II Chronicles),
-        - Ezr (for Ezra),
-        - Dan (for Daniel),
-        - 1Jn (for I John),
-        - Ruth (for Ruth),
-        - Col (for Colossians),
-        - SS (for Song of Solomon),
-        - Job (for Job),
-        - EpJer (for Epistle of Jeremiah),
-        - Mic (for Micah),
-        - Jas (for James),
-        - Phil (for Philippians),
-        - Eph (for Ephesians),
-        - 1Tim (for I Timothy),
-        - Ex (for Exodus),
-        - 3Jn (for III John),
-        - Tit (for Titus),
-        - Ez (for Ezekiel),
-        - Num (for Numbers),
-        - Mk (for Mark),
-        - 2Th (for II Thessalonians),
-        - Obad (for Obadiah),
-        - 1Esd (for I Esdras),
-        - 2Esd (for II Esdras),
-        - 2Sam (for II Samuel),
-        - 1Pet (for I Peter),
-        - Josh (for Joshua),
-        - Lev (for Leviticus),
-        - Rev (for Revelation of John),
-        - Jer (for Jeremiah),
-        - Is (for Isaiah),
-        - Neh (for Nehemiah).
-        """
-
-        try:
-            g = get_g(ctx)
-            return get_vertices_by_captions(g, captions)
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
-    def get_verse_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Get verse by exact caption match. 
-        
-        The verse caption has the format `{book} {chapter}:{verse number}`, e. g. Jn 1:11 or 2Pet 2:13.
-
-        The book is a short abbreviation of a bible book. Here is a complete list of possible book abbreviations:
-
-        - Acts (for Acts),
-        - 2Pet (for II Peter),
-        - Gal (for Galatians),
-        - 1Kgs (for I Kings),
-        - Ps (for Psalms),
-        - 1Mac (for I Maccabees),
-        - Esth (for Esther),
-        - Hab (for Habakkuk),
-        - Hag (for Haggai),
-        - Jdt (for Judith),
-        - Bar (for Baruch),
-        - Zech (for Zechariah),
-        - 1Cor (for I Corinthians),
-        - Hos (for Hosea),
-        - 1Mac (for III Maccabees),
-        - Lk (for Luke),
-        - 1Sam (for I Samuel),
-        - Judg (for Judges),
-        - Eccl (for Ecclesiastes),
-        - Jonah (for Jonah),
-        - Jn (for John),
-        - Mt (for Matthew),
-        - Prov (for Proverbs),
-        - Lam (for Lamentations),
-        - 2Kgs (for II Kings),
-        - 1Chr (for I Chronicles),
-        - Amos (for Amos),
-        - 1Th (for I Thessalonians),
-        - Phlm (for Philemon),
-        - 2Tim (for II Timothy),
-        - Zeph (for Zephaniah),
-        - Nah (for Nahum),
-        - Joel (for Joel),
-        - Rom (for Romans),
-        - Gen (for Genesis),
-        - Jude (for Jude),
-        - 2Cor (for II Corinthians),
-        - Heb (for Hebrews),
-        - 2Mac (for II Maccabees),
-        - Wis (for Wisdom),
-        - 2Jn (for II John),
-        - Tob (for Tobit),
-        - Sir (for Sirach),
-        - Deut (for Deuteronomy),
-        - Mal (for Malachi),
-        - PrMan (for Prayer of Manasses),
-        - 2Chr (for II Chronicles),
-        - Ezr (for Ezra),
-        - Dan (for Daniel),
-        - 1Jn (for I John),
-        - Ruth (for Ruth),
-        - Col (for Colossians),
-        - SS (for Song of Solomon),
-        - Job (for Job),
-        - EpJer (for Epistle of Jeremiah),
-        - Mic (for Micah),
-        - Jas (for James),
-        - Phil (for Philippians),
-        - Eph (for Ephesians),
-        - 1Tim (for I Timothy),
-        - Ex (for Exodus),
-        - 3Jn (for III John),
-        - Tit (for Titus),
-        - Ez (for Ezekiel),
-        - Num (for Numbers),
-        - Mk (for Mark),
-        - 2Th (for II Thessalonians),
-        - Obad (for Obadiah),
-        - 1Esd (for I Esdras),
-        - 2Esd (for II Esdras),
-        - 2Sam (for II Samuel),
-        - 1Pet (for I Peter),
-        - Josh (for Joshua),
-        - Lev (for Leviticus),
-        - Rev (for Revelation of John),
-        - Jer (for Jeremiah),
-        - Is (for Isaiah),
-        - Neh (for Nehemiah).
-
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("verse").id_().toList()
-            if not ids:
-                raise ValueError(f"Verse not found: caption={caption}")
-            
-            return read_vertex_with_edges(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()
-    def get_verse_group_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Get verse group existing in the database by exact caption match. The rules for verse caption are the same as for `get_verse_by_caption`, 
-        plus the following additional rules:
-
-        If the verse group contains only one verse, its caption should be the same as the verse caption. 
-        
-        If the verse group contains multiple successive verses from one chapter, its caption should be 
-        in the format `{book} {chapter}:{verse number}-{verse number}`, 
-        e. g. Jn 1:11-13 or 2Pet 2:13-15.
-
-        If the verse group contains multiple successive verses from multiple chapters, its caption 
-        should be in the format `{book} {chapter}:{verse number}-{chapter}:{verse number}`, 
-        e. g. Jn 1:11-3:13 or 2Pet 1:1-2:15.
-
-        If the verse group contains multiple verses, that are not successive, but are from the same chapter,
-        its caption should be in the format `{book} {chapter}:{verse number},{verse number},{verse number}`, 
-        e. g. Jn 1:11,13,15 or 2Pet 2:13,15,18.
-
-        If the verse group contains multiple verses, that are not successive, and are from different chapters,
-        its caption should be in the format `{book} {chapter}:{verse number},{chapter}:{verse number},{chapter}:{verse number}`,
-        e. g. Jn 1:11,2:13,3:15 or 2Pet 1:1,2:15,3:18.
-
-        The group of unsuccessive verses can also contain subgroups of successive verses, in which case the caption should combine the rules described above, 
-        e. g. Jn 1:11-13,2:15,3:15-18 or 2Pet 1:1-2:15,3:18.
-
-        If the verse group contains all verses from a chapter, its caption should be in the format `{book} {chapter}`, e. g. Jn 1 or 2Pet 2.^
-
-        If the verse group contains all verses from multiple chapters, its caption should be in the format `{book} {chapter}-{chapter}`, e. g. Jn 1-3 or 2Pet 1-2.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("verseGroup").id_().toList()
-            if not ids:
-                raise ValueError(f"Verse group not found: caption={caption}")
-            
-            return read_vertex_with_edges(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()
-    def create_verse_group(ctx: Context[ServerSession, AppContext], caption: str, relationships: dict[str, list[str]] | None = None) -> dict[str, Any]:
-        """
-            Create a verse group vertex.
-            
-            The following relationships can be specified in the `relationships` parameter:
-            - isSupportedBy
-            - supports
-            - isChallengedBy
-            - challenges
-            - refersTo
-            - isReferredBy
-            - contains
-            - isContainedIn
-
-            Each relationship should map to a list of captions of existing notions, verses, notionGroups, books, verseGroups, or persons.       
-        """
-        try:
-            edges_in = filter_backward_relationships(relationships or {})
-            edges_in = reverse_backward_relationship_keys(edges_in)
-            edges_out = filter_direct_relationships(relationships or {})
-            g = get_g(ctx)
-            return create_vertex_and_connect_by_captions(g, "verseGroup", {"caption": caption}, edges_out, edges_in)
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()
-    def delete_verse_group_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Delete verse group by caption.
-        """
+    @mcp.tool(description=GET_VERSES_BY_CAPTIONS)
+    @bounded
+    @encoded
+    def get_verses_by_captions(
+        ctx: Context[ServerSession, AppContext], captions: list[str], fields: list[str] | None = None
+    ) -> list[dict[str, Any]]:
         try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("verseGroup").id_().toList()
-            if not ids:
-                raise ValueError(f"Verse group not found: caption={caption}")
-            return delete_vertex_by_id(g, ids[0])
+            return read_with_fallback(
+                ctx,
+                lambda g: get_vertices_by_captions(g, captions, fields),
+                lambda snapshot: snapshot.vertices_by_captions(captions, fields),
+            )
         except Exception:
             raise ToolError(traceback.format_exc())
 
     @mcp.tool()
+    @bounded
     def get_notion_by_id(ctx: Context[ServerSession, AppContext], id: int) -> dict[str, Any]:
         """
         Get notion by id.
         """
         try:
-            g = get_g(ctx)
-            return read_vertex_with_edges(g, id)
+            return read_with_fallback(
+                ctx,
+                lambda g: read_vertex_with_edges(g, id),
+                lambda snapshot: snapshot.vertex_with_edges(id),
+            )
         except Exception:
             raise ToolError(traceback.format_exc())
         
     @mcp.tool()
-    def get_notion_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Get notion by caption.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("notion").id_().toList()
-            if not ids:
-                raise ValueError(f"Notion not found: caption={caption}")
-
-            return read_vertex_with_edges(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
-    def delete_notion_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Delete notion by caption.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("notion").id_().toList()
-            if not ids:
-                raise ValueError(f"Notion not found: caption={caption}")
-            return delete_vertex_by_id(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
-    def delete_notion_group_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Delete notion group by caption.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("notionGroup").id_().toList()
-            if not ids:
-                raise ValueError(f"Notion group not found: caption={caption}")
-            return delete_vertex_by_id(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
-    def get_notion_group_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """
-        Read notion group by caption.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("notionGroup").id_().toList()
-            if not ids:
-                raise ValueError(f"Notion group not found: caption={caption}")
-            return read_vertex_with_edges(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
+    @bounded
+    @journaled
     def create_relationships(
         ctx: Context[ServerSession, AppContext],
-        relationships: list[dict[str, str]]) -> list[dict[str, Any]]:
+        relationships: list[dict[str, str]],
+        request_id: str | None = None,
+    ) -> list[dict[str, Any]]:
         """Create multiple relationships. Each relationship should be a dict with keys: relationship, sourceCaption, targetCaption."""
-        results = []
         try:
+            specs = validate_relationships(relationships)
             g = get_g(ctx)
-            for rel in relationships:
-                source = get_unique_vertex_by_caption(g, rel["sourceCaption"])
-                target = get_unique_vertex_by_caption(g, rel["targetCaption"])
-                result = create_edge(g, rel["relationship"], source["internal_id"], target["internal_id"])
-                results.append(result)
-            return results
+            captions = [c for _, source, target in specs for c in (source, target)]
+            vertices = get_unique_vertices_by_captions(g, captions)
+            return create_edges(g, [
+                (edge_label, vertices[source], vertices[target])
+                for edge_label, source, target in specs
+            ])
         except Exception:
             raise ToolError(traceback.format_exc())
         
     @mcp.tool()
+    @bounded
+    @journaled
     def create_relationship(
         ctx: Context[ServerSession, AppContext],
         relationship: str,
         sourceCaption: str,
         targetCaption: str,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
         """Create a relationship of type `relationship` going from a vertex with `sourceCaption` to a vertex with `targetCaption."""
         try:
             g = get_g(ctx)
-            source = get_unique_vertex_by_caption(g, sourceCaption)
-            target = get_unique_vertex_by_caption(g, targetCaption)
-            return create_edge(g, relationship, source["internal_id"], target["internal_id"])
+            vertices = get_unique_vertices_by_captions(g, [sourceCaption, targetCaption])
+            return create_edges(g, [(relationship, vertices[sourceCaption], vertices[targetCaption])])[0]
         except Exception:
             raise ToolError(traceback.format_exc())
 
     @mcp.tool()
+    @bounded
+    @journaled(idempotent=True)
     def delete_relationship(
         ctx: Context[ServerSession, AppContext],
         relationship: str,
         sourceCaption: str,
         targetCaption: str,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
         """Delete all relationships of type `relationship` from `sourceCaption` to `targetCaption`."""
         try:
             g = get_g(ctx)
-            source = get_unique_vertex_by_caption(g, sourceCaption)
-            target = get_unique_vertex_by_caption(g, targetCaption)
+            vertices = get_unique_vertices_by_captions(g, [sourceCaption, targetCaption])
+            source = vertices[sourceCaption]
+            target = vertices[targetCaption]
             edge_label = normalize_edge_label(relationship)
 
-            count = (
-                g.V(source["internal_id"])
-                .outE(edge_label)
-                .where(__.inV().hasId(target["internal_id"]))
-                .count()
-                .next()
-            )
-
-            (
-                g.V(source["internal_id"])
-                .outE(edge_label)
-                .where(__.inV().hasId(target["internal_id"]))
-                .drop()
-                .iterate()
-            )
+            count = gremlin_helpers.delete_edges(g, edge_label, source, target)
 
             return {
-                "deleted_edges": int(count),
+                "deleted_edges": count,
                 "relationship": edge_label,
                 "source": {
                     "label": source["label"],
@@ -527,89 +185,82 @@ def register_graph_tools(mcp: FastMCP) -> None:
             raise ToolError(traceback.format_exc())
         
     @mcp.tool()
+    @bounded
+    @encoded
     def search_notion_groups_and_notions(
         ctx: Context[ServerSession, AppContext],
         searchText: str,
-        limit: int = 100
+        limit: int = 100,
+        fields: list[str] | None = None,
     ) -> list[dict[str, Any]]:
-        """Search for notion groups and notions by substring."""
+        """Search for notion groups and notions by substring.
+
+        Returns internal_id, label, caption and description by default; pass `fields`
+        to choose other properties.
+        """
         try:
-            g = get_g(ctx)
-            return search_vertices(g, ["notion", "notionGroup"], searchText, limit)
+            types = ["notion", "notionGroup"]
+            fields = fields or SEARCH_DEFAULT_FIELDS
+            return read_with_fallback(
+                ctx,
+                lambda g: search_vertices(g, types, searchText, limit, fields),
+                lambda snapshot: snapshot.search(types, searchText, limit, fields),
+            )
         except Exception:
             raise ToolError(traceback.format_exc())
         
     @mcp.tool()
-    def get_quotation_by_caption(
-        ctx: Context[ServerSession, AppContext],
-        caption: str
-    ) -> dict[str, Any]:
-        """Get quotation by caption."""
+    @bounded
+    @encoded
+    def get_quotations_by_status(
+        ctx: Context[ServerSession, AppContext], 
+        status: str, 
+        limit: int,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get quotations by status (new, suspended, processed).
+
+        `fields` limits the returned properties (e.g. ["caption", "book", "position"]);
+        omit it to get all of them, including the quotation text.
+        """
         try:
             g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("quotation").id_().toList()
-            if not ids:
-                raise ValueError(f"Quotation not found: caption={caption}")
-            return read_vertex_with_edges(g, ids[0])
+            return gremlin_helpers.get_quotations_by_status(g, status, limit, fields)
         except Exception:
             raise ToolError(traceback.format_exc())
-        
+
     @mcp.tool()
-    def create_quotation(
+    @bounded
+    @encoded
+    @journaled
+    def claim_next_quotations(
         ctx: Context[ServerSession, AppContext],
-        caption: str,
-        text: str,
-        book: str,
-        position: str,
-        relationships: dict[str, list[str]] | None = None
+        limit: int,
+        status: str = "new",
+        claim_status: str = "suspended",
+        fields: list[str] | None = None,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
-        """
-            Create a quotation.
-            
-            The following relationships can be specified in the `relationships` parameter:
-            - isContainedIn
+        """Take the next quotations with `status` from the work queue, marking them `claim_status`.
 
-            Each relationship should map to a list of captions of existing books or persons.       
+        Quotations come in the same order as get_quotations_by_status. Claimed quotations
+        leave `status`, so the next call returns the next batch.
+        `fields` limits the returned properties.
         """
         try:
-            edges_in = filter_backward_relationships(relationships or {})
-            edges_in = reverse_backward_relationship_keys(edges_in)
-            edges_out = filter_direct_relationships(relationships or {})
             g = get_g(ctx)
-            props = {
-                "caption": caption,
-                "text": text,
-                "book": book,
-                "position": position,
-                "status": "new",
-                "importIndex": -int(time.time()),
-            }
-            return create_vertex_and_connect_by_captions(g, "quotation", props, edges_out, edges_in)
+            return gremlin_helpers.claim_next_quotations(g, status, limit, claim_status, fields)
         except Exception:
             raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()
-    def get_quotations_by_status(
-        ctx: Context[ServerSession, AppContext], 
-        status: str, 
-        limit: int
-    ) -> list[dict[str, Any]]:
-        """Get quotations by status (new, suspended, processed)."""
-        try:
-            validate_quotation_status(status)
-            
-            g = get_g(ctx)
-            t = g.V().has('type', "quotation").has('status', status).order().by("importIndex", Order.desc)
-            raw_list = t.limit(limit).valueMap(True).toList()
-            return [flatten_value_map(r) for r in raw_list]
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
+
     @mcp.tool()
+    @bounded
+    @journaled(idempotent=True)
     def set_quotation_status(
         ctx: Context[ServerSession, AppContext],
         caption: str,
-        status: str
+        status: str,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
         """
         Set quotation status by caption. Valid statuses: new, suspended, processed.
@@ -618,73 +269,20 @@ def register_graph_tools(mcp: FastMCP) -> None:
             validate_quotation_status(status)
             
             g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("quotation").id_().toList()
-            if not ids:
-                raise ValueError(f"Quotation not found: caption={caption}")
-            
-            g.V(ids[0]).property("status", status).iterate()
-            return read_vertex_with_edges(g, ids[0])
+            id = id_by_caption(g, "quotation", caption)
+            gremlin_helpers.set_vertex_status(g, id, "quotation", status)
+            return read_vertex_with_edges(g, id)
         except Exception:
             raise ToolError(traceback.format_exc()) 
 
-    @mcp.tool()    
-    def delete_quotation_by_caption(
-        ctx: Context[ServerSession, AppContext],
-        caption: str
-    ) -> dict[str, Any]:
-        """
-        Delete quotation by caption.
-        """
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("quotation").id_().toList()
-            if not ids:
-                raise ValueError(f"Quotation not found: caption={caption}")
-            return delete_vertex_by_id(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()    
-    def get_book_by_caption(
-        ctx: Context[ServerSession, AppContext],
-        caption: str
-    ) -> dict[str, Any]:
-        """Get book by caption."""
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("book").id_().toList()
-            if not ids:
-                raise ValueError(f"Book not found: caption={caption}")
-            return read_vertex_with_edges(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-        
-    @mcp.tool()
-    def create_book(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """Create a book vertex."""
-        try:
-            g = get_g(ctx)
-            return create_vertex_and_connect_by_captions(g, "book", {"caption": caption}, {}, {})
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
-    @mcp.tool()
-    def delete_book_by_caption(ctx: Context[ServerSession, AppContext], caption: str) -> dict[str, Any]:
-        """Delete book by caption."""
-        try:
-            g = get_g(ctx)
-            ids = g.V().has("caption", caption).hasLabel("book").id_().toList()
-            if not ids:
-                raise ValueError(f"Book not found: caption={caption}")
-            return delete_vertex_by_id(g, ids[0])
-        except Exception:
-            raise ToolError(traceback.format_exc())
-
     @mcp.tool()
+    @bounded
+    @journaled(idempotent=True)
     def move_notion_to_group(
         ctx: Context[ServerSession, AppContext],
         notionCaption: str,
         notionGroupCaption: str,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
         """Move a notion to another notion group. Both are identified by caption.
 
@@ -698,10 +296,13 @@ def register_graph_tools(mcp: FastMCP) -> None:
             raise ToolError(traceback.format_exc())
 
     @mcp.tool()
+    @bounded
+    @journaled(idempotent=True)
     def change_caption(
         ctx: Context[ServerSession, AppContext],
         oldCaption: str,
-        newCaption: str
+        newCaption: str,
+        request_id: str | None = None,
     ) -> dict[str, Any]:
         """Change entity caption."""
         try:
@@ -0,0 +1,129 @@
+"""Reference data for clients, and the tool descriptions that point to it.
+
+Every `tools/list` response (and every LLM context it ends up in) carries
+all tool descriptions, so data several tools rely on (book abbreviations,
+relationship names, caption rules) is published once as MCP resources, and
+the descriptions are generated from `schema` with a short summary and the
+resource URI.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from ..schema import BOOK_ABBREVIATIONS, CREATE_RELATIONSHIPS, RELATIONSHIPS
+
+BOOKS_URI = "theo://reference/books"
+RELATIONSHIPS_URI = "theo://reference/relationships"
+CAPTIONS_URI = "theo://reference/captions"
+
+VERSE_CAPTIONS = (
+    "Verse captions have the format `{book} {chapter}:{verse number}`, e.g. Jn 1:11 or 2Pet 2:13, "
+    f"`book` being one of the abbreviations in {BOOKS_URI}."
+)
+
+VERSE_GROUP_CAPTIONS = (
+    "Verse group captions name the verses they contain, e.g. Jn 1:11 (one verse), Jn 1:11-13, "
+    f"Jn 1:11-3:13, Jn 1:11,13,15, Jn 1:11-13,2:15 or Jn 1-3 (whole chapters); see {CAPTIONS_URI}."
+)
+
+# Caption formats worth stating in the descriptions of a label's tools.
+CAPTION_FORMATS: dict[str, str] = {
+    "verse": VERSE_CAPTIONS,
+    "verseGroup": VERSE_GROUP_CAPTIONS,
+}
+
+CAPTION_RULES = """\
+# Captions
+
+## Verses
+
+`{book} {chapter}:{verse number}`, e.g. Jn 1:11 or 2Pet 2:13. `book` is one of the
+abbreviations in theo://reference/books.
+
+## Verse groups
+
+- One verse: the verse caption, e.g. Jn 1:11.
+- Successive verses of one chapter: `{book} {chapter}:{verse number}-{verse number}`,
+  e.g. Jn 1:11-13 or 2Pet 2:13-15.
+- Successive verses over several chapters: `{book} {chapter}:{verse number}-{chapter}:{verse number}`,
+  e.g. Jn 1:11-3:13 or 2Pet 1:1-2:15.
+- Verses that are not successive, from one chapter: `{book} {chapter}:{verse number},{verse number},...`,
+  e.g. Jn 1:11,13,15 or 2Pet 2:13,15,18.
+- Verses that are not successive, from several chapters: `{book} {chapter}:{verse number},{chapter}:{verse number},...`,
+  e.g. Jn 1:11,2:13,3:15 or 2Pet 1:1,2:15,3:18.
+- Groups of verses that are not successive may contain runs of successive ones, combining the
+  rules above, e.g. Jn 1:11-13,2:15,3:15-18 or 2Pet 1:1-2:15,3:18.
+- All verses of a chapter: `{book} {chapter}`, e.g. Jn 1 or 2Pet 2.
+- All verses of several chapters: `{book} {chapter}-{chapter}`, e.g. Jn 1-3 or 2Pet 1-2.
+"""
+
+
+def label_words(label: str) -> str:
+    """`label` as words, e.g. "notion group" for notionGroup."""
+    return re.sub(r"(?<!^)(?=[A-Z])", " ", label).lower()
+
+
+def label_snake(label: str) -> str:
+    """`label` as it appears in tool names, e.g. "notion_group" for notionGroup."""
+    return label_words(label).replace(" ", "_")
+
+
+def _or_list(items: list[str]) -> str:
+    return items[0] if len(items) == 1 else f"{', '.join(items[:-1])} or {items[-1]}"
+
+
+def with_caption_format(text: str, label: str) -> str:
+    caption_format = CAPTION_FORMATS.get(label)
+    return f"{text}\n\n{caption_format}" if caption_format else text
+
+
+def describe_create(label: str) -> str:
+    """Description of the create tool of `label`."""
+    text = f"Create a {label_words(label)} vertex."
+    if label in CREATE_RELATIONSHIPS:
+        relationships, targets = CREATE_RELATIONSHIPS[label]
+        text += (
+            f"\n\n`relationships` maps relationship names ({', '.join(relationships)}) to lists of captions "
+            f"of existing {_or_list([label_words(t) + 's' for t in targets])}; see {RELATIONSHIPS_URI}."
+        )
+    return with_caption_format(text, label)
+
+
+def relationships_reference() -> dict[str, Any]:
+    from ..gremlin_helpers import backward_reverse_mapping
+
+    return {
+        "relationships": {
+            name: (
+                {"edge": backward_reverse_mapping[name], "direction": "from the related vertex"}
+                if name in backward_reverse_mapping
+                else {"edge": name, "direction": "to the related vertex"}
+            )
+            for name in RELATIONSHIPS
+        },
+        "accepted_on_create": {
+            label: {"relationships": list(relationships), "related_labels": list(targets)}
+            for label, (relationships, targets) in CREATE_RELATIONSHIPS.items()
+        },
+    }
+
+
+def register_reference_resources(mcp: FastMCP) -> None:
+
+    @mcp.resource(BOOKS_URI, mime_type="application/json")
+    def books() -> dict[str, str]:
+        """Bible book abbreviations used in verse captions, mapped to the books."""
+        return BOOK_ABBREVIATIONS
+
+    @mcp.resource(RELATIONSHIPS_URI, mime_type="application/json")
+    def relationships() -> dict[str, Any]:
+        """Relationship names the create tools take, the edges they create, and which labels accept them."""
+        return relationships_reference()
+
+    @mcp.resource(CAPTIONS_URI, mime_type="text/markdown")
+    def captions() -> str:
+        """Caption formats of verses and verse groups."""
+        return CAPTION_RULES
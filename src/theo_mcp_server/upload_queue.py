@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Any
+
+from .cloud_storage import CloudStorage
+from .config import Config
+
+# Upload states, in lifecycle order.
+PENDING = "pending"
+UPLOADING = "uploading"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class UploadStatus:
+    filename: str
+    state: str = PENDING
+    attempts: int = 0
+    download_url: str | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class UploadQueue:
+    """Background uploads to a `CloudStorage`, so callers need not wait on the WAN.
+
+    At most `max_workers` uploads run at once; up to `max_pending` more wait in
+    the queue and further submissions are rejected. A failed upload is retried
+    `max_retries` times with exponential backoff (`backoff_seconds`, doubled
+    per attempt); the retry is queued again by a timer once the backoff is
+    over, so a worker is not held up while it waits. Statuses of the most
+    recent uploads stay queryable by filename.
+    """
+
+    def __init__(
+        self,
+        storage: CloudStorage,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        max_statuses: int = 1000,
+    ) -> None:
+        self._storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="theo-upload")
+        self._max_in_flight = max_workers + max_pending
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._max_statuses = max_statuses
+        self._statuses: OrderedDict[str, UploadStatus] = OrderedDict()
+        self._in_flight = 0
+        self._retries: set[threading.Timer] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, storage: CloudStorage, cfg: Config) -> "UploadQueue":
+        return cls(
+            storage,
+            max_workers=cfg.upload_workers,
+            max_pending=cfg.upload_max_pending,
+            max_retries=cfg.upload_max_retries,
+            backoff_seconds=cfg.upload_retry_backoff,
+        )
+
+    def submit(self, filename: str, content: bytes | str, content_type: str = "application/octet-stream") -> UploadStatus:
+        """Queue an upload and return its (pending) status immediately."""
+        with self._lock:
+            if self._in_flight >= self._max_in_flight:
+                raise RuntimeError(
+                    f"Upload queue is full ({self._in_flight} uploads pending); retry later"
+                )
+            self._in_flight += 1
+            status = UploadStatus(filename=filename)
+            self._statuses[filename] = status
+            self._statuses.move_to_end(filename)
+            self._trim_statuses()
+            snapshot = replace(status)
+        self._executor.submit(self._run, status, content, content_type, 0)
+        return snapshot
+
+    def status(self, filename: str) -> UploadStatus | None:
+        """Return a snapshot of the upload's current status, if it is known."""
+        with self._lock:
+            status = self._statuses.get(filename)
+            return replace(status) if status is not None else None
+
+    def close(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+            retries, self._retries = self._retries, set()
+        for timer in retries:
+            timer.cancel()
+        for timer in retries:
+            self._finish(timer.args[0], FAILED, "Upload queue closed before the retry")
+        self._executor.shutdown(wait=wait)
+
+    # --- internals -----------------------------------------------------------
+
+    def _trim_statuses(self) -> None:
+        # Only forget finished uploads; in-flight ones must stay queryable.
+        excess = len(self._statuses) - self._max_statuses
+        for name in list(self._statuses):
+            if excess <= 0:
+                break
+            if self._statuses[name].state in (DONE, FAILED):
+                del self._statuses[name]
+                excess -= 1
+
+    def _run(self, status: UploadStatus, content: bytes | str, content_type: str, attempt: int) -> None:
+        with self._lock:
+            status.state = UPLOADING
+            status.attempts = attempt + 1
+        try:
+            download_url = self._storage.upload(status.filename, content, content_type=content_type)
+        except Exception as e:
+            if attempt >= self._max_retries:
+                self._finish(status, FAILED, str(e))
+                return
+            with self._lock:
+                status.state = PENDING
+                status.error = str(e)
+                if self._closed:
+                    timer = None
+                else:
+                    timer = threading.Timer(
+                        self._backoff_seconds * 2 ** attempt,
+                        self._retry,
+                        args=(status, content, content_type, attempt + 1),
+                    )
+                    timer.daemon = True
+                    self._retries.add(timer)
+            if timer is None:
+                self._finish(status, FAILED, str(e))
+            else:
+                timer.start()
+            return
+        with self._lock:
+            status.download_url = download_url
+        self._finish(status, DONE, None)
+
+    def _retry(self, status: UploadStatus, content: bytes | str, content_type: str, attempt: int) -> None:
+        with self._lock:
+            timers = {t for t in self._retries if t.args[0] is status}
+            if not timers:
+                return  # taken over by close()
+            self._retries -= timers
+        try:
+            self._executor.submit(self._run, status, content, content_type, attempt)
+        except RuntimeError:  # closed in the meantime
+            self._finish(status, FAILED, "Upload queue closed before the retry")
+
+    def _finish(self, status: UploadStatus, state: str, error: str | None) -> None:
+        with self._lock:
+            status.state = state
+            status.error = error
+            self._in_flight -= 1
@@ -1,46 +1,144 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
 from typing import Any
 
-from .schema import ALLOWED_EDGE_LABELS, ALLOWED_PROPS, LABELS_CANON, REQUIRED_PROPS
+from .schema import ALLOWED_EDGE_LABELS, ALLOWED_PROPS, LABELS_CANON, PROP_TYPES, REQUIRED_PROPS
+
+
+class LabelValidator:
+    """Property rules of one vertex label, compiled once from `schema`."""
+
+    __slots__ = ("label", "allowed", "required", "coercers", "_allowed_sorted")
+
+    def __init__(
+        self,
+        label: str,
+        allowed: Iterable[str],
+        required: Iterable[str],
+        types: dict[str, type] | None = None,
+    ) -> None:
+        self.label = label
+        self.allowed = frozenset(allowed)
+        self.required = frozenset(required)
+        self.coercers: tuple[tuple[str, Callable[[Any], Any]], ...] = tuple((types or {}).items())
+        self._allowed_sorted = sorted(self.allowed)
+
+    def errors(self, props: dict[str, Any], require_required: bool = True) -> tuple[dict[str, Any], list[str]]:
+        """Return (coerced copy of props, error messages); never raises."""
+        errors = []
+        if not self.allowed.issuperset(props):
+            unknown = sorted(k for k in props if k not in self.allowed)
+            errors.append(f"Unknown properties for label '{self.label}': {unknown}. Allowed: {self._allowed_sorted}")
+        if require_required and not self.required.issubset(props):
+            missing = sorted(k for k in self.required if k not in props)
+            errors.append(f"Missing required properties for '{self.label}': {missing}")
+
+        out = dict(props)
+        for key, coerce in self.coercers:
+            value = out.get(key)
+            if value is not None:
+                try:
+                    out[key] = coerce(value)
+                except (TypeError, ValueError):
+                    errors.append(f"Invalid value for '{key}' of '{self.label}': {value!r} (expected {coerce.__name__})")
+        return out, errors
+
+    def validate(self, props: dict[str, Any], require_required: bool = True) -> dict[str, Any]:
+        out, errors = self.errors(props, require_required)
+        if errors:
+            raise ValueError(errors[0])
+        return out
+
+
+class RowValidationError(ValueError):
+    """Raised by the batch validators; `errors` maps row index -> messages for every bad row."""
+
+    def __init__(self, label: str, errors: dict[int, list[str]]) -> None:
+        self.errors = errors
+        details = "; ".join(f"row {i}: {' '.join(msgs)}" for i, msgs in errors.items())
+        super().__init__(f"{len(errors)} invalid row(s) for '{label}': {details}")
+
+
+VALIDATORS: dict[str, LabelValidator] = {
+    label: LabelValidator(label, allowed, REQUIRED_PROPS[label], PROP_TYPES.get(label))
+    for label, allowed in ALLOWED_PROPS.items()
+}
+
+RELATIONSHIP_KEYS = ("relationship", "sourceCaption", "targetCaption")
+RELATIONSHIP_VALIDATOR = LabelValidator("relationship", RELATIONSHIP_KEYS, RELATIONSHIP_KEYS)
+
+_EDGE_LABELS_BY_LOWER: dict[str, str] = {e.lower(): e for e in ALLOWED_EDGE_LABELS}
+_LABELS_SORTED = sorted(set(LABELS_CANON.values()))
+_EDGE_LABELS_SORTED = sorted(ALLOWED_EDGE_LABELS)
 
 
 def normalize_label(label: str) -> str:
     key = label if label in LABELS_CANON else label.lower()
     if key not in LABELS_CANON:
-        raise ValueError(f"Unknown label '{label}'. Allowed: {sorted(set(LABELS_CANON.values()))}")
+        raise ValueError(f"Unknown label '{label}'. Allowed: {_LABELS_SORTED}")
     return LABELS_CANON[key]
 
 
+def _canonical_edge_label(edge_label: str) -> str | None:
+    if edge_label in ALLOWED_EDGE_LABELS:
+        return edge_label
+    # case-insensitive match
+    return _EDGE_LABELS_BY_LOWER.get(edge_label.lower())
+
+
+def _unknown_edge_label(edge_label: str) -> str:
+    return f"Unknown edge label '{edge_label}'. Allowed: {_EDGE_LABELS_SORTED}"
+
+
 def normalize_edge_label(edge_label: str) -> str:
-    if edge_label not in ALLOWED_EDGE_LABELS:
-        # try case-insensitive match
-        for e in ALLOWED_EDGE_LABELS:
-            if e.lower() == edge_label.lower():
-                return e
-        raise ValueError(f"Unknown edge label '{edge_label}'. Allowed: {sorted(ALLOWED_EDGE_LABELS)}")
-    return edge_label
+    canon = _canonical_edge_label(edge_label)
+    if canon is None:
+        raise ValueError(_unknown_edge_label(edge_label))
+    return canon
 
 
 def validate_and_fix_properties(label: str, props: dict[str, Any], require_required: bool = True) -> dict[str, Any]:
-    allowed = ALLOWED_PROPS[label]
-    required = REQUIRED_PROPS[label]
+    return VALIDATORS[label].validate(props, require_required)
 
-    unknown = set(props.keys()) - allowed
-    if unknown:
-        raise ValueError(f"Unknown properties for label '{label}': {sorted(unknown)}. Allowed: {sorted(allowed)}")
 
-    if require_required:
-        missing = required - set(props.keys())
-        if missing:
-            raise ValueError(f"Missing required properties for '{label}': {sorted(missing)}")
+def validate_rows(label: str, rows: Iterable[dict[str, Any]], require_required: bool = True) -> list[dict[str, Any]]:
+    """Validate and coerce many property dicts of one label.
+
+    Unlike calling `validate_and_fix_properties` per row, every row is checked
+    and a single `RowValidationError` lists the problems of all bad rows.
+    """
+    validator = VALIDATORS[label]
+    out = []
+    errors: dict[int, list[str]] = {}
+    for i, props in enumerate(rows):
+        fixed, row_errors = validator.errors(props, require_required)
+        if row_errors:
+            errors[i] = row_errors
+        out.append(fixed)
+    if errors:
+        raise RowValidationError(label, errors)
+    return out
 
-    out: dict[str, Any] = dict(props)
 
-    # Coerce ints where expected
-    if label == "verse":
-        for k in ("chapter", "importIndex", "verse"):
-            if k in out and out[k] is not None:
-                out[k] = int(out[k])
+def validate_relationships(rows: Iterable[dict[str, Any]]) -> list[tuple[str, str, str]]:
+    """Validate `create_relationships` rows and return (edge_label, sourceCaption, targetCaption).
 
+    Keys and edge labels of every row are checked; a single
+    `RowValidationError` lists the problems of all bad rows.
+    """
+    out = []
+    errors: dict[int, list[str]] = {}
+    for i, row in enumerate(rows):
+        _, row_errors = RELATIONSHIP_VALIDATOR.errors(row)
+        relationship = row.get("relationship")
+        edge_label = _canonical_edge_label(relationship) if isinstance(relationship, str) else None
+        if edge_label is None and relationship is not None:
+            row_errors.append(_unknown_edge_label(str(relationship)))
+        if row_errors:
+            errors[i] = row_errors
+            continue
+        out.append((edge_label, row["sourceCaption"], row["targetCaption"]))
+    if errors:
+        raise RowValidationError("relationship", errors)
     return out
@@ -0,0 +1,101 @@
+import anyio
+import pytest
+
+from theo_mcp_server.admission import HEAVY, READ, WRITE, AdmissionController, AdmissionRejected, lane_of
+
+
+def _controller(limit=1, queue_size=10):
+    return AdmissionController({READ: limit, WRITE: limit, HEAVY: limit}, queue_size)
+
+
+def test_sessions_take_turns_for_free_slots():
+    controller = _controller()
+    order = []
+
+    async def call(session, name, release):
+        async with controller.admit(READ, session):
+            order.append(name)
+            await release.wait()
+
+    async def main():
+        first = anyio.Event()
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(call, "a", "a1", first)
+            await anyio.sleep(0.01)
+            done = anyio.Event()
+            done.set()
+            for session, name in (("a", "a2"), ("a", "a3"), ("a", "a4"), ("b", "b1"), ("c", "c1")):
+                tg.start_soon(call, session, name, done)
+                await anyio.sleep(0.01)
+            assert controller.stats()[READ]["queued"] == 5
+            first.set()
+
+    anyio.run(main)
+    assert order == ["a1", "a2", "b1", "c1", "a3", "a4"]
+    stats = controller.stats()[READ]
+    assert stats["admitted"] == 6 and stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_rejects_and_lanes_are_independent():
+    controller = _controller(queue_size=1)
+
+    async def main():
+        hold = anyio.Event()
+
+        async def heavy():
+            async with controller.admit(HEAVY, "a"):
+                await hold.wait()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(heavy)
+            tg.start_soon(heavy)
+            await anyio.sleep(0.01)
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(HEAVY, "b"):
+                    pass
+            # Lookups are not held up by the busy heavy lane.
+            with anyio.fail_after(1):
+                async with controller.admit(READ, "b"):
+                    pass
+            hold.set()
+
+    anyio.run(main)
+    assert controller.stats()[HEAVY]["rejected"] == 1
+    assert controller.stats()[HEAVY]["admitted"] == 2
+
+
+def test_wait_in_queue_is_bounded():
+    controller = _controller()
+
+    async def main():
+        hold = anyio.Event()
+
+        async def holder():
+            async with controller.admit(WRITE, "a"):
+                await hold.wait()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(holder)
+            await anyio.sleep(0.01)
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(WRITE, "b", timeout=0.05):
+                    pass
+            hold.set()
+        # The slot is free again after the timed-out waiter left the queue.
+        with anyio.fail_after(1):
+            async with controller.admit(WRITE, "b"):
+                pass
+
+    anyio.run(main)
+    assert controller.stats()[WRITE]["timed_out"] == 1
+    assert controller.stats()[WRITE]["queued"] == 0
+
+
+def test_lanes_of_tools():
+    from theo_mcp_server.server import create_mcp
+
+    create_mcp()  # registers the journaled tools
+    assert lane_of("get_notion_by_caption") == READ
+    assert lane_of("create_notion") == WRITE
+    assert lane_of("get_notions_tree") == HEAVY
+    assert lane_of("create_diagram_by_captions") == HEAVY
@@ -0,0 +1,92 @@
+import pytest
+
+from theo_mcp_server.change_feed import CREATE, DELETE, ChangeEvent, ChangeFeed
+
+
+def _collect(feed):
+    received = []
+    feed.subscribe(received.append)
+    return received
+
+
+def test_events_reach_other_processes_on_poll(tmp_path):
+    path = str(tmp_path / "changes.jsonl")
+    writer, reader = ChangeFeed(path), ChangeFeed(path)
+    try:
+        local, remote = _collect(writer), _collect(reader)
+        event = ChangeEvent(CREATE, edge=("contains", 1, 2), labels=("notionGroup", "notion"))
+        writer.publish([event])
+
+        assert local == [[event]]  # delivered in-process right away
+        assert remote == []
+        reader.poll()
+        assert remote == [[event]]
+
+        # Nothing new: no callback; own events are not delivered twice.
+        reader.poll()
+        writer.poll()
+        assert remote == [[event]]
+        assert local == [[event]]
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_rotation_tells_readers_to_drop_everything(tmp_path):
+    path = str(tmp_path / "changes.jsonl")
+    writer, reader = ChangeFeed(path, max_bytes=500), ChangeFeed(path)
+    try:
+        remote = _collect(reader)
+        for i in range(5):
+            writer.publish([ChangeEvent(DELETE, vertex_id=i, label="notion", caption=f"N{i}", labels=("notion",))])
+        reader.poll()
+        assert remote[0] is None
+
+        # The reader follows the new segment from its start.
+        event = ChangeEvent(CREATE, vertex_id=9, label="notion", caption="N9", labels=("notion",))
+        writer.publish([event])
+        reader.poll()
+        assert remote[-1] == [event]
+        # Rotation starts new segments instead of replacing the file others hold open.
+        assert len(list(tmp_path.iterdir())) == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_local_subscribers_hear_about_writes_even_when_rotation_fails(tmp_path, monkeypatch):
+    path = str(tmp_path / "changes.jsonl")
+    feed = ChangeFeed(path, max_bytes=10)
+    open_writer = feed._open_writer
+
+    def refuse_new_segments(generation):
+        if generation > 0:
+            raise PermissionError("segment is locked")
+        return open_writer(generation)
+
+    monkeypatch.setattr(feed, "_open_writer", refuse_new_segments)
+    try:
+        local = _collect(feed)
+        events = [[ChangeEvent(DELETE, vertex_id=i, labels=("notion",))] for i in range(3)]
+        for batch in events:
+            feed.publish(batch)
+        assert local == events
+    finally:
+        feed.close()
+
+
+def test_local_subscribers_hear_about_writes_even_when_the_write_fails(tmp_path, monkeypatch):
+    feed = ChangeFeed(str(tmp_path / "changes.jsonl"))
+    try:
+        local = _collect(feed)
+
+        def disk_full():
+            raise OSError("disk full")
+
+        monkeypatch.setattr(feed, "_follow_writer", disk_full)
+        event = ChangeEvent(DELETE, vertex_id=1, labels=("notion",))
+        with pytest.raises(OSError):
+            feed.publish([event])
+        assert local == [[event]]
+    finally:
+        feed.close()
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+
+from theo_mcp_server.mutation_log import is_mutating_tool
+from theo_mcp_server.tools import crud
+from theo_mcp_server.tools.crud import LABEL_TOOLS, register_crud_tools
+
+
+def _server():
+    mcp = FastMCP("test", json_response=True)
+    register_crud_tools(mcp)
+    return mcp
+
+
+def test_every_label_gets_its_tools_from_the_table():
+    tools = {t.name: t for t in anyio.run(_server().list_tools)}
+
+    assert set(tools) == {
+        "get_notion_by_caption", "delete_notion_by_caption", "create_notion",
+        "get_book_by_caption", "delete_book_by_caption", "create_book",
+        "get_verse_by_caption",
+        "get_quotation_by_caption", "delete_quotation_by_caption", "create_quotation",
+        "get_notion_group_by_caption", "delete_notion_group_by_caption", "create_notion_group",
+        "get_verse_group_by_caption", "delete_verse_group_by_caption", "create_verse_group",
+        "get_entities_by_captions",
+    }
+    quotation = tools["create_quotation"].inputSchema
+    assert list(quotation["properties"]) == ["caption", "text", "book", "position", "relationships", "request_id"]
+    assert quotation["required"] == ["caption", "text", "book", "position"]
+    assert list(tools["create_book"].inputSchema["properties"]) == ["caption", "request_id"]
+    assert is_mutating_tool("create_verse_group") and is_mutating_tool("delete_book_by_caption")
+    assert not is_mutating_tool("get_verse_by_caption")
+    assert "person" not in LABEL_TOOLS
+
+
+def test_create_tools_share_one_code_path(monkeypatch):
+    created = []
+
+    def create_vertex(g, label, properties, edges_out, edges_in):
+        created.append((label, properties, edges_out, edges_in))
+        return {"created": {"label": label, **properties}}
+
+    monkeypatch.setattr(crud, "get_g", lambda ctx: "g")
+    monkeypatch.setattr(crud, "create_vertex_and_connect_by_captions", create_vertex)
+    mcp = _server()
+
+    async def main():
+        await mcp.call_tool("create_notion", {"caption": "Grace", "relationships": {"supports": ["A"], "refersTo": ["B"]}})
+        result = await mcp.call_tool(
+            "create_quotation",
+            {"caption": "Q1", "text": "...", "book": "Confessions", "position": "I.1", "relationships": {"isContainedIn": ["Augustine"]}},
+        )
+        await mcp.call_tool("create_book", {"caption": "Confessions"})
+        return result
+
+    result = anyio.run(main)
+    notion, quotation, book = created
+    assert notion == ("notion", {"caption": "Grace"}, {"refersTo": ["B"]}, {"isSupportedBy": ["A"]})
+    label, properties, edges_out, edges_in = quotation
+    assert (label, edges_out, edges_in) == ("quotation", {}, {"contains": ["Augustine"]})
+    assert properties["status"] == "new" and properties["importIndex"] < 0 and properties["position"] == "I.1"
+    assert result[1]["created"]["caption"] == "Q1"
+    assert book == ("book", {"caption": "Confessions"}, {}, {})
+
+
+def test_batch_get_reads_every_label_in_one_traversal(monkeypatch):
+    calls = []
+
+    def read_vertices(g, captions, labels, fields):
+        calls.append((captions, labels, fields))
+        return [{"internal_id": 1, "label": "verse", "caption": "Eph 2:8", "relationships": {}}]
+
+    monkeypatch.setattr(crud, "read_vertices_with_edges_by_captions", read_vertices)
+    monkeypatch.setattr("theo_mcp_server.gremlin_client.get_g", lambda ctx: "g")
+    ctx = SimpleNamespace(request_context=SimpleNamespace(lifespan_context=None))
+
+    assert crud.read_by_captions(ctx, ["Eph 2:8", "Grace"], ["Verse", "notiongroup"], ["caption"])[0]["caption"] == "Eph 2:8"
+    assert calls == [(["Eph 2:8", "Grace"], ["verse", "notionGroup"], ["caption"])]
+
+
+def test_caption_lookup_goes_through_the_index_checks(monkeypatch):
+    calls = []
+
+    class Traversal:
+        def hasLabel(self, label):
+            calls.append(("hasLabel", label))
+            return self
+
+        def id_(self):
+            return self
+
+        def toList(self):
+            return [7]
+
+    def has_filters(t, filters, description=""):
+        calls.append((filters, description))
+        return Traversal()
+
+    monkeypatch.setattr(crud, "has_filters", has_filters)
+    g = SimpleNamespace(V=lambda: None)
+    assert crud.id_by_caption(g, "book", "Confessions") == 7
+    assert calls == [([("caption", "Confessions")], "vertex by caption"), ("hasLabel", "book")]
@@ -0,0 +1,60 @@
+import json
+import shutil
+from collections import OrderedDict
+
+import pytest
+
+from theo_mcp_server import diagram_helpers
+from theo_mcp_server.diagram_helpers import DiagramSession, get_or_create_session, render_svg
+
+needs_graphviz = pytest.mark.skipif(shutil.which("dot") is None, reason="Graphviz 'dot' is not installed")
+
+_VERTICES = [
+    {"internal_id": 1, "label": "notion", "caption": "A"},
+    {"internal_id": 2, "label": "notion", "caption": "B"},
+]
+_EDGES = [{"label": "isSupportedBy", "from_id": 2, "to_id": 1}]
+
+
+def test_parse_json_positions_skips_clusters():
+    layout = {
+        "objects": [
+            {"name": "cluster_x", "nodes": [1], "bb": "0,0,10,10"},
+            {"name": "1", "pos": "27,18"},
+            {"name": "2", "pos": "99.5,18.25"},
+        ]
+    }
+    positions = diagram_helpers._parse_json_positions(json.dumps(layout))
+    assert positions == {"1": (27.0, 18.0), "2": (99.5, 18.25)}
+
+
+def test_session_is_reset_when_layout_changes():
+    sessions: OrderedDict[str, DiagramSession] = OrderedDict()
+    session = get_or_create_session(sessions, "s1", "dot", "TB")
+    session.positions["1"] = (1.0, 2.0)
+
+    assert get_or_create_session(sessions, "s1", "dot", "TB").positions == {"1": (1.0, 2.0)}
+    assert get_or_create_session(sessions, "s1", "dot", "LR").positions == {}
+
+
+def test_sessions_are_bounded():
+    sessions: OrderedDict[str, DiagramSession] = OrderedDict()
+    for i in range(diagram_helpers.MAX_DIAGRAM_SESSIONS + 5):
+        get_or_create_session(sessions, f"s{i}", "dot", "TB")
+    assert len(sessions) == diagram_helpers.MAX_DIAGRAM_SESSIONS
+    assert "s0" not in sessions
+
+
+@needs_graphviz
+def test_incremental_render_keeps_previous_positions():
+    session = DiagramSession(session_id="s", layout="dot", direction="TB")
+    render_svg(_VERTICES, _EDGES, "dot", "TB", True, session=session)
+    before = dict(session.positions)
+    assert set(before) == {"1", "2"}
+
+    vertices = _VERTICES + [{"internal_id": 3, "label": "notion", "caption": "C"}]
+    svg = render_svg(vertices, _EDGES, "dot", "TB", True, session=session)
+    assert svg.lstrip().startswith("<?xml") or "<svg" in svg
+    for node_id, (x, y) in before.items():
+        assert session.positions[node_id] == pytest.approx((x, y), abs=1.0)
+    assert "3" in session.positions
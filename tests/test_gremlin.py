@@ -6,7 +6,7 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 from theo_mcp_server.gremlin_client import get_g_for_tests
-from theo_mcp_server.gremlin_helpers import build_notion_groups_tree, change_caption, create_vertex_and_connect_by_captions, delete_vertex_by_id, get_subgraph_by_captions, get_vertices_by_captions, read_vertex_with_edges, search_vertices, is_vertex_existing_by_caption
+from theo_mcp_server.gremlin_helpers import build_notion_groups_tree, change_caption, claim_next_quotations, create_edge, create_edges, create_vertex_and_connect_by_captions, delete_vertex_by_id, get_subgraph_by_captions, get_unique_vertices_by_captions, get_vertices_by_captions, read_vertex_with_edges, search_vertices, is_vertex_existing_by_caption
 
 server_params = StdioServerParameters(command="theo-mcp")
 
@@ -46,18 +46,39 @@ async def test_create_vertex_and_connect_by_captions(g):
     result = delete_vertex_by_id(g, test_id)
     assert result["deleted"] is True
 
+@pytest.mark.anyio
+async def test_create_edges_creates_none_when_an_endpoint_vanished(g):
+    prefix = "test_create_edges_creates_none_when_an_endpoint_vanished"
+    timestamp = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+    captions = [f"{prefix}_{i}_{timestamp}" for i in range(3)]
+    for caption in captions:
+        create_vertex_and_connect_by_captions(g, "notion", {"caption": caption}, None, None)
+    vertices = get_unique_vertices_by_captions(g, captions)
+    a, b, c = (vertices[caption] for caption in captions)
+
+    assert delete_vertex_by_id(g, c["internal_id"])["deleted"] is True
+    with pytest.raises(ValueError, match="No edges were created"):
+        create_edges(g, [("isSupportedBy", a, b), ("isSupportedBy", a, c)])
+    assert "isSupportedBy" not in read_vertex_with_edges(g, a["internal_id"])["relationships"]
+
+    assert delete_vertex_by_id(g, a["internal_id"])["deleted"] is True
+    assert delete_vertex_by_id(g, b["internal_id"])["deleted"] is True
+
 @pytest.mark.anyio
 async def test_search_vertices(g):
     results = search_vertices(g, ["notion"], "Иоан", limit=10)
-    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(json.dumps(results.to_dicts(), indent=2, ensure_ascii=False))
     assert len(results) > 0
 
 @pytest.mark.anyio
 async def test_get_vertices_by_captions(g):
     results = get_vertices_by_captions(g, ["Jn 1:1", "Jn 1:2", "Jn 1:3"])
-    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(json.dumps(results.to_dicts(), indent=2, ensure_ascii=False))
     assert len(results) == 3
 
+    lean = get_vertices_by_captions(g, ["Jn 1:1"], fields=["caption"])
+    assert lean.to_dicts() == [{"internal_id": lean[0]["internal_id"], "label": "verse", "caption": "Jn 1:1"}]
+
 @pytest.mark.anyio
 async def test_build_notion_groups_tree(g):
     results = build_notion_groups_tree(g, includeNotions=False)
@@ -101,6 +122,13 @@ async def test_get_subgraph_by_captions(g):
 
         missing_result = get_subgraph_by_captions(g, [a_caption, "definitely_does_not_exist_xyz"])
         assert "definitely_does_not_exist_xyz" in missing_result["missing"]
+
+        # Parallel edges of the same type are kept apart (keyed by edge id).
+        create_edge(g, "isSupportedBy", b_id, a_id)
+        parallel = get_subgraph_by_captions(g, [a_caption, b_caption], properties=["caption"])
+        supported = [e for e in parallel["edges"] if (e["label"], e["from_id"], e["to_id"]) == ("isSupportedBy", b_id, a_id)]
+        assert len(supported) == 2
+        assert len({e["id"] for e in supported}) == 2
     finally:
         delete_vertex_by_id(g, c_id)
         delete_vertex_by_id(g, b_id)
@@ -154,4 +182,52 @@ async def test_change_caption(g):
     assert change_result["new_caption"] == new_caption
 
     delete_result = delete_vertex_by_id(g, vertex_id)
-    assert delete_result["deleted"] is True
\ No newline at end of file
+    assert delete_result["deleted"] is True
+
+@pytest.mark.anyio
+async def test_get_unique_vertices_by_captions(g):
+    prefix = "test_get_unique_vertices_by_captions"
+    timestamp = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+    a_caption = f"{prefix}_A_{timestamp}"
+    b_caption = f"{prefix}_B_{timestamp}"
+
+    a = create_vertex_and_connect_by_captions(g, "notion", {"caption": a_caption}, None, None)
+    b = create_vertex_and_connect_by_captions(g, "notion", {"caption": b_caption}, None, None)
+    a_id = a["created"]["internal_id"]
+    b_id = b["created"]["internal_id"]
+
+    try:
+        resolved = get_unique_vertices_by_captions(g, [a_caption, b_caption, a_caption])
+        assert resolved[a_caption]["internal_id"] == a_id
+        assert resolved[b_caption]["internal_id"] == b_id
+        assert resolved[b_caption]["label"] == "notion"
+
+        with pytest.raises(ValueError, match="not found"):
+            get_unique_vertices_by_captions(g, [a_caption, f"{prefix}_MISSING_{timestamp}"])
+    finally:
+        delete_vertex_by_id(g, b_id)
+        delete_vertex_by_id(g, a_id)
+
+
+@pytest.mark.anyio
+async def test_claim_next_quotations(g):
+    timestamp = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+    ids = []
+    for i in range(3):
+        props = {
+            "caption": f"test_claim_next_quotations_{i}_{timestamp}",
+            "text": "text", "book": "book", "position": str(i),
+            "status": "new", "importIndex": 10**12 + i,
+        }
+        ids.append(create_vertex_and_connect_by_captions(g, "quotation", props, None, None)["created"]["internal_id"])
+
+    try:
+        first = claim_next_quotations(g, "new", 2, fields=["caption", "status"])
+        assert [q["internal_id"] for q in first["quotations"]] == [ids[2], ids[1]]
+        assert all(q["status"] == "suspended" for q in first["quotations"])
+
+        second = claim_next_quotations(g, "new", 1)
+        assert [q["internal_id"] for q in second["quotations"]] == [ids[0]]
+    finally:
+        for vertex_id in ids:
+            delete_vertex_by_id(g, vertex_id)
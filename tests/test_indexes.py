@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+from gremlin_python.process.traversal import P, TextP
+from gremlin_python.structure.graph import Graph
+
+from theo_mcp_server import indexes
+from theo_mcp_server.indexes import GraphIndex, index_report, has_filters
+
+_BY_CAPTION = GraphIndex("byCaption", ("caption",), composite=True, status=("ENABLED",))
+_BY_TYPE_STATUS = GraphIndex("byTypeStatus", ("type", "status"), composite=True, status=("ENABLED",))
+
+
+@pytest.fixture(autouse=True)
+def reset_indexes():
+    yield
+    indexes.set_graph_indexes(None)
+
+
+def _has_keys(t):
+    return [step[1] for step in t.bytecode.step_instructions if step[0] == "has"]
+
+
+def test_composite_index_needs_all_keys():
+    assert _BY_TYPE_STATUS.covers({"type", "status"})
+    assert not _BY_TYPE_STATUS.covers({"type"})
+    assert not GraphIndex("x", ("caption",), composite=True, status=("INSTALLED",)).covers({"caption"})
+    assert GraphIndex("search", ("caption", "type"), composite=False).covers({"type"})
+
+
+def test_index_report_lists_missing_shapes():
+    report = index_report([_BY_CAPTION, _BY_TYPE_STATUS])
+    assert report["query_shapes"]["quotations by status"]["covered_by"] == ["byTypeStatus"]
+    assert report["missing"] == ["vertices by type", "verses by import order"]
+
+
+def test_has_filters_keeps_the_given_order():
+    indexes.set_graph_indexes([_BY_CAPTION])
+    g = Graph().traversal()
+    t = has_filters(g.V(), [("type", "notion"), ("caption", "A")])
+    assert _has_keys(t) == ["type", "caption"]
+
+
+def test_has_filters_is_quiet_when_indexes_unknown(caplog):
+    g = Graph().traversal()
+    with caplog.at_level(logging.WARNING, logger="theo_mcp_server.indexes"):
+        has_filters(g.V(), [("type", "notion"), ("caption", "A")])
+    assert not caplog.records
+
+
+def test_has_filters_logs_full_scan(caplog):
+    indexes.set_graph_indexes([_BY_CAPTION])
+    g = Graph().traversal()
+    with caplog.at_level(logging.WARNING, logger="theo_mcp_server.indexes"):
+        # A substring predicate cannot use the composite caption index.
+        has_filters(g.V(), [("caption", TextP.containing("A")), ("type", P.within(["notion"]))], "search")
+    assert "Full-scan traversal (search)" in caplog.text
@@ -0,0 +1,38 @@
+import json
+
+import anyio
+
+from theo_mcp_server.schema import BOOK_ABBREVIATIONS
+from theo_mcp_server.server import create_mcp
+from theo_mcp_server.tools.reference import BOOKS_URI, CAPTIONS_URI, RELATIONSHIPS_URI
+
+# Bytes of the tools/list result. It was 33 kB while every verse tool carried the book list.
+MANIFEST_BUDGET = 28_000
+
+
+def _manifest():
+    mcp = create_mcp()
+
+    async def main():
+        tools = await mcp.list_tools()
+        books = list(await mcp.read_resource(BOOKS_URI))[0].content
+        resources = {str(r.uri) for r in await mcp.list_resources()}
+        return tools, json.loads(books), resources
+
+    return anyio.run(main)
+
+
+def test_manifest_stays_small_and_reference_data_is_published_once():
+    tools, books, resources = _manifest()
+    manifest = json.dumps([t.model_dump(by_alias=True, exclude_none=True, mode="json") for t in tools])
+
+    assert len(manifest) < MANIFEST_BUDGET, f"tools/list is {len(manifest)} bytes"
+    assert resources == {BOOKS_URI, CAPTIONS_URI, RELATIONSHIPS_URI}
+    assert books == BOOK_ABBREVIATIONS
+    assert not [book for book in BOOK_ABBREVIATIONS.values() if f"(for {book})" in manifest or f'"{book}"' in manifest]
+
+    by_name = {t.name: t for t in tools}
+    for name in ("get_verse_by_caption", "get_verse_group_by_caption", "get_verses_by_captions"):
+        assert BOOKS_URI in by_name[name].description or CAPTIONS_URI in by_name[name].description
+    assert by_name["create_quotation"].description.count("isContainedIn") == 1
+    assert by_name["get_notion_group_by_caption"].inputSchema["required"] == ["caption"]
@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+from theo_mcp_server.gremlin_client import AppContext
+from theo_mcp_server.mutation_log import BEGIN, COMMIT, FAIL, NEEDS_REVIEW, MutationLog, journaled, replay_pending
+
+
+@pytest.fixture
+def ctx(tmp_path, monkeypatch):
+    monkeypatch.setenv("MUTATION_LOG_PATH", str(tmp_path / "mutations.jsonl"))
+    app_ctx = AppContext()
+    yield SimpleNamespace(request_context=SimpleNamespace(lifespan_context=app_ctx))
+    if app_ctx.mutation_log is not None:
+        app_ctx.mutation_log.close()
+
+
+def test_log_records_survive_reopen(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = MutationLog(path, fsync_interval=0)
+    log.begin("r1", "create_book", {"caption": "B"})
+    log.commit("r1", "create_book", {"caption": "B"}, {"created": 1})
+    log.begin("r2", "create_book", {"caption": "C"})
+    log.close()
+
+    reopened = MutationLog(path, fsync_interval=0.01)
+    try:
+        assert reopened.lookup("r1")["type"] == COMMIT
+        assert [r["request_id"] for r in reopened.pending()] == ["r2"]
+        records = list(reopened.iter_since(0))
+        assert [r["type"] for _, r in records] == [BEGIN, COMMIT, BEGIN]
+        # Offsets are checkpoints: resuming after the second record yields only the third.
+        assert [r["request_id"] for _, r in reopened.iter_since(records[1][0])] == ["r2"]
+    finally:
+        reopened.close()
+
+
+def test_journaled_dedupes_retried_request(ctx):
+    calls = []
+
+    @journaled
+    def create_thing(ctx, caption: str, request_id: str | None = None):
+        calls.append(caption)
+        return {"created": caption, "n": len(calls)}
+
+    first = create_thing(ctx=ctx, caption="A", request_id="req-1")
+    retry = create_thing(ctx=ctx, caption="A", request_id="req-1")
+    other = create_thing(ctx=ctx, caption="A")
+    assert first == retry == {"created": "A", "n": 1}
+    assert other["n"] == 2
+    assert calls == ["A", "A"]
+
+
+def test_failed_call_is_recorded_and_replay_is_idempotent(ctx):
+    attempts = []
+
+    @journaled(idempotent=True)
+    def flaky_tool(ctx, caption: str, request_id: str | None = None):
+        attempts.append(caption)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return {"ok": caption}
+
+    with pytest.raises(RuntimeError):
+        flaky_tool(ctx=ctx, caption="A", request_id="req-1")
+    log = ctx.request_context.lifespan_context.mutation_log
+    assert log.lookup("req-1")["type"] == FAIL
+    assert log.lookup("req-1")["error"] == "boom"
+
+    # A call whose outcome was never recorded is re-run once under its request id.
+    log.begin("req-2", "flaky_tool", {"caption": "B"})
+    assert replay_pending(log, ctx, min_age_seconds=0) == [{"request_id": "req-2", "tool": "flaky_tool", "state": COMMIT}]
+    assert replay_pending(log, ctx, min_age_seconds=0) == []
+    assert attempts == ["A", "B"]
+
+
+def test_replay_leaves_calls_that_are_unsafe_to_repeat_for_review(ctx):
+    calls = []
+
+    @journaled
+    def create_edge(ctx, caption: str, request_id: str | None = None):
+        calls.append(caption)
+        return {"created": caption}
+
+    create_edge(ctx=ctx, caption="A")
+    log = ctx.request_context.lifespan_context.mutation_log
+    log.begin("req-3", "create_edge", {"caption": "B"})
+    expected = [{"request_id": "req-3", "tool": "create_edge", "state": NEEDS_REVIEW, "args": {"caption": "B"}}]
+    assert replay_pending(log, ctx, min_age_seconds=0) == expected
+    assert replay_pending(log, ctx, min_age_seconds=0) == expected  # still pending
+    assert calls == ["A"]
+
+
+def test_journaled_refuses_a_retry_while_the_call_is_in_flight(ctx):
+    calls = []
+
+    @journaled
+    def create_thing(ctx, caption: str, request_id: str | None = None):
+        calls.append(caption)
+        if len(calls) == 1:
+            # The client gave up on this call and retries while it is still running.
+            with pytest.raises(ValueError, match="still in progress"):
+                create_thing(ctx=ctx, caption=caption, request_id=request_id)
+        return {"created": caption}
+
+    assert create_thing(ctx=ctx, caption="A", request_id="req-1") == {"created": "A"}
+    assert calls == ["A"]
+
+
+def test_journaled_rejects_a_request_id_reused_with_other_arguments(ctx):
+    @journaled
+    def create_thing(ctx, caption: str, request_id: str | None = None):
+        return {"created": caption}
+
+    create_thing(ctx=ctx, caption="A", request_id="req-1")
+    with pytest.raises(ValueError, match="already used"):
+        create_thing(ctx=ctx, caption="B", request_id="req-1")
+
+
+def test_pending_calls_are_never_evicted(tmp_path):
+    log = MutationLog(str(tmp_path / "log.jsonl"), fsync_interval=0, max_remembered=2)
+    try:
+        log.begin("old", "create_book", {"caption": "B"})
+        for i in range(5):
+            log.begin(f"r{i}", "create_book", {"caption": f"C{i}"})
+            log.commit(f"r{i}", "create_book", {"caption": f"C{i}"}, {"created": i})
+        assert [r["request_id"] for r in log.pending()] == ["old"]
+    finally:
+        log.close()
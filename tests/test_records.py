@@ -0,0 +1,69 @@
+from gremlin_python.process.traversal import T
+
+from theo_mcp_server.gremlin_helpers import contains_tree, flatten_value_map
+from theo_mcp_server.records import EdgeBatch, VertexBatch, to_plain
+
+
+def test_vertex_batch_matches_flatten_value_map():
+    rows = [
+        {T.id: 1, T.label: "quotation", "caption": "Q1", "status": "new", "importIndex": 5},
+        {T.id: 2, T.label: "notion", "caption": "N1", "description": ["d"]},
+    ]
+    expected = [flatten_value_map(dict(r)) for r in rows]
+
+    batch = VertexBatch.for_labels(["quotation"])
+    for raw in rows:
+        batch.append_element_map(raw)
+
+    assert len(batch) == 2
+    assert batch.to_dicts() == expected
+    assert list(batch) == expected
+    # Keys missing from a row are left out rather than filled with None.
+    assert "description" not in batch.row(0)
+    assert "status" not in batch.row(1)
+    assert batch[-1] == expected[1]
+    assert batch.values("status") == ["new", None]
+
+
+def test_edge_batch_deduplicates_by_id():
+    edges = EdgeBatch()
+    edges.add("e1", "refersTo", 1, 2)
+    edges.add("e2", "refersTo", 1, 2)
+    edges.add("e1", "refersTo", 1, 2)
+    assert edges.to_dicts() == [
+        {"id": "e1", "label": "refersTo", "from_id": 1, "to_id": 2},
+        {"id": "e2", "label": "refersTo", "from_id": 1, "to_id": 2},
+    ]
+
+
+def test_to_plain_converts_batches_at_the_top_level_and_in_dicts():
+    vertices = VertexBatch(["caption"])
+    vertices.append(1, "notion", {"caption": ["N1"]})
+    edges = EdgeBatch()
+    edges.add("e1", "refersTo", 1, 1)
+
+    assert to_plain(vertices) == [{"internal_id": 1, "label": "notion", "caption": "N1"}]
+    assert to_plain({"vertices": vertices, "edges": edges, "missing": []}) == {
+        "vertices": [{"internal_id": 1, "label": "notion", "caption": "N1"}],
+        "edges": [{"id": "e1", "label": "refersTo", "from_id": 1, "to_id": 1}],
+        "missing": [],
+    }
+    plain = {"a": 1}
+    assert to_plain(plain) is plain
+
+
+def test_contains_tree_nests_captions_along_contains_edges():
+    vertices = VertexBatch(["caption"])
+    for id, caption in [(1, "Root"), (2, "Child"), (3, "Grandchild"), (4, "Other root"), (5, "Loop")]:
+        vertices.append(id, "notionGroup", {"caption": [caption]})
+    edges = EdgeBatch()
+    edges.add("e1", "contains", 1, 2)
+    edges.add("e2", "contains", 2, 3)
+    edges.add("e3", "contains", 4, 3)
+    edges.add("e4", "contains", 3, 2)  # cycle below Root
+    edges.add("e5", "contains", 99, 5)  # contained by a vertex outside the tree: not a root
+
+    assert contains_tree(vertices, edges) == {
+        "Root": {"Child": {"Grandchild": {}}},
+        "Other root": {"Grandchild": {"Child": {}}},
+    }
@@ -0,0 +1,77 @@
+import json
+from typing import Any
+
+import anyio
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from theo_mcp_server import responses
+from theo_mcp_server.records import VertexBatch
+from theo_mcp_server.responses import encode_json, encoded
+from theo_mcp_server.serializers import RelationIdentifier
+from theo_mcp_server.timeouts import bounded
+
+TREE = {"Theology": {"Grace": {"Grace alone": {}, "Благодать": {}}}, "Ethics": {}}
+VERSES = [{"internal_id": 4, "label": "verse", "caption": "Eph 2:8", "chapter": 2}]
+
+
+def _server() -> FastMCP:
+    mcp = FastMCP("test", json_response=True)
+
+    @mcp.tool()
+    @bounded
+    @encoded
+    def get_notions_tree() -> dict[str, Any]:
+        """Tree."""
+        return TREE
+
+    @mcp.tool()
+    @bounded
+    @encoded
+    def get_verses_by_captions(captions: list[str]) -> list[dict[str, Any]]:
+        """Verses."""
+        # Helpers return batches; `encoded` turns them into dicts.
+        batch = VertexBatch(["caption", "chapter"])
+        for v in VERSES:
+            if v["caption"] in captions:
+                batch.append(v["internal_id"], v["label"], {"caption": [v["caption"]], "chapter": [v["chapter"]]})
+        return batch
+
+    return mcp
+
+
+def _call_both(mcp):
+    async def main():
+        async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+            tools = {t.name: t for t in (await client.list_tools()).tools}
+            tree = await client.call_tool("get_notions_tree", {})
+            verses = await client.call_tool("get_verses_by_captions", {"captions": ["Eph 2:8"]})
+            return tools, tree, verses
+
+    return anyio.run(main)
+
+
+def test_encoded_results_match_fastmcp_structured_content(monkeypatch):
+    tools, tree, verses = _call_both(_server())
+
+    assert tools["get_notions_tree"].outputSchema["type"] == "object"
+    assert tree.structuredContent == TREE
+    assert [c.text for c in tree.content] == [json.dumps(TREE, ensure_ascii=False, separators=(",", ":"))]
+    assert verses.structuredContent == {"result": VERSES}
+    assert len(verses.content) == 1 and json.loads(verses.content[0].text) == VERSES
+
+    monkeypatch.setenv("FAST_RESPONSES", "false")
+    _, tree, verses = _call_both(_server())
+    assert tree.structuredContent == TREE
+    assert json.loads(tree.content[0].text) == TREE  # FastMCP's own, indented text
+    assert verses.structuredContent == {"result": VERSES}
+
+
+def test_both_encoders_write_the_same_json(monkeypatch):
+    value = {"id": RelationIdentifier(4104, 1797, 12345, 8200), "by_chapter": {2: ["Eph 2:8"]}, "Благодать": 1.5}
+    fast = encode_json(value)
+    monkeypatch.setattr(responses, "_orjson", lambda: None)
+    assert encode_json(value) == fast == (
+        '{"id":{"out_vertex_id":4104,"type_id":1797,"relation_id":12345,"in_vertex_id":8200},'
+        '"by_chapter":{"2":["Eph 2:8"]},"Благодать":1.5}'
+    )
@@ -0,0 +1,140 @@
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import P, Traverser
+
+from theo_mcp_server.change_feed import UPDATE, ChangeEvent, ChangeFeed
+from theo_mcp_server.result_cache import (
+    ANY_LABEL,
+    CachingRemoteConnection,
+    ResultCache,
+    bytecode_key,
+    is_cacheable,
+    start_labels,
+)
+
+
+class FakeConnection:
+    """Counts submitted traversals and answers each with one fresh dict."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, bytecode):
+        self.submitted += 1
+        return RemoteTraversal(iter([Traverser({"caption": "Grace", "n": self.submitted}, 2)]))
+
+    def close(self):
+        pass
+
+
+def _g(tmp_path, max_bytes=1 << 20):
+    feed = ChangeFeed(str(tmp_path / "changes.jsonl"))
+    fake = FakeConnection()
+    conn = CachingRemoteConnection(fake, ResultCache(max_bytes, ttl=60, feed=feed))
+    return traversal().with_remote(conn), fake, conn.cache, feed
+
+
+def test_repeated_reads_are_served_from_the_cache(tmp_path):
+    g, fake, cache, feed = _g(tmp_path)
+    try:
+        first = g.V().has("type", "notion").has("caption", "Grace").valueMap().toList()
+        first[0]["caption"] = "changed by the caller"
+        second = g.V().has("type", "notion").has("caption", "Grace").valueMap().toList()
+
+        assert fake.submitted == 1
+        # Bulked traversers are unrolled and each hit gets its own copies.
+        assert second == [{"caption": "Grace", "n": 1}] * 2
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+    finally:
+        feed.close()
+
+
+def test_mutations_and_probes_bypass_the_cache(tmp_path):
+    g, fake, cache, feed = _g(tmp_path)
+    try:
+        g.addV("notion").property("caption", "Grace").toList()
+        g.addV("notion").property("caption", "Grace").toList()
+        g.V().has("caption", "Grace").sideEffect(__.drop()).toList()
+        g.V().has("caption", "Grace").sideEffect(__.drop()).toList()
+        g.inject(0).toList()
+        g.inject(0).toList()
+
+        assert fake.submitted == 6
+        assert cache.stats()["bypassed"] == 6
+        assert cache.stats()["entries"] == 0
+    finally:
+        feed.close()
+
+
+def test_changes_evict_entries_by_start_label(tmp_path):
+    g, fake, cache, feed = _g(tmp_path)
+    other = ChangeFeed(feed.path)
+    try:
+        g.V().has("type", "book").toList()
+        g.V().has("type", "notion").toList()
+        g.V(42).toList()  # labels unknown
+        assert cache.stats()["entries"] == 3
+
+        other.publish([ChangeEvent(UPDATE, vertex_id=1, label="notion", labels=("notion", "notionGroup"))])
+        g.V().has("type", "book").toList()
+        assert fake.submitted == 3
+        g.V().has("type", "notion").toList()
+        g.V(42).toList()
+        assert fake.submitted == 5
+    finally:
+        other.close()
+        feed.close()
+
+
+def test_read_overlapping_a_change_is_not_stored(tmp_path):
+    g, fake, cache, feed = _g(tmp_path)
+    submit = fake.submit
+
+    def submit_during_change(bytecode):
+        # A mutation in this process changes a notion while the read is on its way back.
+        result = submit(bytecode)
+        feed.publish([ChangeEvent(UPDATE, vertex_id=1, label="notion", labels=("notion",))])
+        return result
+
+    fake.submit = submit_during_change
+    try:
+        g.V().has("type", "notion").toList()
+        fake.submit = submit
+        g.V().has("type", "book").toList()
+        g.V().has("type", "notion").toList()
+        g.V().has("type", "notion").toList()
+        g.V().has("type", "book").toList()
+        assert fake.submitted == 3  # the notion read overlapping the change was read again
+    finally:
+        feed.close()
+
+
+def test_size_bound_drops_least_recently_used(tmp_path):
+    g, fake, cache, feed = _g(tmp_path, max_bytes=500)
+    try:
+        for caption in ("A", "B", "C", "D", "E"):
+            g.V().has("caption", caption).toList()
+        assert cache.stats()["bytes"] <= 500
+        assert cache.stats()["entries"] == 4
+        g.V().has("caption", "A").toList()  # evicted first
+        assert fake.submitted == 6
+    finally:
+        feed.close()
+
+
+def test_keys_and_labels():
+    g = traversal().with_remote(None)
+    within = g.V().has("type", P.within("notion", "notionGroup")).has("caption", "X").out("contains")
+    assert bytecode_key(within.bytecode) == bytecode_key(
+        g.V().has("type", P.within("notion", "notionGroup")).has("caption", "X").out("contains").bytecode
+    )
+    assert bytecode_key(within.bytecode) != bytecode_key(g.V().has("caption", "X").bytecode)
+    assert bytecode_key(g.V().has("n", 1).bytecode) != bytecode_key(g.V().has("n", "1").bytecode)
+
+    assert start_labels(within.bytecode) == {"notion", "notionGroup"}
+    assert start_labels(g.V().hasLabel("verse").bytecode) == {"verse"}
+    assert start_labels(g.V().out().has("type", "verse").bytecode) == {ANY_LABEL}
+    assert is_cacheable(g.E().bytecode)
+    assert not is_cacheable(g.V().property("caption", "X").bytecode)
@@ -0,0 +1,128 @@
+import itertools
+import time
+from concurrent.futures import Future
+
+import pytest
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Traverser
+
+from theo_mcp_server.routing import LEAST_LATENCY, ROUND_ROBIN, RoutingRemoteConnection, endpoint_health
+from theo_mcp_server.timeouts import TimeoutRemoteConnection, budget
+
+_cluster = itertools.count()
+
+
+class StandInServer:
+    """A Gremlin Server node that answers every traversal with its own name."""
+
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.up = True
+        self.received = []
+
+
+class StandInConnection:
+    def __init__(self, server):
+        if not server.up:
+            raise ConnectionRefusedError(f"Connection refused: {server.name}")
+        self.server = server
+
+    def submit(self, bytecode):
+        if not self.server.up:
+            raise RuntimeError("Connection was already closed.")
+        time.sleep(self.server.delay)
+        self.server.received.append(bytecode)
+        return RemoteTraversal(iter([Traverser(self.server.name)]))
+
+    def submit_async(self, bytecode):
+        future = Future()
+        try:
+            future.set_result(self.submit(bytecode))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        pass
+
+
+def _cluster_of(*names, delays=None, **kwargs):
+    # Fresh URLs per test: node health is kept per process.
+    prefix = f"ws://cluster{next(_cluster)}"
+    servers = {f"{prefix}-{name}:8182/gremlin": StandInServer(name, (delays or {}).get(name, 0.0)) for name in names}
+    urls = {s.name: url for url, s in servers.items()}
+    kwargs.setdefault("health_check_interval", 60.0)
+
+    def router(read, write):
+        conn = RoutingRemoteConnection(
+            [urls[n] for n in read], [urls[n] for n in write], lambda url: StandInConnection(servers[url]), **kwargs
+        )
+        return traversal().with_remote(conn), conn
+
+    return {s.name: s for s in servers.values()}, urls, router
+
+
+def test_reads_are_spread_and_writes_go_to_the_writer():
+    servers, _, router = _cluster_of("w", "r1", "r2", balance=ROUND_ROBIN)
+    g, _ = router(read=["r1", "r2"], write=["w"])
+
+    assert sorted(g.V().values("caption").next() for _ in range(4)) == ["r1", "r1", "r2", "r2"]
+    assert g.V(1).property("status", "done").next() == "w"
+    assert [b.step_instructions[-1][0] for b in servers["w"].received] == ["property"]
+
+
+def test_least_latency_prefers_the_faster_node():
+    _, _, router = _cluster_of("w", "slow", "fast", delays={"slow": 0.05}, balance=LEAST_LATENCY)
+    g, _ = router(read=["slow", "fast"], write=["w"])
+
+    answers = [g.V().next() for _ in range(10)]
+    assert answers.count("fast") >= 8  # each node is tried, then the fast one wins
+
+
+def test_failed_reader_is_skipped_then_probed_back():
+    servers, urls, router = _cluster_of("w", "r1", "r2", balance=ROUND_ROBIN, health_check_interval=0.05)
+    g, _ = router(read=["r1", "r2"], write=["w"])
+    g.V().next(), g.V().next()
+
+    servers["r1"].up = False
+    assert [g.V().next() for _ in range(4)] == ["r2"] * 4  # the failed read was retried on r2
+    assert endpoint_health(urls["r1"]).healthy is False
+
+    servers["r1"].up = True
+    time.sleep(0.06)
+    assert g.V().next() == "r1"  # probed with inject(0), then back in rotation
+    assert servers["r1"].received[-2].step_instructions == [["inject", 0]]
+    assert endpoint_health(urls["r1"]).healthy is True
+
+
+def test_writes_fail_over_in_order_and_are_not_retried():
+    servers, urls, router = _cluster_of("w1", "w2", health_check_interval=0.05)
+    g, conn = router(read=["w1", "w2"], write=["w1", "w2"])
+
+    assert g.V(1).property("n", 1).next() == "w1"
+    servers["w1"].up = False
+    with pytest.raises(RuntimeError, match="already closed"):
+        g.V(1).property("n", 2).next()  # it may have been applied: not sent again
+    assert servers["w2"].received == []
+    assert g.V(1).property("n", 3).next() == "w2"
+
+    servers["w1"].up = True
+    time.sleep(0.06)
+    assert g.V(1).property("n", 4).next() == "w1"  # the first writer takes over again
+    assert [s["roles"] for s in conn.endpoint_stats()] == [["write", "read"], ["write", "read"]]
+
+
+def test_async_reads_fail_over_under_a_budget():
+    servers, _, router = _cluster_of("w", "r1", "r2", balance=ROUND_ROBIN)
+    _, conn = router(read=["r1", "r2"], write=["w"])
+    g = traversal().with_remote(TimeoutRemoteConnection(conn))
+
+    servers["r2"].up = False
+    with budget(5):
+        assert [g.V().next() for _ in range(3)] == ["r1"] * 3
+
+    servers["r1"].up = False
+    with budget(5), pytest.raises(ConnectionRefusedError):
+        g.V().next()  # r1 dropped the read, and r2 is still down
@@ -0,0 +1,38 @@
+import pytest
+from gremlin_python.process.traversal import T, Traverser
+from gremlin_python.structure.graph import Edge, Vertex, VertexProperty
+
+from theo_mcp_server.serializers import GRAPHBINARY, GRAPHSON, RelationIdentifier, message_serializer, response_message
+
+EDGE_ID = RelationIdentifier(out_vertex_id=4096, type_id=10, relation_id=123456, in_vertex_id=8192)
+PROPERTY_ID = RelationIdentifier(out_vertex_id=4096, type_id=11, relation_id=99)
+
+
+def test_relation_ids_use_janusgraph_text_form():
+    assert str(EDGE_ID) == "2n9c-35s-a-6bk"
+    assert str(PROPERTY_ID) == "2r-35s-b"
+    for rid in (EDGE_ID, PROPERTY_ID, RelationIdentifier("a1", 3, 5, "b2")):
+        assert RelationIdentifier.from_string(str(rid)) == rid
+
+
+@pytest.mark.parametrize("serializer", [GRAPHBINARY, GRAPHSON])
+def test_elements_with_janusgraph_ids_are_read(serializer):
+    data = [
+        Traverser(Edge(EDGE_ID, Vertex(4096, "notion"), "contains", Vertex(8192, "notion"))),
+        Traverser(VertexProperty(PROPERTY_ID, "caption", "Grace", Vertex(4096))),
+        Traverser({T.id: 4096, T.label: "notion", "caption": "Grace"}, bulk=2),
+    ]
+    message = message_serializer(serializer).deserialize_message(response_message(serializer, data))
+
+    edge, prop, row = message["result"]["data"]
+    assert edge.object.id == EDGE_ID and edge.object.inV.id == 8192
+    assert prop.object.id == PROPERTY_ID and prop.object.value == "Grace"
+    assert row.object["caption"] == "Grace" and row.bulk == 2
+
+
+def test_unknown_custom_types_are_named():
+    payload = response_message(GRAPHBINARY, [EDGE_ID]).replace(
+        b"\x00\x00\x00\x1djanusgraph.RelationIdentifier", b"\x00\x00\x00\x13janusgraph.Geoshape"
+    )
+    with pytest.raises(ValueError, match="'janusgraph.Geoshape'"):
+        message_serializer(GRAPHBINARY).deserialize_message(payload)
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import pytest
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Traverser
+from gremlin_python.structure.graph import Graph
+
+from theo_mcp_server.change_feed import UPDATE, ChangeEvent, ChangeFeed
+from theo_mcp_server.shared_cache import LocalCache
+from theo_mcp_server import sidecar as sidecar_module
+from theo_mcp_server.sidecar import SidecarCache, SidecarClient, SidecarRemoteConnection, SidecarServer, _authkey
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket path")
+
+
+class FakeConnection:
+    """Stands in for a DriverRemoteConnection: answers with the steps it was sent."""
+
+    def __init__(self, fail_first=False):
+        self.fail_first = fail_first
+        self.closed = False
+
+    def submit(self, bytecode):
+        if self.fail_first:
+            self.fail_first = False
+            raise RuntimeError("Connection was already closed.")
+        return RemoteTraversal(iter([Traverser(step[0]) for step in bytecode.step_instructions]))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    # Unix socket paths are limited to ~100 bytes, so keep it short.
+    address = os.path.join(tempfile.gettempdir(), f"theo-test-{uuid.uuid4().hex[:8]}.sock")
+    authkey = b"test-key"
+    connections = []
+
+    def connect():
+        conn = FakeConnection(fail_first=not connections)
+        connections.append(conn)
+        return conn
+
+    feed = ChangeFeed(str(tmp_path / "changes.jsonl"))
+    server = SidecarServer(address, authkey, connect, pool_size=2, cache=LocalCache(feed))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not os.path.exists(address):
+        time.sleep(0.01)
+    client = SidecarClient(address, authkey)
+    yield client, connections, str(tmp_path / "changes.jsonl")
+    client.close()
+    server.stop()
+    thread.join(timeout=5)
+    feed.close()
+
+
+def test_traversals_run_in_the_sidecar(sidecar):
+    client, connections, _ = sidecar
+    g = traversal().with_remote(SidecarRemoteConnection(client))
+
+    assert g.V().has("caption", "Grace").values("caption").toList() == ["V", "has", "values"]
+    # The first pooled connection reported a dropped socket; it was replaced and the call retried.
+    assert len(connections) == 2
+    assert connections[0].closed
+    assert g.inject(0).toList() == ["inject"]
+    assert len(connections) == 2
+
+
+def test_cache_is_shared_and_evicted_by_graph_changes(sidecar):
+    client, _, feed_path = sidecar
+    first, second = SidecarCache(client), SidecarCache(SidecarClient(client.address, b"test-key"))
+
+    first.set("tree:False", {"Root": {}}, ttl=60, labels=("notion", "notionGroup"))
+    first.set("svg:abc", ("<svg/>", {}), ttl=60)
+    assert second.get("tree:False") == {"Root": {}}
+
+    publisher = ChangeFeed(feed_path)
+    try:
+        publisher.publish([ChangeEvent(UPDATE, vertex_id=1, label="notion", caption="N", labels=("notion",))])
+    finally:
+        publisher.close()
+    assert second.get("tree:False") is None
+    assert second.get("svg:abc") == ("<svg/>", {})
+
+
+def test_key_file_must_be_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    key = _authkey()
+    assert _authkey() == key
+    assert os.stat(tmp_path / "theo-mcp").st_mode & 0o777 == 0o700
+
+    os.chmod(tmp_path / "theo-mcp" / "sidecar.key", 0o644)
+    with pytest.raises(PermissionError):
+        _authkey()
+    os.chmod(tmp_path / "theo-mcp" / "sidecar.key", 0o600)
+    os.chmod(tmp_path / "theo-mcp", 0o755)
+    with pytest.raises(PermissionError):
+        _authkey()
+
+
+class _DroppedReply:
+    """A sidecar connection that takes the request and goes away before replying."""
+
+    def __init__(self, sent):
+        self.sent = sent
+
+    def send(self, request):
+        self.sent.append(request[0])
+
+    def recv(self):
+        raise EOFError
+
+    def close(self):
+        pass
+
+
+def test_only_read_only_requests_are_resent(monkeypatch):
+    sent = []
+    monkeypatch.setattr(sidecar_module, "ensure_sidecar", lambda address, authkey: _DroppedReply(sent))
+    client = SidecarClient("unused", b"test-key")
+    g = Graph().traversal()
+
+    with pytest.raises(EOFError):
+        client.call("submit", g.V().has("caption", "Grace").bytecode, None)
+    assert len(sent) == 2
+    sent.clear()
+    with pytest.raises(EOFError):
+        client.call("submit", g.addV("notion").property("caption", "Grace").bytecode, None)
+    assert len(sent) == 1
@@ -0,0 +1,89 @@
+import time
+
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Traverser
+
+from theo_mcp_server.slow_queries import ProfilingRemoteConnection, SlowQueryLog, summarize_profile
+
+# Shaped like a JanusGraph profile() result as read by gremlin-python (durations in ns).
+PROFILE = {
+    "dur": 25_000_000,
+    "metrics": [
+        {
+            "id": "0.0.0()",
+            "name": "JanusGraphStep([],[type.eq(notion), caption.eq(Grace)])",
+            "dur": 20_000_000,
+            "counts": {"traverserCount": 1, "elementCount": 1},
+            "annotations": {"percentDur": 80.0},
+            "metrics": [
+                {
+                    "id": "1",
+                    "name": "backend-query",
+                    "dur": 19_000_000,
+                    "counts": {},
+                    "annotations": {"condition": "(type = notion AND caption = Grace)", "index": "byCaption"},
+                    "metrics": [],
+                },
+            ],
+        },
+        {
+            "id": "1.0.0()",
+            "name": "PropertyMapStep(value)",
+            "dur": 5_000_000,
+            "counts": {"traverserCount": 1, "elementCount": 1},
+            "annotations": {"percentDur": 20.0},
+            "metrics": [],
+        },
+    ],
+}
+
+
+class SlowConnection:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, bytecode):
+        self.submitted.append(bytecode)
+        if bytecode.step_instructions[-1][0] == "profile":
+            return RemoteTraversal(iter([Traverser(PROFILE)]))
+        time.sleep(0.02)
+        return RemoteTraversal(iter([Traverser("Grace")]))
+
+    def close(self):
+        pass
+
+
+def test_slow_reads_are_logged_with_their_profile(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"))
+    conn = ProfilingRemoteConnection(SlowConnection(), log, threshold_ms=10)
+    g = traversal().with_remote(conn)
+
+    assert g.V().has("type", "notion").has("caption", "Grace").values("caption").toList() == ["Grace"]
+    g.V().has("caption", "Grace").property("status", "done").iterate()
+    conn._executor.shutdown(wait=True)
+
+    mutation, read = log.recent()
+    assert mutation["profile"] is None and ".property('status','done')" in mutation["traversal"]
+    assert read["traversal"] == "g.V().has('type','notion').has('caption','Grace').values('caption')"
+    assert read["duration_ms"] >= 10
+    assert read["profile"]["indexes"] == ["byCaption"]
+    assert read["profile"]["full_scan"] is False
+    assert [s["percent"] for s in read["profile"]["steps"]] == [80.0, 20.0]
+    # The mutation was not run a second time.
+    assert len(conn._connection.submitted) == 3
+
+
+def test_log_rotates_and_keeps_one_old_file(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), max_bytes=300)
+    for i in range(20):
+        log.append({"n": i, "traversal": "g.V()" * 5})
+    recent = log.recent(limit=100)
+    assert recent[0]["n"] == 19
+    assert 0 < len(recent) < 20
+    assert [r["n"] for r in recent] == sorted((r["n"] for r in recent), reverse=True)
+
+
+def test_summarize_full_scan():
+    profile = {"dur": 1, "metrics": [{"name": "JanusGraphStep", "dur": 1, "annotations": {"_fullscan": "true"}, "metrics": []}]}
+    assert summarize_profile(profile)["full_scan"] is True
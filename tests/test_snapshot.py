@@ -0,0 +1,97 @@
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from theo_mcp_server.gremlin_client import AppContext, GraphUnavailable, get_g
+from theo_mcp_server.snapshot import GraphSnapshot, _paged, read_with_fallback
+from theo_mcp_server.timeouts import current_budget
+from theo_mcp_server.tools.crud import read_by_caption, read_by_captions
+from theo_mcp_server.tools.graph import _notion_groups_tree
+
+VERTICES = [
+    {"internal_id": 1, "label": "notionGroup", "type": "notionGroup", "caption": "Theology"},
+    {"internal_id": 2, "label": "notionGroup", "type": "notionGroup", "caption": "Grace"},
+    {"internal_id": 3, "label": "notion", "type": "notion", "caption": "Grace alone", "description": "sola gratia"},
+    {"internal_id": 4, "label": "verse", "type": "verse", "caption": "Eph 2:8", "RST": "...", "chapter": 2},
+]
+EDGES = [("contains", 1, 2), ("contains", 2, 3), ("isSupportedBy", 3, 4)]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    GraphSnapshot(VERTICES, EDGES, taken_at=1_700_000_000).save(path)
+    return path
+
+
+@pytest.fixture
+def offline_ctx(snapshot_path, monkeypatch):
+    # Nothing listens on this port: the graph is unreachable.
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setenv("GREMLIN_URL", f"ws://127.0.0.1:{port}/gremlin")
+    monkeypatch.setenv("SNAPSHOT_PATH", snapshot_path)
+    monkeypatch.setenv("SNAPSHOT_REFRESH_INTERVAL", "0")
+    app_ctx = AppContext()
+    yield SimpleNamespace(request_context=SimpleNamespace(lifespan_context=app_ctx))
+    app_ctx.connection.close()
+
+
+def test_snapshot_answers_like_the_helpers(snapshot_path):
+    snapshot = GraphSnapshot.load(snapshot_path)
+
+    notion = snapshot.vertex_with_edges(snapshot.ids_by_caption("Grace alone", "notion")[0])
+    assert notion["description"] == "sola gratia"
+    assert notion["relationships"] == {
+        "isSupportedBy": [{"label": "verse", "id": 4, "caption": "Eph 2:8"}],
+        "isContainedIn": [{"label": "notionGroup", "id": 2, "caption": "Grace"}],
+    }
+    assert snapshot.vertices_by_captions(["Eph 2:8", "Nowhere"], ["caption", "chapter"]) == [
+        {"internal_id": 4, "label": "verse", "caption": "Eph 2:8", "chapter": 2}
+    ]
+    assert snapshot.notion_groups_tree(False) == {"Theology": {"Grace": {}}}
+    assert snapshot.notion_groups_tree(True) == {"Theology": {"Grace": {"Grace alone": {}}}}
+    assert [v["caption"] for v in snapshot.search(["notion", "notionGroup"], "Grace", 10, ["caption"])] == [
+        "Grace", "Grace alone",
+    ]
+
+
+def test_snapshot_is_read_in_pages_each_under_a_budget():
+    pages = []
+
+    def read(after, limit):
+        pages.append((after, limit, current_budget() is not None))
+        rows = [i for i in range(0, 50, 2) if after is None or i > after]
+        return rows[:limit]
+
+    assert _paged(read, lambda row: row, 10) == list(range(0, 50, 2))
+    # Each page starts after the last id of the previous one.
+    assert pages == [(None, 10, True), (18, 10, True), (38, 10, True)]
+
+
+def test_read_tools_fall_back_to_the_snapshot(offline_ctx):
+    with pytest.raises(GraphUnavailable):
+        get_g(offline_ctx)  # what writes get
+
+    notion = read_by_caption(offline_ctx, "notion", "Grace alone")
+    assert notion["caption"] == "Grace alone"
+    assert notion["stale"]["snapshot_taken_at"] == "2023-11-14T22:13:20+00:00"
+
+    tree = _notion_groups_tree(offline_ctx, include_notions=False)
+    assert tree["stale"]["age_seconds"] > 0
+    assert tree["result"] == {"Theology": {"Grace": {}}}
+
+    with pytest.raises(ValueError, match="Notion not found"):
+        read_by_caption(offline_ctx, "notion", "Nowhere")
+
+    batch = read_by_captions(offline_ctx, ["Eph 2:8", "Grace", "Nowhere"], ["verse", "notionGroup"], ["caption"])
+    assert [(v["caption"], list(v["relationships"])) for v in batch] == [("Eph 2:8", ["supports"]), ("Grace", ["contains", "isContainedIn"])]
+
+
+def test_without_a_snapshot_the_error_stands(offline_ctx, tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_PATH", str(tmp_path / "missing.json.gz"))
+    offline_ctx.request_context.lifespan_context.snapshot_keeper = None
+    with pytest.raises(GraphUnavailable):
+        read_with_fallback(offline_ctx, lambda g: g.V().toList(), lambda snapshot: [])
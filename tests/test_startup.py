@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+DEFERRED = ["aiohttp", "graphviz", "theo_mcp_server.cloud_storage", "theo_mcp_server.upload_queue"]
+
+
+def test_building_the_server_defers_heavy_imports():
+    code = (
+        "import sys, theo_mcp_server.server as s; s.create_mcp(); "
+        f"print([m for m in {DEFERRED!r} if m in sys.modules])"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_connecting_does_not_hold_up_other_server_state(tmp_path, monkeypatch):
+    from theo_mcp_server import gremlin_client
+
+    monkeypatch.setenv("MUTATION_LOG_PATH", str(tmp_path / "mutations.jsonl"))
+    connecting, connected = threading.Event(), threading.Event()
+    connection = object()
+
+    def slow_connection():
+        connecting.set()
+        connected.wait(5)
+        return connection
+
+    monkeypatch.setattr(gremlin_client, "_make_connection", slow_connection)
+    monkeypatch.setattr(gremlin_client, "_load_graph_indexes", lambda conn: None)
+    app_ctx = gremlin_client.AppContext()
+    ctx = SimpleNamespace(request_context=SimpleNamespace(lifespan_context=app_ctx))
+    thread = threading.Thread(target=gremlin_client._ensure_connected, args=(app_ctx,))
+    thread.start()
+    try:
+        assert connecting.wait(5)
+        log = gremlin_client.get_mutation_log(ctx)
+        assert app_ctx.connection is None  # still connecting
+    finally:
+        connected.set()
+        thread.join()
+    assert app_ctx.connection is connection
+    log.close()
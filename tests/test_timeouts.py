@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import anyio
+import pytest
+from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
+from gremlin_python.driver.remote_connection import RemoteTraversal
+from gremlin_python.process.anonymous_traversal import traversal
+from gremlin_python.process.traversal import Traverser
+
+from theo_mcp_server import timeouts
+from theo_mcp_server.timeouts import (
+    TimeoutRemoteConnection,
+    TraversalCancelled,
+    TraversalTimeout,
+    bounded,
+    budget,
+    current_budget,
+    with_evaluation_timeout,
+)
+
+
+class PendingConnection:
+    """Answers traversals only when told to; like a Gremlin server busy evaluating."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit_async(self, bytecode):
+        future = Future()
+        self.futures.append((bytecode, future))
+        return future
+
+    def submit(self, bytecode):
+        return RemoteTraversal(iter([Traverser("unbounded")]))
+
+    def close(self):
+        pass
+
+
+def test_budget_is_sent_as_evaluation_timeout():
+    g = traversal().with_remote(None)
+    bytecode = with_evaluation_timeout(g.with_("batchSize", 64).V().bytecode, 1.5)
+    assert DriverRemoteConnection._extract_request_options(bytecode) == {"evaluationTimeout": 1500, "batchSize": 64}
+
+
+def test_timed_out_call_leaves_the_connection_usable(monkeypatch):
+    monkeypatch.setattr(timeouts, "CLIENT_GRACE", 0.0)
+    pending = PendingConnection()
+    g = traversal().with_remote(TimeoutRemoteConnection(pending))
+
+    started = time.monotonic()
+    with budget(0.2), pytest.raises(TraversalTimeout):
+        g.V().toList()
+    assert time.monotonic() - started < 1
+
+    # The late reply is simply dropped; the next call goes through.
+    pending.futures[0][1].set_result(RemoteTraversal(iter([Traverser("late")])))
+    with budget(5):
+        threading.Timer(0.05, lambda: pending.futures[1][1].set_result(RemoteTraversal(iter([Traverser("v")])))).start()
+        assert g.V().toList() == ["v"]
+    assert g.V().toList() == ["unbounded"]  # no budget, no deadline
+
+
+def test_cancel_abandons_reads_but_waits_for_writes():
+    pending = PendingConnection()
+    g = traversal().with_remote(TimeoutRemoteConnection(pending))
+
+    with budget(5) as b:
+        def cancel_then_answer_write():
+            b.cancelled.set()
+            time.sleep(0.2)
+            pending.futures[0][1].set_result(RemoteTraversal(iter([Traverser(1)])))
+
+        threading.Timer(0.05, cancel_then_answer_write).start()
+        assert g.V(1).property("status", "done").toList() == [1]
+
+        with pytest.raises(TraversalCancelled):
+            g.V().toList()  # nothing more is sent once cancelled
+        assert len(pending.futures) == 1
+
+    pending = PendingConnection()
+    g = traversal().with_remote(TimeoutRemoteConnection(pending))
+    with budget(5) as b:
+        threading.Timer(0.05, b.cancelled.set).start()
+        with pytest.raises(TraversalCancelled):
+            g.V().toList()
+
+
+def test_cancelled_tool_call_stops_its_worker_thread():
+    seen = {}
+    finished = threading.Event()
+
+    def get_notions_tree(ctx=None):
+        b = current_budget()
+        seen["budget"] = b.remaining()
+        seen["cancelled"] = b.cancelled.wait(5)
+        finished.set()
+        return {}
+
+    tool = bounded(get_notions_tree)
+
+    async def main():
+        with anyio.move_on_after(0.2):
+            await tool(ctx=None)
+
+    started = time.monotonic()
+    anyio.run(main)
+    assert time.monotonic() - started < 1
+    assert finished.wait(1)
+    assert seen["cancelled"] is True
+    assert 100 < seen["budget"] <= 120  # the tool's own budget
+
+
+def test_wait_for_a_slot_counts_against_the_budget(monkeypatch):
+    from theo_mcp_server.admission import HEAVY, AdmissionController
+
+    controller = AdmissionController({HEAVY: 1}, 10)
+    monkeypatch.setattr("theo_mcp_server.admission.get_admission_controller", lambda: controller)
+    monkeypatch.setenv("TOOL_TIMEOUTS", "get_notions_tree=1")
+    seen = []
+
+    def get_notions_tree(ctx=None):
+        seen.append(current_budget().remaining())
+        return {}
+
+    tool = bounded(get_notions_tree)
+
+    async def main():
+        async with anyio.create_task_group() as tg:
+            async with controller.admit(HEAVY, "other"):
+                tg.start_soon(tool)
+                await anyio.sleep(0.4)
+
+    anyio.run(main)
+    assert 0.4 < seen[0] <= 0.6  # 1 s budget minus the 0.4 s spent queued
+
+
+def test_cancelled_call_holds_its_slot_until_the_thread_finishes(monkeypatch):
+    from theo_mcp_server.admission import HEAVY, AdmissionController
+
+    controller = AdmissionController({HEAVY: 1}, 10)
+    monkeypatch.setattr("theo_mcp_server.admission.get_admission_controller", lambda: controller)
+    release_first = threading.Event()
+    order = []
+
+    def get_notions_tree(ctx=None, n=0):
+        if n == 0:
+            release_first.wait(5)  # e.g. a write that is waited for despite the cancel
+        order.append(n)
+        return {}
+
+    tool = bounded(get_notions_tree)
+
+    async def main():
+        with anyio.move_on_after(0.1):
+            await tool(n=0)
+        assert controller.lanes[HEAVY].running == 1  # still held by the abandoned thread
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(tool, None, 1)
+            await anyio.sleep(0.2)
+            assert order == []
+            release_first.set()
+        assert controller.lanes[HEAVY].running == 0
+
+    anyio.run(main)
+    assert order == [0, 1]
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from theo_mcp_server.upload_queue import DONE, FAILED, UploadQueue
+
+
+class _FlakyStorage:
+    """In-memory CloudStorage that fails the first `failures` uploads."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0) -> None:
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.files: dict[str, bytes | str] = {}
+        self.release = threading.Event()
+        self.release.set()
+
+    def upload(self, filename, content, content_type="application/octet-stream"):
+        self.release.wait()
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError("boom")
+        self.files[filename] = content
+        return f"http://stand-in/{filename}"
+
+    def delete(self, filename):
+        self.files.pop(filename, None)
+        return True
+
+
+def _wait_for(queue: UploadQueue, filename: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(filename)
+        if status.state in (DONE, FAILED):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"upload of {filename} did not finish")
+
+
+def test_upload_returns_immediately_and_completes():
+    storage = _FlakyStorage()
+    storage.release.clear()
+    queue = UploadQueue(storage, backoff_seconds=0.0)
+    try:
+        status = queue.submit("a.svg", "<svg/>")
+        assert status.state == "pending" and status.download_url is None
+
+        storage.release.set()
+        done = _wait_for(queue, "a.svg")
+        assert done.state == DONE
+        assert done.download_url == "http://stand-in/a.svg"
+    finally:
+        storage.release.set()
+        queue.close()
+
+
+def test_upload_is_retried_with_backoff():
+    storage = _FlakyStorage(failures=2)
+    queue = UploadQueue(storage, max_retries=3, backoff_seconds=0.01)
+    try:
+        queue.submit("a.svg", "<svg/>")
+        status = _wait_for(queue, "a.svg")
+        assert status.state == DONE
+        assert status.attempts == 3
+        assert status.error is None
+    finally:
+        queue.close()
+
+
+def test_upload_fails_after_retries_are_exhausted():
+    storage = _FlakyStorage(failures=10)
+    queue = UploadQueue(storage, max_retries=1, backoff_seconds=0.0)
+    try:
+        queue.submit("a.svg", "<svg/>")
+        status = _wait_for(queue, "a.svg")
+        assert status.state == FAILED
+        assert status.attempts == 2
+        assert status.error == "boom"
+    finally:
+        queue.close()
+
+
+def test_full_queue_rejects_submissions():
+    storage = _FlakyStorage()
+    storage.release.clear()
+    queue = UploadQueue(storage, max_workers=1, max_pending=1)
+    try:
+        queue.submit("a.svg", "<svg/>")
+        queue.submit("b.svg", "<svg/>")
+        with pytest.raises(RuntimeError):
+            queue.submit("c.svg", "<svg/>")
+    finally:
+        storage.release.set()
+        queue.close()
+
+
+def test_retry_backoff_does_not_hold_up_a_worker():
+    storage = _FlakyStorage(failures=1)
+    queue = UploadQueue(storage, max_workers=1, max_retries=1, backoff_seconds=0.5)
+    try:
+        queue.submit("a.svg", "<svg/>")
+        deadline = time.monotonic() + 5.0
+        while storage.calls < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queue.submit("b.svg", "<svg/>")
+        assert _wait_for(queue, "b.svg", timeout=0.4).state == DONE  # while a.svg waits to retry
+        assert queue.status("a.svg").state == "pending"
+        assert _wait_for(queue, "a.svg").state == DONE
+    finally:
+        queue.close()
@@ -1,6 +1,13 @@
 import pytest
 
-from theo_mcp_server.validation import normalize_label, normalize_edge_label, validate_and_fix_properties
+from theo_mcp_server.validation import (
+    RowValidationError,
+    normalize_edge_label,
+    normalize_label,
+    validate_and_fix_properties,
+    validate_relationships,
+    validate_rows,
+)
 
 
 def test_normalize_label():
@@ -21,3 +28,48 @@ def test_validate_properties_required():
 def test_validate_properties_reject_unknown():
     with pytest.raises(ValueError):
         validate_and_fix_properties("person", {"caption": "x", "nope": 123})
+
+
+def test_normalize_edge_label_unknown():
+    with pytest.raises(ValueError):
+        normalize_edge_label("nope")
+
+
+def test_validate_properties_coerces_ints():
+    props = validate_and_fix_properties("quotation", {"caption": "q", "text": "t", "book": "b", "position": "1", "importIndex": "-5"})
+    assert props["importIndex"] == -5
+    assert props["position"] == "1"
+
+
+def test_validate_rows_reports_every_bad_row():
+    rows = [
+        {"caption": "ok", "chapter": "1"},
+        {"nope": 1},
+        {"caption": "bad", "verse": "x"},
+    ]
+    with pytest.raises(RowValidationError) as exc_info:
+        validate_rows("verse", rows)
+    assert sorted(exc_info.value.errors) == [1, 2]
+    assert len(exc_info.value.errors[1]) == 2  # unknown and missing caption
+
+
+def test_validate_rows_returns_coerced_rows():
+    assert validate_rows("verse", [{"caption": "a", "chapter": "2"}]) == [{"caption": "a", "chapter": 2}]
+
+
+def test_validate_relationships_reports_every_bad_row():
+    rows = [
+        {"relationship": "refersto", "sourceCaption": "a", "targetCaption": "b"},
+        {"relationship": "nope", "sourceCaption": "a", "targetCaption": "b"},
+        {"relationship": "refersTo", "sourceCaption": "a"},
+    ]
+    with pytest.raises(RowValidationError) as exc_info:
+        validate_relationships(rows)
+    assert sorted(exc_info.value.errors) == [1, 2]
+    assert "Unknown edge label 'nope'" in exc_info.value.errors[1][0]
+    assert "targetCaption" in exc_info.value.errors[2][0]
+
+
+def test_validate_relationships_normalizes_edge_labels():
+    rows = [{"relationship": "refersto", "sourceCaption": "a", "targetCaption": "b"}]
+    assert validate_relationships(rows) == [("refersTo", "a", "b")]